@@ -2,9 +2,15 @@ import requests
 from datetime import datetime, timedelta
 import time
 import re
+import threading
 import base64
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
 from capcha import solve_capcha_base64
+from http_client import get_http_client
+from solver_router import get_solver_router
+from rate_limiter import get_rate_limiter
 from logging_config import get_logger
 
 # Load environment variables for CAPTCHA solving
@@ -25,23 +31,27 @@ def parse_time_slots(html_response):
     
     return times
 
+def get_timeslot_headers(base_url: str) -> dict:
+    """Headers mimicking the datepicker AJAX call for timeslot requests."""
+    return {
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Referer': base_url,
+        'X-Requested-With': 'XMLHttpRequest'
+    }
+
 def get_timeslots_for_single_date(date_str, base_url:str, endpoint:str):
         """Check availability for a single date using existing ajax2py pattern."""
         url = f"{base_url}{endpoint}"
         
         data = {'godzina': date_str}
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': base_url,
-            'X-Requested-With': 'XMLHttpRequest'
-        }
+        headers = get_timeslot_headers(base_url)
         
         try:
-            # Sleep for server courtesy before each request
-            time.sleep(0.2)
+            # Wait for the shared per-endpoint request budget
+            get_rate_limiter('godziny_pokoj', base_url).acquire()
             
-            response = requests.post(url, data=data, headers=headers, timeout=10)
+            response = get_http_client().post(url, data=data, headers=headers)
             if response.status_code == 200:
                 # Reuse existing parse_time_slots function
                 slots = parse_time_slots(response.text)
@@ -76,8 +86,20 @@ def send_registration_request(base_url: str, registrant_data: dict, timeslot_dat
     return _send_registration_attempt(base_url, registrant_data, timeslot_data, captcha_code, session_id)
 
 
+def _cancelled_result(attempt: int, max_retries: int) -> dict:
+    """Result of a registration abandoned because its cancel event was set."""
+    return {
+        'success': False,
+        'error': 'Registration cancelled',
+        'cancelled': True,
+        'attempt': attempt,
+        'max_retries': max_retries
+    }
+
+
 def send_registration_request_with_retry(base_url: str, registrant_data: dict, timeslot_data: dict, 
-                                       max_retries: int = 12, session_id: str = None):
+                                       max_retries: int = 12, session_id: str = None, captcha_pool=None,
+                                       cancel_event=None):
     """
     Send registration request with CAPTCHA retry mechanism.
     
@@ -89,53 +111,63 @@ def send_registration_request_with_retry(base_url: str, registrant_data: dict, t
                                        Function signature: captcha_solver_func(captcha_image_base64: str) -> dict
         max_retries (int): Maximum number of retry attempts (default: 3)
         session_id (str, optional): PHPSESSID cookie value. If None, will get new session for each attempt.
+        captcha_pool (CaptchaPrefetchPool, optional): Pool of pre-solved sessions. When an entry is
+                                       available the attempt skips session, CAPTCHA and solver round-trips.
+        cancel_event (threading.Event, optional): When set, no further attempt is started and no
+                                       solved CAPTCHA is submitted; a request already sent runs to completion.
     
     Returns:
         dict: Response with success status, details, and retry information
     """
     for attempt in range(max_retries + 1):
+        if cancel_event is not None and cancel_event.is_set():
+            return _cancelled_result(attempt, max_retries)
         try:
-            # Get fresh session and CAPTCHA for each attempt
-            if not session_id or attempt > 0:
-                session_id = get_session_id(base_url)
-                if not session_id:
+            # Use a pre-solved session when available: submission is a single POST
+            prefetched = captcha_pool.take() if captcha_pool else None
+            if prefetched:
+                session_id = prefetched['session_id']
+                captcha_code = prefetched['captcha_code']
+                solver_name = prefetched.get('solver')
+            else:
+                # Get fresh session and CAPTCHA image from one request for each attempt
+                captcha_data = get_session_and_captcha(base_url, session_id if attempt == 0 else None)
+                if not captcha_data['success']:
                     return {
                         'success': False,
-                        'error': 'Failed to obtain session ID',
+                        'error': f'Failed to fetch CAPTCHA: {captcha_data.get("error", "Unknown error")}',
                         'attempt': attempt + 1,
                         'max_retries': max_retries
                     }
+                session_id = captcha_data['session_id']
+                
+                # Solve CAPTCHA
+                captcha_solution = solve_capcha_base64(captcha_data['image_base64'])
+                if not captcha_solution.get('result'):
+                    return {
+                        'success': False,
+                        'error': f'CAPTCHA solving failed: {captcha_solution}',
+                        'attempt': attempt + 1,
+                        'max_retries': max_retries
+                    }
+                
+                captcha_code = captcha_solution['result']
+                solver_name = captcha_solution.get('solver')
             
-            # Get new CAPTCHA image
-            captcha_data = get_captcha_image(base_url, session_id)
-            if not captcha_data['success']:
-                return {
-                    'success': False,
-                    'error': f'Failed to fetch CAPTCHA: {captcha_data.get("error", "Unknown error")}',
-                    'attempt': attempt + 1,
-                    'max_retries': max_retries
-                }
-            
-            # Solve CAPTCHA
-            captcha_solution = solve_capcha_base64(captcha_data['image_base64'])
-            if not captcha_solution.get('result'):
-                return {
-                    'success': False,
-                    'error': f'CAPTCHA solving failed: {captcha_solution}',
-                    'attempt': attempt + 1,
-                    'max_retries': max_retries
-                }
-            
-            captcha_code = captcha_solution['result']
+            if cancel_event is not None and cancel_event.is_set():
+                if prefetched and captcha_pool:
+                    captcha_pool.put(prefetched)
+                return _cancelled_result(attempt, max_retries)
             
             # Attempt registration
             result = _send_registration_attempt(base_url, registrant_data, timeslot_data, captcha_code, session_id)
+            _record_captcha_outcome(solver_name, result)
             
             # Check if this was a CAPTCHA error (retryable)
             if _is_captcha_error(result):
                 if attempt < max_retries:
                     logger.warning(f"CAPTCHA error detected (attempt {attempt + 1}/{max_retries + 1}). Retrying with new CAPTCHA...")
-                    time.sleep(0.2)  # Brief delay between attempts
+                    _pause(0.2, cancel_event)  # Brief delay between attempts
                     continue
                 else:
                     result['error'] = 'Maximum CAPTCHA retry attempts exceeded'
@@ -146,6 +178,7 @@ def send_registration_request_with_retry(base_url: str, registrant_data: dict, t
             # Check if this was a reservation error (non-retryable)
             elif _is_reservation_error(result):
                 result['error'] = 'Reservation error - slot no longer available'
+                result['reservation_error'] = True
                 result['attempt'] = attempt + 1
                 result['max_retries'] = max_retries
                 logger.info(f"Reservation error detected - slot unavailable, not retrying")
@@ -159,7 +192,7 @@ def send_registration_request_with_retry(base_url: str, registrant_data: dict, t
         except Exception as e:
             if attempt < max_retries:
                 logger.error(f"Unexpected error on attempt {attempt + 1}: {e}. Retrying...")
-                time.sleep(1)
+                _pause(1, cancel_event)
                 continue
             else:
                 return {
@@ -177,6 +210,183 @@ def send_registration_request_with_retry(base_url: str, registrant_data: dict, t
     }
 
 
+
+def _pause(seconds: float, cancel_event=None):
+    """Sleep between attempts, waking early when the cancel event is set."""
+    if cancel_event is None:
+        time.sleep(seconds)
+    else:
+        cancel_event.wait(seconds)
+
+
+def acquire_solved_captcha(base_url: str) -> dict:
+    """
+    Start a new session and solve its CAPTCHA.
+    
+    Args:
+        base_url (str): Base URL of the appointment system
+        
+    Returns:
+        dict: Response with success status, session_id, captcha_code and monotonic created_at
+    """
+    captcha_data = get_session_and_captcha(base_url)
+    if not captcha_data['success']:
+        return {
+            'success': False,
+            'error': f'Failed to fetch CAPTCHA: {captcha_data.get("error", "Unknown error")}'
+        }
+    
+    captcha_solution = solve_capcha_base64(captcha_data['image_base64'])
+    if not captcha_solution.get('result'):
+        return {
+            'success': False,
+            'error': f'CAPTCHA solving failed: {captcha_solution}'
+        }
+    
+    return {
+        'success': True,
+        'session_id': captcha_data['session_id'],
+        'captcha_code': captcha_solution['result'],
+        'solver': captcha_solution.get('solver'),
+        'created_at': time.monotonic()
+    }
+
+
+def send_registration_request_speculative(base_url: str, registrant_data: dict, timeslot_data: dict,
+                                          parallel: int = 3, max_retries: int = 12, captcha_pool=None,
+                                          executor=None, cancel_event=None):
+    """
+    Send registration request while solving several CAPTCHAs speculatively in parallel.
+    
+    Up to `parallel` independent sessions are acquired and solved concurrently. The first
+    solved one is submitted; on a CAPTCHA miss the next already-solved session is submitted
+    immediately instead of starting a new serial fetch/solve round. Outstanding solves are
+    cancelled once the outcome is known, and any that still finish are returned to the pool.
+    
+    Args:
+        base_url (str): Base URL of the appointment system
+        registrant_data (dict): Personal information (same as send_registration_request)
+        timeslot_data (dict): Appointment slot (same as send_registration_request)
+        parallel (int): Number of CAPTCHAs solved concurrently
+        max_retries (int): Maximum number of retry attempts
+        captcha_pool (CaptchaPrefetchPool, optional): Pool used first and refilled with leftovers
+        executor (Executor, optional): Shared pool to solve on; a private one is created per call if None
+        cancel_event (threading.Event, optional): When set, waiting for solves stops and no further
+                                          CAPTCHA is submitted; a request already sent runs to completion.
+    
+    Returns:
+        dict: Response with success status, details, and retry information
+    """
+    max_attempts = max_retries + 1
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="CaptchaSpeculative")
+    pending = set()
+    ready = deque()
+    finished = False
+    launched = 0
+    attempt = 0
+    last_error = 'All retry attempts failed'
+    
+    recycle_lock = threading.Lock()
+    recycled = set()
+    
+    def recycle(future):
+        # Solves left over once the outcome is known go back to the pool (each exactly once)
+        with recycle_lock:
+            if not finished or future in recycled:
+                return
+            recycled.add(future)
+        if captcha_pool and not future.cancelled() and future.exception() is None:
+            solved = future.result()
+            if solved['success']:
+                captcha_pool.put(solved)
+    
+    def launch():
+        nonlocal launched
+        while (len(pending) < parallel and len(pending) + len(ready) < max_attempts - attempt
+               and launched < max_attempts + parallel):
+            future = executor.submit(acquire_solved_captcha, base_url)
+            future.add_done_callback(recycle)
+            pending.add(future)
+            launched += 1
+    
+    try:
+        while attempt < max_attempts:
+            if cancel_event is not None and cancel_event.is_set():
+                return _cancelled_result(attempt, max_retries)
+            
+            if not ready and captcha_pool:
+                prefetched = captcha_pool.take()
+                if prefetched:
+                    ready.append(prefetched)
+            
+            if not ready:
+                launch()
+                if not pending:
+                    break
+                # Poll so a cancellation is noticed while solves are outstanding
+                done, _ = wait(pending, timeout=None if cancel_event is None else 0.1,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    try:
+                        solved = future.result()
+                    except Exception as e:
+                        solved = {'success': False, 'error': f'Unexpected error: {str(e)}'}
+                    if solved['success']:
+                        ready.append(solved)
+                    else:
+                        last_error = solved['error']
+                continue
+            
+            candidate = ready.popleft()
+            attempt += 1
+            launch()  # Keep solving in the background while this one is submitted
+            
+            result = _send_registration_attempt(base_url, registrant_data, timeslot_data,
+                                                candidate['captcha_code'], candidate['session_id'])
+            _record_captcha_outcome(candidate.get('solver'), result)
+            result['attempt'] = attempt
+            result['max_retries'] = max_retries
+            
+            if _is_captcha_error(result):
+                if attempt < max_attempts:
+                    logger.warning(f"CAPTCHA error detected (attempt {attempt}/{max_attempts}). Submitting next solved CAPTCHA...")
+                    continue
+                result['error'] = 'Maximum CAPTCHA retry attempts exceeded'
+                return result
+            
+            if _is_reservation_error(result):
+                result['error'] = 'Reservation error - slot no longer available'
+                result['reservation_error'] = True
+                logger.info(f"Reservation error detected - slot unavailable, not retrying")
+            
+            return result
+        
+        return {
+            'success': False,
+            'error': last_error,
+            'attempt': attempt,
+            'max_retries': max_retries
+        }
+    
+    finally:
+        with recycle_lock:
+            finished = True
+        if owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for future in pending:
+                future.cancel()
+        # Solves that finished before the outcome was known skipped recycling in their callback
+        for future in pending:
+            if future.done():
+                recycle(future)
+        if captcha_pool:
+            for solved in ready:
+                captcha_pool.put(solved)
+
 def _send_registration_attempt(base_url: str, registrant_data: dict, timeslot_data: dict, captcha_code: str, session_id: str = None):
     """
     Internal function to send a single registration attempt.
@@ -219,12 +429,13 @@ def _send_registration_attempt(base_url: str, registrant_data: dict, timeslot_da
     }
     
     try:
-        response = requests.post(url, 
-                               data=payload,
-                               cookies=cookies,
-                               headers=headers,
-                               timeout=30,
-                               allow_redirects=True)
+        get_rate_limiter('send', base_url).acquire()
+        response = get_http_client().post(url, 
+                                          data=payload,
+                                          cookies=cookies,
+                                          headers=headers,
+                                          timeout=30,
+                                          allow_redirects=True)
         
         # Parse response
         result = {
@@ -310,6 +521,19 @@ def _is_captcha_error(result: dict) -> bool:
     return any(phrase in response_text for phrase in captcha_error_phrases)
 
 
+def _record_captcha_outcome(solver_name: str, result: dict):
+    """
+    Feed send.php's verdict on a solved code back to the solver metrics.
+    
+    Args:
+        solver_name (str): Solver that produced the code (None if unknown)
+        result (dict): Response from _send_registration_attempt
+    """
+    # Without a response page the server never judged the code
+    if solver_name and result.get('response_text'):
+        get_solver_router().record_outcome(solver_name, not _is_captcha_error(result))
+
+
 def _is_reservation_error(result: dict) -> bool:
     """
     Check if the response indicates a reservation error (slot no longer available).
@@ -361,7 +585,8 @@ def get_captcha_image(base_url: str, session_id: str) -> dict:
     }
     
     try:
-        response = requests.get(captcha_url, headers=headers, cookies=cookies, timeout=10)
+        get_rate_limiter('securimage', base_url).acquire()
+        response = get_http_client().get(captcha_url, headers=headers, cookies=cookies)
         
         if response.status_code == 200:
             # Convert image to base64
@@ -385,6 +610,60 @@ def get_captcha_image(base_url: str, session_id: str) -> dict:
         }
 
 
+
+def get_session_and_captcha(base_url: str, session_id: str = None) -> dict:
+    """
+    Obtain a PHPSESSID and its CAPTCHA image from a single securimage request.
+    
+    Visiting the CAPTCHA endpoint both issues the session cookie and stores the
+    code for that session, so the image from the same response is the one to solve.
+    
+    Args:
+        base_url (str): Base URL of the appointment system
+        session_id (str, optional): Existing PHPSESSID to reuse. If None, a new session is started.
+        
+    Returns:
+        dict: Response with success status, session_id and base64 image data
+    """
+    captcha_url = f"{base_url}securimage/securimage_show.php" if base_url.endswith('/') else f"{base_url}/securimage/securimage_show.php"
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Referer': base_url
+    }
+    
+    cookies = {'PHPSESSID': session_id} if session_id else {}
+    
+    try:
+        get_rate_limiter('securimage', base_url).acquire()
+        response = get_http_client().get(captcha_url, headers=headers, cookies=cookies)
+        
+        if response.status_code != 200:
+            return {
+                'success': False,
+                'error': f'HTTP error {response.status_code}'
+            }
+        
+        session_id = response.cookies.get('PHPSESSID', session_id)
+        if not session_id:
+            return {
+                'success': False,
+                'error': 'No PHPSESSID cookie in CAPTCHA response'
+            }
+        
+        return {
+            'success': True,
+            'session_id': session_id,
+            'image_base64': base64.b64encode(response.content).decode('ascii'),
+            'content_type': response.headers.get('content-type', 'image/png')
+        }
+        
+    except requests.RequestException as e:
+        return {
+            'success': False,
+            'error': f'Request failed: {str(e)}'
+        }
+
 def parse_success_response(response_text: str) -> dict:
     """
     Parse success response HTML to extract registration details.
@@ -516,7 +795,8 @@ def get_session_id(base_url: str):
     }
     
     try:
-        response = requests.get(captcha_url, headers=headers, timeout=10)
+        get_rate_limiter('securimage', base_url).acquire()
+        response = get_http_client().get(captcha_url, headers=headers)
         if response.status_code == 200 and 'PHPSESSID' in response.cookies:
             return response.cookies['PHPSESSID']
     except requests.RequestException:
@@ -0,0 +1,136 @@
+"""
+Registrant-to-slot assignment engine.
+Matches pending registrants to free slots so that as many registrants as
+possible get a slot. When not everyone can be served, lower registrant IDs
+(higher priority) win, and each registrant gets their desired month before a
+fallback month wherever the matching allows it.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from models import Registrant
+
+
+def _hhmm(value: Optional[str]) -> Optional[str]:
+    """Normalize a time preference to zero-padded HH:MM for string comparison."""
+    return datetime.strptime(value, '%H:%M').strftime('%H:%M') if value else None
+
+
+def target_months_for(registrants: List[Registrant]) -> set:
+    """Months worth monitoring for a set of registrants, including fallback months."""
+    return {month for registrant in registrants for month in registrant.acceptable_months()}
+
+
+def acceptable_slot_indices(registrant: Registrant, slots_by_month: Dict[int, List[int]],
+                            slot_info: List[Tuple[date, int, str]]) -> List[int]:
+    """
+    Slots a registrant accepts, most preferred first.
+
+    Args:
+        registrant: Registrant with optional scheduling preferences
+        slots_by_month: Slot indices per month, each sorted by date and time
+        slot_info: (date, weekday, 'HH:MM') per slot index
+
+    Returns:
+        List[int]: Acceptable slot indices, desired month first, then fallback months in order
+    """
+    months = registrant.acceptable_months()
+    if not (registrant.earliest_date or registrant.latest_date or registrant.preferred_weekdays
+            or registrant.earliest_time or registrant.latest_time):
+        # No constraints besides months (the common case)
+        return [index for month in months for index in slots_by_month.get(month, ())]
+
+    earliest_time = _hhmm(registrant.earliest_time)
+    latest_time = _hhmm(registrant.latest_time)
+    weekdays = set(registrant.preferred_weekdays) if registrant.preferred_weekdays else None
+
+    candidates = []
+    for month in months:
+        for index in slots_by_month.get(month, ()):
+            slot_date, weekday, slot_time = slot_info[index]
+            if registrant.earliest_date and slot_date < registrant.earliest_date:
+                continue
+            if registrant.latest_date and slot_date > registrant.latest_date:
+                continue
+            if weekdays is not None and weekday not in weekdays:
+                continue
+            if earliest_time and slot_time < earliest_time:
+                continue
+            if latest_time and slot_time > latest_time:
+                continue
+            candidates.append(index)
+    return candidates
+
+
+def assign_registrants_to_slots(registrants: List[Registrant],
+                                slots: List[Dict[str, Any]]) -> List[Tuple[Registrant, Dict[str, Any]]]:
+    """
+    Compute a maximum priority-respecting matching of registrants to slots.
+
+    Registrants are inserted in priority order with augmenting paths (Kuhn's
+    algorithm). A new registrant first takes a free acceptable slot; only if
+    none is left may already matched registrants be moved to another slot they
+    accept. Matched registrants are never dropped, so the matched set is the
+    best possible by priority and as large as possible.
+
+    Args:
+        registrants: Pending registrants (lower ID = higher priority)
+        slots: Slot dictionaries with 'date' (YYYY-MM-DD) and 'time' (HH:MM)
+
+    Returns:
+        List[Tuple[Registrant, dict]]: (registrant, slot) assignments in priority order
+    """
+    if not registrants or not slots:
+        return []
+
+    slot_info = []
+    slots_by_month: Dict[int, List[int]] = {}
+    for index, slot in enumerate(slots):
+        slot_date = date.fromisoformat(slot['date'])
+        slot_info.append((slot_date, slot_date.weekday(), slot['time']))
+        slots_by_month.setdefault(slot_date.month, []).append(index)
+    for indices in slots_by_month.values():
+        indices.sort(key=lambda i: (slot_info[i][0], slot_info[i][2]))
+
+    ordered = sorted(registrants, key=lambda r: (r.id is None, r.id or 0))
+    # Acceptable slots are computed per registrant when reached; once every slot is
+    # matched the remaining (lower priority) registrants are never evaluated
+    edges: List[List[int]] = []
+    slot_owner = [-1] * len(slots)
+
+    def augment(registrant_index: int, visited: set) -> bool:
+        candidates = edges[registrant_index]
+        for slot_index in candidates:
+            if slot_owner[slot_index] == -1:
+                slot_owner[slot_index] = registrant_index
+                return True
+        for slot_index in candidates:
+            if slot_index not in visited:
+                visited.add(slot_index)
+                if augment(slot_owner[slot_index], visited):
+                    slot_owner[slot_index] = registrant_index
+                    return True
+        return False
+
+    # Slots reached by a failed search form a closed set of matched slots whose owners
+    # accept nothing outside it; no later augmenting path can pass through them
+    dead: set = set()
+    matched = 0
+    for registrant_index, registrant in enumerate(ordered):
+        if matched == len(slots):
+            break
+        candidates = acceptable_slot_indices(registrant, slots_by_month, slot_info)
+        edges.append(candidates)
+        if not candidates:
+            continue
+        visited = set(dead)
+        if augment(registrant_index, visited):
+            matched += 1
+        else:
+            dead = visited
+
+    assignments = sorted(
+        (owner, slot_index) for slot_index, owner in enumerate(slot_owner) if owner != -1
+    )
+    return [(ordered[owner], slots[slot_index]) for owner, slot_index in assignments]
@@ -1,36 +1,8 @@
-import requests
-import base64
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-USER_ID = os.environ.get("USER_ID")
-KEY = os.environ.get("KEY")
+from solver_router import get_solver_router
 
 
 def solve_capcha_file(file_path:str):
-    with open(file_path, "rb") as image_file:
-        encoded_string = base64.b64encode(image_file.read()).decode('ascii')
-        url = 'https://api.apitruecaptcha.org/one/gettext'
-
-        data = { 
-            'userid':f'{USER_ID}', 
-            'apikey':f'{KEY}',  
-            'data':encoded_string
-        }
-        response = requests.post(url = url, json = data)
-        data = response.json()
-        return data
+    return get_solver_router().solve_file(file_path)
     
 def solve_capcha_base64(base_64_capcha:str):
-    url = 'https://api.apitruecaptcha.org/one/gettext'
-
-    data = { 
-        'userid':f'{USER_ID}', 
-        'apikey':f'{KEY}',  
-        'data':base_64_capcha
-    }
-    response = requests.post(url = url, json = data)
-    data = response.json()
-    return data
-    
\ No newline at end of file
+    return get_solver_router().solve(base_64_capcha)
@@ -0,0 +1,175 @@
+"""
+Pre-warmed session and CAPTCHA pool for instant registration submission.
+Keeps a few solved (PHPSESSID, captcha_code) pairs ready in the background so a
+detected slot can be submitted with a single send.php POST.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+from ajax2py import acquire_solved_captcha
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CaptchaPrefetchPool:
+    """
+    Background pool of pre-solved CAPTCHA sessions for one office server.
+
+    Entries expire after ttl seconds because securimage codes live in the
+    PHP session. Refilling only happens while the pool is active, so no
+    solver credits are spent when there is nobody to register.
+    """
+
+    def __init__(self, base_url: str, size: int = 2, ttl: float = 240.0, refill_interval: float = 1.0):
+        """
+        Initialize prefetch pool.
+
+        Args:
+            base_url: Base URL of the appointment system
+            size: Number of solved sessions to keep ready
+            ttl: Seconds after which a solved session is discarded
+            refill_interval: Seconds between pool checks when full or inactive
+        """
+        self.base_url = base_url
+        self.size = size
+        self.ttl = ttl
+        self.refill_interval = refill_interval
+
+        self._entries = deque()
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            'prefetched': 0,
+            'served': 0,
+            'misses': 0,
+            'expired': 0,
+            'failures': 0,
+            'recycled': 0
+        }
+
+    def start(self):
+        """Start the background refill thread."""
+        if self.size <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refill_loop,
+            name=f"CaptchaPrefetch-{urlsplit(self.base_url).netloc}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Stop refilling and drop all prepared sessions.
+
+        Args:
+            wait: Wait (up to 2 seconds) for an in-flight CAPTCHA fetch to finish
+        """
+        self._stop_event.set()
+        self._active.set()  # Wake the loop if it is parked while inactive
+        if self._thread:
+            if wait:
+                self._thread.join(timeout=2.0)
+            self._thread = None
+        with self._lock:
+            self._entries.clear()
+        self._active.clear()
+
+    def set_active(self, active: bool):
+        """Enable or pause background refilling."""
+        if active:
+            self._active.set()
+        else:
+            self._active.clear()
+
+    def take(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest non-expired solved session.
+
+        Returns:
+            Optional[dict]: Entry with 'session_id' and 'captcha_code', or None if pool is empty
+        """
+        with self._lock:
+            self._prune()
+            if self._entries:
+                self._stats['served'] += 1
+                return self._entries.popleft()
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, entry: Dict[str, Any]):
+        """
+        Return an unused solved session to the pool.
+
+        Args:
+            entry: Entry with 'session_id', 'captcha_code' and monotonic 'created_at'
+        """
+        with self._lock:
+            if entry['created_at'] < time.monotonic() - self.ttl:
+                return
+            # Keep entries ordered by age so pruning can stop at the first fresh one
+            self._entries = deque(sorted([*self._entries, entry], key=lambda e: e['created_at']))
+            self._stats['recycled'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            stats = self._stats.copy()
+            stats['ready'] = len(self._entries)
+        return stats
+
+    def _prune(self):
+        """Drop expired entries (caller holds the lock)."""
+        cutoff = time.monotonic() - self.ttl
+        while self._entries and self._entries[0]['created_at'] < cutoff:
+            self._entries.popleft()
+            self._stats['expired'] += 1
+
+    def _acquire_entry(self) -> Optional[Dict[str, Any]]:
+        """Fetch a new session and CAPTCHA and solve it."""
+        solved = acquire_solved_captcha(self.base_url)
+        return solved if solved['success'] else None
+
+    def _refill_loop(self):
+        """Keep the pool topped up while active."""
+        backoff = self.refill_interval
+        while not self._stop_event.is_set():
+            if not self._active.is_set():
+                self._active.wait(timeout=self.refill_interval)
+                continue
+
+            with self._lock:
+                self._prune()
+                missing = self.size - len(self._entries)
+
+            if missing <= 0:
+                self._stop_event.wait(timeout=self.refill_interval)
+                continue
+
+            try:
+                entry = self._acquire_entry()
+            except Exception as e:
+                logger.debug(f"CAPTCHA prefetch error: {e}")
+                entry = None
+
+            if entry and self._stop_event.is_set():
+                break
+            if entry:
+                with self._lock:
+                    self._entries.append(entry)
+                    self._stats['prefetched'] += 1
+                backoff = self.refill_interval
+            else:
+                with self._lock:
+                    self._stats['failures'] += 1
+                # Back off on repeated failures, capped at 30 seconds
+                self._stop_event.wait(timeout=backoff)
+                backoff = min(backoff * 2, 30.0)
@@ -0,0 +1,448 @@
+"""
+Pluggable CAPTCHA solver backends.
+TrueCaptchaSolver calls the apitruecaptcha.org API, LocalCaptchaSolver is an
+in-process template classifier that solves securimage-style images in a few
+milliseconds without network access.
+
+No local model ships with the bot: templates trained on mock server images
+do not recognise real securimage CAPTCHAs. Train on labelled real images
+(LOCAL_CAPTCHA_LABELS) and check the benchmark accuracy on images that were
+not used for training before enabling the local backend.
+
+Usage:
+    python captcha_solvers.py train [count]             # train local model on mock server (+ LOCAL_CAPTCHA_LABELS) images
+    python captcha_solvers.py benchmark [solver] [dir]  # latency and accuracy on labelled samples (default cap_img/)
+"""
+
+import abc
+import base64
+import io
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from PIL import Image, ImageChops
+
+from http_client import get_http_client
+from logging_config import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+TRUECAPTCHA_URL = 'https://api.apitruecaptcha.org/one/gettext'
+
+# Glyph bitmap size used by the local classifier (width, height)
+GLYPH_SIZE = (10, 14)
+
+# Optional file in an image directory mapping file name to solution text
+LABELS_FILE = 'labels.json'
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+
+class CaptchaSolver(abc.ABC):
+    """
+    Base class for CAPTCHA solvers.
+
+    solve() returns a dict with the recognised text under 'result' (empty on
+    failure), matching the apitruecaptcha response shape callers rely on.
+    """
+
+    name = 'base'
+
+    @abc.abstractmethod
+    def solve(self, image_base64: str) -> Dict[str, Any]:
+        """
+        Solve a CAPTCHA image.
+
+        Args:
+            image_base64: Base64-encoded image data
+
+        Returns:
+            dict: Solution with 'result' and 'solver' keys
+        """
+
+    def available(self) -> bool:
+        """Whether the solver is configured and can be used."""
+        return True
+
+    def solve_file(self, file_path: str) -> Dict[str, Any]:
+        """Solve a CAPTCHA image stored on disk."""
+        with open(file_path, 'rb') as image_file:
+            return self.solve(base64.b64encode(image_file.read()).decode('ascii'))
+
+
+class TrueCaptchaSolver(CaptchaSolver):
+    """Remote solver backed by the apitruecaptcha.org API."""
+
+    name = 'truecaptcha'
+
+    def __init__(self, user_id: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Initialize remote solver.
+
+        Args:
+            user_id: apitruecaptcha user id (defaults to USER_ID env)
+            api_key: apitruecaptcha key (defaults to KEY env)
+        """
+        self.user_id = user_id or os.environ.get("USER_ID")
+        self.api_key = api_key or os.environ.get("KEY")
+
+    def available(self) -> bool:
+        return bool(self.user_id and self.api_key)
+
+    def solve(self, image_base64: str) -> Dict[str, Any]:
+        data = {
+            'userid': f'{self.user_id}',
+            'apikey': f'{self.api_key}',
+            'data': image_base64
+        }
+        response = get_http_client().post(TRUECAPTCHA_URL, json=data)
+        solution = response.json()
+        solution['solver'] = self.name
+        return solution
+
+
+def _ink_mask(image) -> List[List[bool]]:
+    """
+    Mark text pixels of a CAPTCHA image.
+
+    Text is either dark (mock server) or strongly coloured (securimage); the
+    grey noise lines and dots are neither and are dropped.
+    """
+    rgb = image.convert('RGB')
+    width, _ = rgb.size
+    red, green, blue = rgb.split()
+    saturation = ImageChops.subtract(
+        ImageChops.lighter(ImageChops.lighter(red, green), blue),
+        ImageChops.darker(ImageChops.darker(red, green), blue)
+    )
+    # 128 is the solid grey of the distortion lines
+    dark = rgb.convert('L').point(lambda v: 255 if v < 160 and v != 128 else 0)
+    coloured = saturation.point(lambda v: 255 if v > 80 else 0)
+    ink = [bool(v) for v in ImageChops.lighter(dark, coloured).tobytes()]
+    return [ink[y:y + width] for y in range(0, len(ink), width)]
+
+
+def _segment_columns(mask: List[List[bool]], length: int = 0) -> List[Tuple[int, int]]:
+    """Split the ink mask into per-character column ranges, forcing length ranges if given."""
+    height = len(mask)
+    width = len(mask[0]) if height else 0
+    column_ink = [sum(1 for y in range(height) if mask[y][x]) for x in range(width)]
+
+    segments = []
+    start = None
+    for x, ink in enumerate(column_ink + [0]):
+        if ink and start is None:
+            start = x
+        elif not ink and start is not None:
+            # Ignore isolated specks that survived thresholding
+            if sum(column_ink[start:x]) >= 4:
+                segments.append((start, x))
+            start = None
+
+    if not segments:
+        return []
+
+    if length:
+        # Touching characters share a segment and broken ones span several:
+        # split the widest or merge the closest neighbours until lengths agree
+        while len(segments) < length:
+            widest = max(range(len(segments)), key=lambda i: segments[i][1] - segments[i][0])
+            start, end = segments[widest]
+            if end - start < 2:
+                break
+            middle = (start + end) // 2
+            segments[widest:widest + 1] = [(start, middle), (middle, end)]
+        while len(segments) > length:
+            closest = min(range(len(segments) - 1), key=lambda i: segments[i + 1][1] - segments[i][0])
+            segments[closest:closest + 2] = [(segments[closest][0], segments[closest + 1][1])]
+    return segments
+
+
+def _glyph_bits(mask: List[List[bool]], start: int, end: int) -> int:
+    """Crop one character, scale it to GLYPH_SIZE and pack it into an int bitmask."""
+    rows = [y for y in range(len(mask)) if any(mask[y][start:end])]
+    top, bottom = rows[0], rows[-1] + 1
+    glyph = Image.new('L', (end - start, bottom - top), 0)
+    glyph.putdata([255 if mask[y][x] else 0 for y in range(top, bottom) for x in range(start, end)])
+    glyph = glyph.resize(GLYPH_SIZE)
+
+    bits = 0
+    for value in glyph.tobytes():
+        bits = (bits << 1) | (1 if value >= 128 else 0)
+    return bits
+
+
+def extract_glyphs(image, length: int = 0) -> List[int]:
+    """
+    Segment a CAPTCHA image into character bitmaps.
+
+    Args:
+        image: PIL image
+        length: Expected number of characters (0 = as segmented)
+
+    Returns:
+        List[int]: One packed bitmap per detected character, left to right
+    """
+    mask = _ink_mask(image)
+    return [_glyph_bits(mask, start, end) for start, end in _segment_columns(mask, length)]
+
+
+class LocalCaptchaSolver(CaptchaSolver):
+    """
+    In-process nearest-neighbour classifier over character bitmaps.
+
+    Each character is matched to the labelled template with the smallest
+    Hamming distance. Templates come from train_local_model() and are stored
+    as JSON at model_path.
+    """
+
+    name = 'local'
+
+    def __init__(self, model_path: Optional[str] = None, length: Optional[int] = None):
+        """
+        Initialize local solver.
+
+        Args:
+            model_path: Template model JSON (defaults to LOCAL_CAPTCHA_MODEL env)
+            length: CAPTCHA code length (defaults to LOCAL_CAPTCHA_LENGTH env, 0 = variable)
+        """
+        self.model_path = model_path or os.environ.get("LOCAL_CAPTCHA_MODEL", os.path.join("data", "captcha_model.json"))
+        self.length = length if length is not None else int(os.environ.get("LOCAL_CAPTCHA_LENGTH", "6"))
+        self.templates: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def load(self) -> bool:
+        """Load templates from model_path if present."""
+        with self._lock:
+            if self._loaded:
+                return bool(self.templates)
+            self._loaded = True
+            if not os.path.exists(self.model_path):
+                logger.warning(f"⚠️ Local CAPTCHA model not found at {self.model_path}")
+                return False
+            try:
+                with open(self.model_path, 'r', encoding='utf-8') as f:
+                    model = json.load(f)
+                self.templates = [(label, bits) for label, bits in model['templates']]
+                logger.info(f"🧩 Loaded local CAPTCHA model: {len(self.templates)} templates")
+                return True
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Could not load local CAPTCHA model from {self.model_path}: {e}")
+                return False
+
+    def available(self) -> bool:
+        return self.load()
+
+    def save(self):
+        """Persist templates to model_path."""
+        directory = os.path.dirname(self.model_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.model_path, 'w', encoding='utf-8') as f:
+            json.dump({'glyph_size': list(GLYPH_SIZE), 'templates': self.templates}, f)
+
+    def _classify(self, bits: int) -> Tuple[str, int]:
+        """Return the closest template label and its Hamming distance."""
+        best_label, best_distance = '', GLYPH_SIZE[0] * GLYPH_SIZE[1] + 1
+        for label, template in self.templates:
+            distance = (bits ^ template).bit_count()
+            if distance < best_distance:
+                best_label, best_distance = label, distance
+        return best_label, best_distance
+
+    def solve_image(self, image) -> Dict[str, Any]:
+        """Solve a CAPTCHA given as a PIL image."""
+        if not self.load():
+            return {'result': '', 'solver': self.name, 'error': 'No local model'}
+
+        labels = []
+        distances = []
+        for bits in extract_glyphs(image, self.length):
+            label, distance = self._classify(bits)
+            labels.append(label)
+            distances.append(distance)
+
+        if not labels:
+            return {'result': '', 'solver': self.name, 'error': 'No characters found'}
+        return {'result': ''.join(labels), 'solver': self.name, 'distances': distances}
+
+    def solve(self, image_base64: str) -> Dict[str, Any]:
+        try:
+            image = Image.open(io.BytesIO(base64.b64decode(image_base64)))
+        except (ValueError, OSError) as e:
+            return {'result': '', 'solver': self.name, 'error': f'Invalid image: {e}'}
+        return self.solve_image(image)
+
+    def add_sample(self, image, text: str) -> bool:
+        """
+        Add a labelled image to the templates.
+
+        Returns:
+            bool: False if segmentation did not yield one glyph per character
+        """
+        glyphs = extract_glyphs(image, len(text))
+        if len(glyphs) != len(text):
+            return False
+        self.templates.extend(zip(text, glyphs))
+        self._loaded = True
+        return True
+
+
+def load_labels(image_dir: str) -> Dict[str, str]:
+    """
+    Solutions of the images in a directory.
+
+    Read from labels.json ({"file.png": "text"}) when present, otherwise
+    every image is expected to be named after its solution (e.g. zfnwb3.png).
+
+    Args:
+        image_dir: Directory with CAPTCHA images
+
+    Returns:
+        dict: File name -> lower-case solution text
+    """
+    labels_path = os.path.join(image_dir, LABELS_FILE)
+    if os.path.exists(labels_path):
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            return {file_name: text.lower() for file_name, text in json.load(f).items()}
+    return {file_name: os.path.splitext(file_name)[0].lower() for file_name in sorted(os.listdir(image_dir))
+            if file_name.lower().endswith(IMAGE_EXTENSIONS)}
+
+
+def train_local_model(count: int = 1500, model_path: Optional[str] = None,
+                      label_dir: Optional[str] = None) -> LocalCaptchaSolver:
+    """
+    Build the local solver templates.
+
+    Samples are generated with the mock server's create_captcha_image. Real
+    securimage samples can be added through label_dir (see load_labels()).
+
+    Args:
+        count: Number of generated training images
+        model_path: Where to store the model (defaults to LOCAL_CAPTCHA_MODEL env)
+        label_dir: Optional directory of labelled images
+
+    Returns:
+        LocalCaptchaSolver: Trained and saved solver
+    """
+    from mock_server import create_captcha_image, generate_captcha_text
+
+    solver = LocalCaptchaSolver(model_path)
+    used = 0
+    for _ in range(count):
+        text = generate_captcha_text()
+        if solver.add_sample(create_captcha_image(text), text):
+            used += 1
+
+    if label_dir and os.path.isdir(label_dir):
+        for file_name, text in sorted(load_labels(label_dir).items()):
+            with Image.open(os.path.join(label_dir, file_name)) as image:
+                if solver.add_sample(image, text):
+                    used += 1
+
+    solver.save()
+    logger.info(f"🧩 Trained local CAPTCHA model on {used} images: {len(solver.templates)} templates -> {solver.model_path}")
+    return solver
+
+
+def benchmark_solver(solver: CaptchaSolver, image_dir: str = 'cap_img',
+                     labels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Measure solver latency (and accuracy when labels are known) on sample images.
+
+    Args:
+        solver: Solver to benchmark
+        image_dir: Directory with CAPTCHA images
+        labels: Optional mapping of file name to expected text
+
+    Returns:
+        dict: Per-image results and latency summary in milliseconds
+    """
+    labels = labels or {}
+    results = []
+    for file_name in sorted(f for f in os.listdir(image_dir) if f.lower().endswith(IMAGE_EXTENSIONS)):
+        start = time.perf_counter()
+        solution = solver.solve_file(os.path.join(image_dir, file_name))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        expected = labels.get(file_name)
+        results.append({
+            'file': file_name,
+            'result': solution.get('result', ''),
+            'expected': expected,
+            'correct': None if expected is None else solution.get('result', '').lower() == expected.lower(),
+            'ms': round(elapsed_ms, 2)
+        })
+
+    latencies = sorted(r['ms'] for r in results)
+    labelled = [r for r in results if r['correct'] is not None]
+    return {
+        'solver': solver.name,
+        'samples': len(results),
+        'avg_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        'max_ms': latencies[-1] if latencies else 0.0,
+        'accuracy': sum(r['correct'] for r in labelled) / len(labelled) if labelled else None,
+        'results': results
+    }
+
+
+# Global solver instances keyed by name
+SOLVERS = {
+    'truecaptcha': TrueCaptchaSolver,
+    'local': LocalCaptchaSolver,
+}
+_solvers: Dict[str, CaptchaSolver] = {}
+_solvers_lock = threading.Lock()
+
+
+def get_captcha_solver(name: Optional[str] = None) -> CaptchaSolver:
+    """
+    Get a shared solver instance.
+
+    Args:
+        name: Solver name, defaults to CAPTCHA_SOLVER env ('truecaptcha' or 'local');
+              use solver_router.get_solver_router() for 'auto'
+
+    Returns:
+        CaptchaSolver: Shared solver instance
+    """
+    name = (name or os.environ.get("CAPTCHA_SOLVER", "truecaptcha")).lower()
+    if name == 'auto':
+        from solver_router import get_solver_router
+        return get_solver_router()
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown CAPTCHA solver '{name}', expected one of {sorted(SOLVERS)}")
+    solver = _solvers.get(name)
+    if solver is None:
+        with _solvers_lock:
+            solver = _solvers.get(name)
+            if solver is None:
+                solver = SOLVERS[name]()
+                _solvers[name] = solver
+    return solver
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'benchmark'
+    if command == 'train':
+        train_local_model(int(sys.argv[2]) if len(sys.argv) > 2 else 1500,
+                          label_dir=os.environ.get("LOCAL_CAPTCHA_LABELS"))
+    elif command == 'benchmark':
+        image_dir = sys.argv[3] if len(sys.argv) > 3 else 'cap_img'
+        report = benchmark_solver(get_captcha_solver(sys.argv[2] if len(sys.argv) > 2 else None),
+                                  image_dir, load_labels(image_dir))
+        for row in report['results']:
+            verdict = '' if row['correct'] is None else (' ✅' if row['correct'] else f" ❌ expected '{row['expected']}'")
+            print(f"{row['file']}: '{row['result']}' in {row['ms']} ms{verdict}")
+        accuracy = 'n/a (no labels)' if report['accuracy'] is None else f"{report['accuracy']:.0%}"
+        print(f"{report['solver']}: {report['samples']} samples, accuracy {accuracy}, "
+              f"avg {report['avg_ms']} ms, max {report['max_ms']} ms")
+    else:
+        print(__doc__)
@@ -5,11 +5,13 @@ Handles PostgreSQL operations for registrant data management.
 
 import os
 import logging
+import threading
+import time
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 import psycopg2
 from psycopg2.extras import RealDictCursor, execute_values
-from psycopg2 import sql
+from psycopg2 import sql, extensions, pool
 from dotenv import load_dotenv
 
 from models import Registrant, Reservation
@@ -22,51 +24,209 @@ from logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# NOTIFY channel the registrants trigger publishes row changes on, and that trigger's name
+REGISTRANT_CHANNEL = 'registrant_changes'
+REGISTRANT_NOTIFY_TRIGGER = 'registrants_notify_change'
+
+# Days deleted registrant IDs are kept for incremental sync (older watermarks resync fully)
+REGISTRANT_DELETION_RETENTION_DAYS = 7
+
+
+class _PooledConnection(extensions.connection):
+    """Connection that remembers when it was last returned to the pool."""
+    last_used: Optional[float] = None
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of PostgreSQL connections.
+    
+    Wraps psycopg2's ThreadedConnectionPool: callers block while all
+    connections are borrowed instead of failing, connections idle for longer
+    than the health check interval are pinged before reuse, and broken ones
+    are replaced. Connecting is retried with exponential backoff, so a
+    database restart does not fail the monitor.
+    """
+    
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 10, timeout: float = 30.0,
+                 health_check_idle: float = 30.0, connect_retries: int = 3, retry_backoff: float = 0.5):
+        """
+        Initialize pool (connections are opened on first use).
+        
+        Args:
+            dsn: PostgreSQL connection string
+            minconn: Idle connections kept open
+            maxconn: Maximum connections open at once
+            timeout: Seconds to wait for a free connection
+            health_check_idle: Idle seconds after which a connection is pinged before reuse
+            connect_retries: Retries when connecting fails
+            retry_backoff: Initial retry delay in seconds, doubled after each failure
+        """
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_idle = health_check_idle
+        self.connect_retries = connect_retries
+        self.retry_backoff = retry_backoff
+        
+        self._pool: Optional[pool.ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+    
+    def _get_pool(self) -> pool.ThreadedConnectionPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = pool.ThreadedConnectionPool(
+                    self.minconn, self.maxconn, self.dsn,
+                    cursor_factory=RealDictCursor,
+                    connection_factory=_PooledConnection
+                )
+                logger.info(f"✅ Database connection pool ready ({self.minconn}-{self.maxconn} connections)")
+            return self._pool
+    
+    def _is_healthy(self, connection) -> bool:
+        """Check a connection taken from the pool, pinging it if it sat idle."""
+        if connection.closed or connection.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if connection.last_used is None or time.monotonic() - connection.last_used < self.health_check_idle:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+    
+    def getconn(self):
+        """
+        Borrow a healthy connection, waiting for a free one if all are in use.
+        
+        Raises:
+            pool.PoolError: If no connection becomes free within the timeout
+            psycopg2.OperationalError: If the database stays unreachable after all retries
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pool.PoolError(f"No database connection free after {self.timeout}s")
+        
+        delay = self.retry_backoff
+        failures = 0
+        try:
+            while True:
+                try:
+                    connection = self._get_pool().getconn()
+                except psycopg2.OperationalError as e:
+                    if failures >= self.connect_retries:
+                        logger.error(f"❌ Database connection failed: {e}")
+                        raise
+                    failures += 1
+                    logger.warning(f"⚠️ Database connection failed ({failures}/{self.connect_retries}), retrying in {delay:.1f}s: {e}")
+                    time.sleep(delay)
+                    delay *= 2
+                    continue
+                
+                if self._is_healthy(connection):
+                    connection.autocommit = False
+                    return connection
+                logger.warning("⚠️ Discarding broken database connection")
+                self._pool.putconn(connection, close=True)
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def putconn(self, connection):
+        """Return a borrowed connection; broken ones are closed, open transactions rolled back."""
+        try:
+            broken = bool(connection.closed) or \
+                connection.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN
+            connection.last_used = time.monotonic()
+            self._pool.putconn(connection, close=broken)
+        finally:
+            self._slots.release()
+    
+    def close(self):
+        """Close all pooled connections."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+
+# Global connection pool instance
+_global_connection_pool = None
+_global_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """Get global connection pool configured from environment."""
+    global _global_connection_pool
+    if _global_connection_pool is None:
+        with _global_connection_pool_lock:
+            if _global_connection_pool is None:
+                connection_string = os.getenv('DATABASE_URL')
+                if not connection_string:
+                    raise ValueError("DATABASE_URL environment variable not found")
+                _global_connection_pool = ConnectionPool(
+                    connection_string,
+                    minconn=int(os.environ.get("DB_POOL_MIN", "1")),
+                    maxconn=int(os.environ.get("DB_POOL_MAX", "10")),
+                    timeout=float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+                    health_check_idle=float(os.environ.get("DB_HEALTH_CHECK_IDLE", "30")),
+                    connect_retries=int(os.environ.get("DB_CONNECT_RETRIES", "3"))
+                )
+    return _global_connection_pool
+
 
 class DatabaseManager:
     """
     PostgreSQL database manager for registrant data operations.
     
     Handles connection management, table creation, and CRUD operations.
+    Connections are borrowed from the process-wide pool on first use and
+    returned by disconnect() (or on leaving the context manager).
     """
     
+    _schema_ready = False
+    _schema_lock = threading.Lock()
+    
     def __init__(self, auto_create_tables=True):
-        """Initialize database manager with connection from environment."""
-        self.connection_string = os.getenv('DATABASE_URL')
-        if not self.connection_string:
-            raise ValueError("DATABASE_URL environment variable not found")
-        
+        """Initialize database manager using the connection pool from environment."""
+        self.pool = get_connection_pool()
         self.connection = None
-        if auto_create_tables:
-            self._ensure_table_exists()
+        if auto_create_tables and not DatabaseManager._schema_ready:
+            try:
+                self._ensure_table_exists()
+            finally:
+                self.disconnect()
     
     def connect(self):
-        """Establish database connection."""
-        try:
-            self.connection = psycopg2.connect(
-                self.connection_string,
-                cursor_factory=RealDictCursor
-            )
-            self.connection.autocommit = False
-            logger.info("✅ Database connection established")
-        except psycopg2.Error as e:
-            logger.error(f"❌ Database connection failed: {e}")
-            raise
+        """Borrow a connection from the pool."""
+        self.connection = self.pool.getconn()
     
     def disconnect(self):
-        """Close database connection."""
+        """Return the connection to the pool."""
         if self.connection:
-            self.connection.close()
+            self.pool.putconn(self.connection)
             self.connection = None
-            logger.info("Database connection closed")
     
     def _ensure_connection(self):
         """Ensure active database connection."""
-        if not self.connection or self.connection.closed:
+        if self.connection is not None and self.connection.closed:
+            self.disconnect()
+        if self.connection is None:
             self.connect()
     
     def _ensure_table_exists(self):
-        """Create registrants and reservations tables if they don't exist."""
+        """Create registrants and reservations tables if they don't exist (once per process)."""
+        with DatabaseManager._schema_lock:
+            if DatabaseManager._schema_ready:
+                return
+            self._create_tables()
+            DatabaseManager._schema_ready = True
+    
+    def _create_tables(self):
+        """Run the schema DDL."""
         self._ensure_connection()
         
         create_tables_sql = """
@@ -112,16 +272,110 @@ class DatabaseManager:
             CONSTRAINT unique_email UNIQUE (email)
         );
         
+        -- Optional scheduling preferences (added after the initial schema)
+        ALTER TABLE registrants ADD COLUMN IF NOT EXISTS fallback_months INTEGER[];
+        ALTER TABLE registrants ADD COLUMN IF NOT EXISTS earliest_date DATE;
+        ALTER TABLE registrants ADD COLUMN IF NOT EXISTS latest_date DATE;
+        ALTER TABLE registrants ADD COLUMN IF NOT EXISTS preferred_weekdays INTEGER[];
+        ALTER TABLE registrants ADD COLUMN IF NOT EXISTS earliest_time VARCHAR(5);
+        ALTER TABLE registrants ADD COLUMN IF NOT EXISTS latest_time VARCHAR(5);
+        
+        -- Slot claims shared by all replicas: one live claim per registrant and per slot
+        CREATE TABLE IF NOT EXISTS slot_claims (
+            id SERIAL PRIMARY KEY,
+            registrant_id INTEGER NOT NULL REFERENCES registrants(id) ON DELETE CASCADE,
+            slot_key TEXT NOT NULL,
+            replica_id VARCHAR(100) NOT NULL,
+            claimed_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (NOW() AT TIME ZONE 'UTC'),
+            expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            
+            CONSTRAINT unique_claim_registrant UNIQUE (registrant_id),
+            CONSTRAINT unique_claim_slot UNIQUE (slot_key)
+        );
+        
         -- Create indexes for performance
         CREATE INDEX IF NOT EXISTS idx_registrants_email ON registrants(email);
         CREATE INDEX IF NOT EXISTS idx_registrants_reservation ON registrants(reservation);
         CREATE INDEX IF NOT EXISTS idx_registrants_desired_month ON registrants(desired_month);
         CREATE INDEX IF NOT EXISTS idx_registrants_reservation_null ON registrants(reservation) WHERE reservation IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_registrants_updated_at ON registrants(updated_at);
         
         -- Indexes for reservations table
         CREATE INDEX IF NOT EXISTS idx_reservations_appointment_date ON reservations(appointment_date);
         CREATE INDEX IF NOT EXISTS idx_reservations_registration_code ON reservations(registration_code);
         CREATE INDEX IF NOT EXISTS idx_reservations_confirmed_email ON reservations(confirmed_email);
+        
+        CREATE INDEX IF NOT EXISTS idx_slot_claims_expires_at ON slot_claims(expires_at);
+        
+        -- Deleted registrant IDs for incremental sync (get_registrant_changes)
+        CREATE TABLE IF NOT EXISTS registrant_deletions (
+            registrant_id INTEGER PRIMARY KEY,
+            deleted_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_registrant_deletions_deleted_at ON registrant_deletions(deleted_at);
+        
+        -- Stamp every insert and update with the database clock so updated_at is a
+        -- reliable sync watermark, and keep a tombstone for every delete
+        CREATE OR REPLACE FUNCTION track_registrant_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO registrant_deletions (registrant_id, deleted_at)
+                VALUES (OLD.id, clock_timestamp() AT TIME ZONE 'UTC')
+                ON CONFLICT (registrant_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+                DELETE FROM registrant_deletions
+                WHERE deleted_at < (clock_timestamp() AT TIME ZONE 'UTC') - INTERVAL '""" + str(REGISTRANT_DELETION_RETENTION_DAYS) + """ days';
+                RETURN OLD;
+            END IF;
+            NEW.updated_at := clock_timestamp() AT TIME ZONE 'UTC';
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        -- Triggers are created only when missing: re-creating them would lock the table on every start
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                           WHERE tgrelid = 'registrants'::regclass AND tgname = 'registrants_track_change') THEN
+                CREATE TRIGGER registrants_track_change
+                    BEFORE INSERT OR UPDATE OR DELETE ON registrants
+                    FOR EACH ROW EXECUTE FUNCTION track_registrant_change();
+            END IF;
+        EXCEPTION WHEN duplicate_object THEN
+            NULL;  -- Created concurrently by another replica
+        END;
+        $$;
+        
+        -- Publish registrant changes for the in-memory pending registrant cache.
+        -- The row is sent along unless it would exceed the 8000 byte NOTIFY limit.
+        CREATE OR REPLACE FUNCTION notify_registrant_change() RETURNS trigger AS $$
+        DECLARE
+            payload TEXT;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                payload := json_build_object('op', TG_OP, 'id', OLD.id)::text;
+            ELSE
+                payload := json_build_object('op', TG_OP, 'id', NEW.id, 'row', row_to_json(NEW))::text;
+                IF octet_length(payload) > 7900 THEN
+                    payload := json_build_object('op', TG_OP, 'id', NEW.id)::text;
+                END IF;
+            END IF;
+            PERFORM pg_notify('""" + REGISTRANT_CHANNEL + """', payload);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                           WHERE tgrelid = 'registrants'::regclass AND tgname = '""" + REGISTRANT_NOTIFY_TRIGGER + """') THEN
+                CREATE TRIGGER """ + REGISTRANT_NOTIFY_TRIGGER + """
+                    AFTER INSERT OR UPDATE OR DELETE ON registrants
+                    FOR EACH ROW EXECUTE FUNCTION notify_registrant_change();
+            END IF;
+        EXCEPTION WHEN duplicate_object THEN
+            NULL;  -- Created concurrently by another replica
+        END;
+        $$;
         """
         
         try:
@@ -134,78 +388,94 @@ class DatabaseManager:
             self.connection.rollback()
             raise
     
-    def batch_add_registrants(self, registrants: List[Registrant]) -> List[int]:
+    def insert_registrants(self, registrants: List[Registrant]) -> List[Optional[int]]:
         """
-        Add multiple registrants in a specific order with transaction control.
+        Bulk insert registrants in one statement, skipping emails that already exist.
+        
+        Rows are inserted in input order, so IDs (processing priority) follow
+        the input. A repeated email within the batch keeps its first occurrence.
         
         Args:
             registrants (List[Registrant]): List of registrants in desired processing order
             
         Returns:
-            List[int]: List of created registrant IDs in the same order
+            List[Optional[int]]: Per input row, the new registrant ID or None if the email already existed
             
         Raises:
             psycopg2.Error: For database errors (rolls back entire batch)
         """
         self._ensure_connection()
         
+        if not registrants:
+            return []
+        
         insert_sql = """
         INSERT INTO registrants (
             name, surname, citizenship, email, phone, application_type,
-            desired_month, reservation, created_at, updated_at
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        ) RETURNING id;
+            desired_month, fallback_months, earliest_date, latest_date,
+            preferred_weekdays, earliest_time, latest_time,
+            reservation, created_at, updated_at
+        ) VALUES %s
+        ON CONFLICT (email) DO NOTHING
+        RETURNING id, email;
         """
         
-        created_ids = []
-        successful_inserts = 0
-        failed_inserts = 0
+        now = datetime.now()
+        rows = [(
+            registrant.name,
+            registrant.surname,
+            registrant.citizenship.value,
+            registrant.email,
+            registrant.phone,
+            registrant.application_type.value,
+            registrant.desired_month,
+            registrant.fallback_months,
+            registrant.earliest_date,
+            registrant.latest_date,
+            registrant.preferred_weekdays,
+            registrant.earliest_time,
+            registrant.latest_time,
+            registrant.reservation,
+            registrant.created_at or now,
+            registrant.updated_at or now
+        ) for registrant in registrants]
         
         try:
             with self.connection.cursor() as cursor:
-                for i, registrant in enumerate(registrants, 1):
-                    try:
-                        cursor.execute(insert_sql, (
-                            registrant.name,
-                            registrant.surname,
-                            registrant.citizenship.value,
-                            registrant.email,
-                            registrant.phone,
-                            registrant.application_type.value,
-                            registrant.desired_month,
-                            registrant.reservation,
-                            registrant.created_at or datetime.now(),
-                            registrant.updated_at or datetime.now()
-                        ))
-                        
-                        registrant_id = cursor.fetchone()['id']
-                        created_ids.append(registrant_id)
-                        successful_inserts += 1
-                        logger.info(f"✅ {i}/{len(registrants)}: {registrant.name} {registrant.surname} (ID: {registrant_id})")
-                        
-                    except psycopg2.IntegrityError as e:
-                        failed_inserts += 1
-                        if 'unique_email' in str(e):
-                            logger.error(f"❌ {i}/{len(registrants)}: {registrant.name} {registrant.surname} - Email already exists: {registrant.email}")
-                            created_ids.append(None)  # Keep position for order tracking
-                        else:
-                            logger.error(f"❌ {i}/{len(registrants)}: {registrant.name} {registrant.surname} - Integrity error: {e}")
-                            created_ids.append(None)
-                    except psycopg2.Error as e:
-                        failed_inserts += 1
-                        logger.error(f"❌ {i}/{len(registrants)}: {registrant.name} {registrant.surname} - Database error: {e}")
-                        created_ids.append(None)
-                
+                # A single page: the whole batch is one statement and one round-trip
+                returned = execute_values(cursor, insert_sql, rows, page_size=len(rows), fetch=True)
                 self.connection.commit()
-                
-                logger.info(f"📊 Batch insert summary: ✅ {successful_inserts} successful, ❌ {failed_inserts} failed")
-                return [id for id in created_ids if id is not None]  # Return only successful IDs
-                
         except psycopg2.Error as e:
             self.connection.rollback()
             logger.error(f"❌ Batch insert failed: {e}")
             raise
+        
+        created = {row['email']: row['id'] for row in returned}
+        return [created.pop(registrant.email, None) for registrant in registrants]
+    
+    def batch_add_registrants(self, registrants: List[Registrant]) -> List[int]:
+        """
+        Add multiple registrants in a specific order with transaction control.
+        
+        Args:
+            registrants (List[Registrant]): List of registrants in desired processing order
+            
+        Returns:
+            List[int]: List of created registrant IDs in the same order
+            
+        Raises:
+            psycopg2.Error: For database errors (rolls back entire batch)
+        """
+        outcomes = self.insert_registrants(registrants)
+        
+        skipped = [registrant.email for registrant, registrant_id in zip(registrants, outcomes) if registrant_id is None]
+        if skipped:
+            shown = ', '.join(skipped[:10]) + (f" and {len(skipped) - 10} more" if len(skipped) > 10 else "")
+            logger.error(f"❌ Email already exists, skipped {len(skipped)} registrants: {shown}")
+        
+        created_ids = [registrant_id for registrant_id in outcomes if registrant_id is not None]
+        logger.info(f"📊 Batch insert summary: ✅ {len(created_ids)} successful, ❌ {len(skipped)} failed")
+        return created_ids
 
     def add_registrant(self, registrant: Registrant) -> int:
         """
@@ -226,9 +496,11 @@ class DatabaseManager:
         insert_sql = """
         INSERT INTO registrants (
             name, surname, citizenship, email, phone, application_type,
-            desired_month, reservation, created_at, updated_at
+            desired_month, fallback_months, earliest_date, latest_date,
+            preferred_weekdays, earliest_time, latest_time,
+            reservation, created_at, updated_at
         ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
         ) RETURNING id;
         """
         
@@ -242,6 +514,12 @@ class DatabaseManager:
                     registrant.phone,
                     registrant.application_type.value,
                     registrant.desired_month,
+                    registrant.fallback_months,
+                    registrant.earliest_date,
+                    registrant.latest_date,
+                    registrant.preferred_weekdays,
+                    registrant.earliest_time,
+                    registrant.latest_time,
                     registrant.reservation,
                     registrant.created_at or datetime.now(),
                     registrant.updated_at or datetime.now()
@@ -356,6 +634,145 @@ class DatabaseManager:
             logger.error(f"❌ Failed to get pending registrants: {e}")
             raise
     
+    def get_registrant_changes(self, since: Optional[datetime] = None, overlap: float = 30.0) -> Dict[str, Any]:
+        """
+        Get registrants changed since a watermark, for incremental sync of a pending set.
+        
+        updated_at is stamped by the database on every insert and update, and
+        deletes leave a tombstone, so only changed rows are read. Rows changed
+        within `overlap` seconds before the watermark are returned again, which
+        covers transactions that committed after a previous sync read past
+        them; applying a change twice is harmless.
+        
+        Args:
+            since (Optional[datetime]): Watermark returned by the previous call (None for a full load)
+            overlap (float): Seconds re-read before the watermark
+            
+        Returns:
+            Dict[str, Any]: 'full' (True if this is a complete pending set), 'pending'
+                (changed registrants still pending), 'removed' (IDs registered or deleted)
+                and 'watermark' for the next call
+        """
+        self._ensure_connection()
+        
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT clock_timestamp() AT TIME ZONE 'UTC' AS now;")
+                watermark = cursor.fetchone()['now']
+                
+                # Tombstones older than the retention are gone: resync completely
+                full = since is None or watermark - since >= timedelta(days=REGISTRANT_DELETION_RETENTION_DAYS - 1)
+                if full:
+                    cursor.execute("SELECT * FROM registrants WHERE reservation IS NULL ORDER BY id ASC;")
+                    rows = cursor.fetchall()
+                    removed = []
+                else:
+                    after = since - timedelta(seconds=overlap)
+                    cursor.execute("SELECT * FROM registrants WHERE updated_at >= %s ORDER BY id ASC;", (after,))
+                    rows = cursor.fetchall()
+                    cursor.execute("SELECT registrant_id FROM registrant_deletions WHERE deleted_at >= %s;", (after,))
+                    removed = [row['registrant_id'] for row in cursor.fetchall()]
+                self.connection.commit()
+                
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            logger.error(f"❌ Failed to get registrant changes: {e}")
+            raise
+        
+        pending = []
+        for row in rows:
+            if row['reservation'] is None:
+                pending.append(Registrant.from_dict(dict(row)))
+            else:
+                removed.append(row['id'])
+        
+        return {
+            'full': full,
+            'pending': pending,
+            'removed': removed,
+            'watermark': watermark
+        }
+    
+    RESERVATION_INSERT_SQL = """
+    INSERT INTO reservations (
+        id, appointment_date, appointment_time, appointment_datetime, room,
+        registration_code, confirmed_name, confirmed_surname, confirmed_email,
+        confirmed_phone, confirmed_citizenship, confirmed_application_type,
+        created_at, updated_at
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )"""
+    
+    def _reservation_params(self, reservation_id: str, success_data: Optional[dict] = None) -> tuple:
+        """
+        Build RESERVATION_INSERT_SQL parameters from registration success data.
+        
+        Args:
+            reservation_id (str): Unique reservation ID
+            success_data (Optional[dict]): Success data from registration response
+            
+        Returns:
+            tuple: Insert parameters (appointment columns are None without success data)
+        """
+        now = datetime.now()
+        if not success_data:
+            # Simple reservation (backward compatibility)
+            return (reservation_id,) + (None,) * 11 + (now, now)
+        
+        # Parse datetime if provided as string (Polish timezone - no automatic conversion)
+        appointment_datetime = None
+        if success_data.get('appointment_datetime'):
+            try:
+                # Parse as naive datetime and keep it naive (no timezone conversion)
+                naive_dt = datetime.strptime(
+                    success_data['appointment_datetime'], 
+                    '%Y-%m-%d %H:%M'
+                )
+                appointment_datetime = naive_dt
+            except ValueError:
+                logger.warning(f"Invalid datetime format: {success_data['appointment_datetime']}")
+        
+        # Parse appointment_time if provided as string
+        appointment_time = None
+        if success_data.get('appointment_time'):
+            try:
+                # Handle both HH:MM and H:MM formats
+                time_str = success_data['appointment_time'].strip()
+                if ':' in time_str:
+                    appointment_time = datetime.strptime(time_str, '%H:%M').time()
+                else:
+                    logger.warning(f"Time format missing colon: {time_str}")
+            except (ValueError, AttributeError) as e:
+                logger.warning(f"Invalid time format '{success_data.get('appointment_time')}': {e}")
+        
+        # Parse appointment_date if provided as string
+        appointment_date = None
+        if success_data.get('appointment_date'):
+            try:
+                appointment_date = datetime.strptime(
+                    success_data['appointment_date'], 
+                    '%Y-%m-%d'
+                ).date()
+            except ValueError:
+                logger.warning(f"Invalid date format: {success_data['appointment_date']}")
+        
+        return (
+            reservation_id,
+            appointment_date,
+            appointment_time,
+            appointment_datetime,
+            success_data.get('room'),
+            success_data.get('registration_code'),
+            success_data.get('name'),
+            success_data.get('surname'),
+            success_data.get('email'),
+            success_data.get('phone'),
+            success_data.get('citizenship'),
+            success_data.get('application_type'),
+            now,
+            now
+        )
+    
     def create_reservation(self, reservation_id: str, success_data: Optional[dict] = None) -> bool:
         """
         Create a new reservation record with optional success data.
@@ -371,79 +788,11 @@ class DatabaseManager:
         """
         self._ensure_connection()
         
-        if success_data:
-            # Parse datetime if provided as string (Polish timezone - no automatic conversion)
-            appointment_datetime = None
-            if success_data.get('appointment_datetime'):
-                try:
-                    # Parse as naive datetime and keep it naive (no timezone conversion)
-                    naive_dt = datetime.strptime(
-                        success_data['appointment_datetime'], 
-                        '%Y-%m-%d %H:%M'
-                    )
-                    appointment_datetime = naive_dt
-                except ValueError:
-                    logger.warning(f"Invalid datetime format: {success_data['appointment_datetime']}")
-            
-            # Parse appointment_time if provided as string
-            appointment_time = None
-            if success_data.get('appointment_time'):
-                try:
-                    # Handle both HH:MM and H:MM formats
-                    time_str = success_data['appointment_time'].strip()
-                    if ':' in time_str:
-                        appointment_time = datetime.strptime(time_str, '%H:%M').time()
-                    else:
-                        logger.warning(f"Time format missing colon: {time_str}")
-                except (ValueError, AttributeError) as e:
-                    logger.warning(f"Invalid time format '{success_data.get('appointment_time')}': {e}")
-            
-            # Parse appointment_date if provided as string
-            appointment_date = None
-            if success_data.get('appointment_date'):
-                try:
-                    appointment_date = datetime.strptime(
-                        success_data['appointment_date'], 
-                        '%Y-%m-%d'
-                    ).date()
-                except ValueError:
-                    logger.warning(f"Invalid date format: {success_data['appointment_date']}")
-            
-            insert_sql = """
-            INSERT INTO reservations (
-                id, appointment_date, appointment_time, appointment_datetime, room,
-                registration_code, confirmed_name, confirmed_surname, confirmed_email,
-                confirmed_phone, confirmed_citizenship, confirmed_application_type,
-                created_at, updated_at
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            );
-            """
-            
-            params = (
-                reservation_id,
-                appointment_date,
-                appointment_time,
-                appointment_datetime,
-                success_data.get('room'),
-                success_data.get('registration_code'),
-                success_data.get('name'),
-                success_data.get('surname'),
-                success_data.get('email'),
-                success_data.get('phone'),
-                success_data.get('citizenship'),
-                success_data.get('application_type'),
-                datetime.now(),
-                datetime.now()
-            )
-        else:
-            # Simple reservation creation (backward compatibility)
-            insert_sql = "INSERT INTO reservations (id, created_at, updated_at) VALUES (%s, %s, %s);"
-            params = (reservation_id, datetime.now(), datetime.now())
+        params = self._reservation_params(reservation_id, success_data)
         
         try:
             with self.connection.cursor() as cursor:
-                cursor.execute(insert_sql, params)
+                cursor.execute(self.RESERVATION_INSERT_SQL + ";", params)
                 self.connection.commit()
                 
                 if success_data:
@@ -461,52 +810,162 @@ class DatabaseManager:
             logger.error(f"❌ Failed to create reservation: {e}")
             raise
     
-    def assign_reservation_to_registrant(self, registrant_id: int, reservation_id: str) -> bool:
+    def assign_reservation_to_registrant(self, registrant_id: int, reservation_id: str,
+                                         success_data: Optional[dict] = None) -> bool:
         """
-        Assign a reservation to a registrant.
+        Create a reservation (unless it exists) and assign it to a registrant atomically.
+        
+        A single statement inserts the reservation and links the registrant,
+        so a booking is recorded in one round-trip and a failure can never
+        leave a reservation without its registrant.
         
         Args:
             registrant_id (int): Registrant ID
             reservation_id (str): Reservation ID  
+            success_data (Optional[dict]): Success data from registration response
             
         Returns:
             bool: True if update successful, False if registrant not found
         """
         self._ensure_connection()
         
-        # First ensure reservation exists
-        self.create_reservation(reservation_id)
-        
-        update_sql = """
+        # The CTE insert runs even though the UPDATE only uses its row count; the
+        # foreign key check at the end of the statement sees the new reservation
+        assign_sql = f"""
+        WITH new_reservation AS (
+            {self.RESERVATION_INSERT_SQL.strip()}
+            ON CONFLICT (id) DO NOTHING
+            RETURNING id
+        )
         UPDATE registrants 
         SET reservation = %s,
             updated_at = %s
-        WHERE id = %s;
+        WHERE id = %s
+        RETURNING (SELECT COUNT(*) FROM new_reservation) AS created;
         """
         
+        params = self._reservation_params(reservation_id, success_data) + (
+            reservation_id,
+            datetime.now(),
+            registrant_id
+        )
+        
         try:
             with self.connection.cursor() as cursor:
-                cursor.execute(update_sql, (
-                    reservation_id,
-                    datetime.now(),
-                    registrant_id
-                ))
-                
-                updated = cursor.rowcount > 0
-                self.connection.commit()
+                cursor.execute(assign_sql, params)
+                row = cursor.fetchone()
                 
-                if updated:
-                    logger.info(f"✅ Assigned reservation {reservation_id} to registrant ID {registrant_id}")
-                else:
+                if not row:
+                    # Registrant not found: roll back so no orphan reservation is left
+                    self.connection.rollback()
                     logger.warning(f"⚠️  Registrant ID {registrant_id} not found for reservation assignment")
+                    return False
                 
-                return updated
+                self.connection.commit()
+                
+                if not row['created']:
+                    logger.warning(f"⚠️  Reservation {reservation_id} already exists")
+                logger.info(f"✅ Assigned reservation {reservation_id} to registrant ID {registrant_id}")
+                return True
                 
         except psycopg2.Error as e:
             self.connection.rollback()
             logger.error(f"❌ Failed to assign reservation: {e}")
             raise
     
+    def claim_slots(self, claims: List[tuple], replica_id: str, ttl: int = 300) -> List[int]:
+        """
+        Claim registrant-slot pairs for a registration attempt across all replicas.
+        
+        Registrant rows are locked with FOR UPDATE SKIP LOCKED, so a registrant
+        another replica is claiming right now is skipped instead of waited for.
+        Unique constraints on slot_claims reject a registrant or slot that
+        already has a live claim. Expired claims (crashed replicas) are removed first.
+        
+        Args:
+            claims (List[tuple]): (registrant_id, slot_key) pairs in priority order
+            replica_id (str): Identifier of the claiming replica
+            ttl (int): Seconds until an unreleased claim expires
+            
+        Returns:
+            List[int]: Registrant IDs whose claim succeeded
+        """
+        self._ensure_connection()
+        
+        if not claims:
+            return []
+        
+        # Expiry uses the database clock so replica clock skew does not matter
+        cleanup_sql = "DELETE FROM slot_claims WHERE expires_at < (NOW() AT TIME ZONE 'UTC');"
+        
+        lock_sql = """
+        SELECT id FROM registrants
+        WHERE id = ANY(%s) AND reservation IS NULL
+        FOR UPDATE SKIP LOCKED;
+        """
+        
+        insert_sql = """
+        INSERT INTO slot_claims (registrant_id, slot_key, replica_id, expires_at)
+        VALUES (%s, %s, %s, (NOW() AT TIME ZONE 'UTC') + make_interval(secs => %s))
+        ON CONFLICT DO NOTHING
+        RETURNING registrant_id;
+        """
+        
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(cleanup_sql)
+                cursor.execute(lock_sql, ([registrant_id for registrant_id, _ in claims],))
+                lockable = {row['id'] for row in cursor.fetchall()}
+                
+                claimed = []
+                for registrant_id, slot_key in claims:
+                    if registrant_id not in lockable:
+                        continue
+                    cursor.execute(insert_sql, (registrant_id, slot_key, replica_id, ttl))
+                    if cursor.fetchone():
+                        claimed.append(registrant_id)
+                
+                self.connection.commit()
+                
+                if len(claimed) < len(claims):
+                    logger.info(f"🔒 Claimed {len(claimed)}/{len(claims)} slots ({len(claims) - len(claimed)} held by other replicas or already registered)")
+                return claimed
+                
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            logger.error(f"❌ Failed to claim slots: {e}")
+            raise
+    
+    def release_slot_claims(self, registrant_ids: List[int], replica_id: str) -> int:
+        """
+        Release claims held by a replica.
+        
+        Args:
+            registrant_ids (List[int]): Registrant IDs whose claims to release
+            replica_id (str): Replica that holds the claims
+            
+        Returns:
+            int: Number of released claims
+        """
+        self._ensure_connection()
+        
+        if not registrant_ids:
+            return 0
+        
+        delete_sql = "DELETE FROM slot_claims WHERE registrant_id = ANY(%s) AND replica_id = %s;"
+        
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(delete_sql, (list(registrant_ids), replica_id))
+                released = cursor.rowcount
+                self.connection.commit()
+                return released
+                
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            logger.error(f"❌ Failed to release slot claims: {e}")
+            raise
+    
     def delete_registrant(self, registrant_id: int) -> bool:
         """
         Delete a registrant from the database.
@@ -631,7 +1090,7 @@ def batch_add_new_registrants(registrants_data: List[dict]) -> List[int]:
         ]
         ids = batch_add_new_registrants(data)  # Jan gets lower ID (processed first)
     """
-    from models import create_registrant
+    from models import create_registrant, PREFERENCE_FIELDS
     
     registrants = []
     for data in registrants_data:
@@ -642,7 +1101,8 @@ def batch_add_new_registrants(registrants_data: List[dict]) -> List[int]:
             email=data['email'],
             phone=data['phone'],
             application_type=data['application_type'],
-            desired_month=data['desired_month']
+            desired_month=data['desired_month'],
+            **{k: data[k] for k in PREFERENCE_FIELDS if data.get(k) is not None}
         )
         registrants.append(registrant)
     
@@ -651,10 +1111,14 @@ def batch_add_new_registrants(registrants_data: List[dict]) -> List[int]:
 
 
 def add_new_registrant(name: str, surname: str, citizenship: str, email: str,
-                      phone: str, application_type: str, desired_month: int) -> int:
+                      phone: str, application_type: str, desired_month: int,
+                      **preferences) -> int:
     """
     Add a new registrant with validation and database storage.
     
+    Scheduling preferences (fallback_months, earliest_date, ...) are passed
+    through to create_registrant().
+    
     Returns:
         int: New registrant ID
     """
@@ -667,7 +1131,8 @@ def add_new_registrant(name: str, surname: str, citizenship: str, email: str,
         email=email,
         phone=phone,
         application_type=application_type,
-        desired_month=desired_month
+        desired_month=desired_month,
+        **preferences
     )
     
     with DatabaseManager() as db:
@@ -688,6 +1153,20 @@ def get_pending_registrations(month: Optional[int] = None) -> List[Registrant]:
         return db.get_pending_registrants(desired_month=month)
 
 
+def get_registrant_changes(since: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Get registrants changed since a watermark (see DatabaseManager.get_registrant_changes).
+    
+    Args:
+        since (Optional[datetime]): Watermark returned by the previous call (None for a full load)
+        
+    Returns:
+        Dict[str, Any]: 'full', 'pending', 'removed' and the next 'watermark'
+    """
+    with DatabaseManager() as db:
+        return db.get_registrant_changes(since)
+
+
 def create_reservation_for_registrant(registrant_id: int, reservation_id: str, success_data: Optional[dict] = None) -> bool:
     """
     Create a reservation and assign it to a registrant.
@@ -701,16 +1180,41 @@ def create_reservation_for_registrant(registrant_id: int, reservation_id: str, s
         bool: True if successful
     """
     with DatabaseManager() as db:
-        # Create reservation with success data
-        if success_data:
-            db.create_reservation(reservation_id, success_data)
-        
+        # Create reservation with success data and link it in one statement
         return db.assign_reservation_to_registrant(
             registrant_id=registrant_id,
-            reservation_id=reservation_id
+            reservation_id=reservation_id,
+            success_data=success_data
         )
 
 
+def claim_slots(claims: List[tuple], replica_id: str, ttl: int = 300) -> List[int]:
+    """
+    Claim registrant-slot pairs so no other replica attempts them concurrently.
+    
+    Args:
+        claims (List[tuple]): (registrant_id, slot_key) pairs
+        replica_id (str): Identifier of the claiming replica
+        ttl (int): Seconds until an unreleased claim expires
+        
+    Returns:
+        List[int]: Registrant IDs whose claim succeeded
+    """
+    with DatabaseManager() as db:
+        return db.claim_slots(claims, replica_id, ttl)
+
+
+def release_slot_claims(registrant_ids: List[int], replica_id: str) -> int:
+    """
+    Release claims taken with claim_slots().
+    
+    Returns:
+        int: Number of released claims
+    """
+    with DatabaseManager() as db:
+        return db.release_slot_claims(registrant_ids, replica_id)
+
+
 # Backward compatibility alias
 def mark_as_registered(registrant_id: int, appointment_date: str = None,
                       appointment_time: str = None, timeslot_value: str = None) -> bool:
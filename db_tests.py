@@ -374,6 +374,104 @@ def test_malformed_datetime():
     return registrant_id
 
 
+def test_insert_registrants(count: int = 250):
+    """
+    Test bulk insert: IDs follow input order and existing emails are skipped.
+    
+    Args:
+        count (int): Number of new registrants (all sent in a single INSERT statement)
+    """
+    logger.info(f"🧪 Testing bulk insert of {count} registrants...")
+    
+    from models import create_registrant
+    
+    def make(index):
+        return create_registrant(
+            name="Test",
+            surname=f"Bulk{index}",
+            citizenship="UKRAINE",
+            email=f"test.bulk{index}@example.com",
+            phone="555666779",
+            application_type="ADULT",
+            desired_month=8
+        )
+    
+    registrants = [make(i) for i in range(count)]
+    with DatabaseManager() as db:
+        existing_id = db.add_registrant(make(count))
+        # An email already in the table and a repeat within the batch are both skipped
+        batch = registrants + [make(count), make(0)]
+        ids = db.insert_registrants(batch)
+    
+    created_ids = ids[:count]
+    if len(ids) != len(batch):
+        logger.error(f"   ❌ Expected {len(batch)} results, got {len(ids)}")
+    elif None in created_ids:
+        logger.error(f"   ❌ {created_ids.count(None)} new registrants got no ID")
+    elif created_ids != sorted(created_ids):
+        logger.error("   ❌ IDs do not follow input order")
+    elif ids[count:] != [None, None]:
+        logger.error(f"   ❌ Existing and repeated emails not skipped: {ids[count:]}")
+    else:
+        logger.info(f"   ✅ {count} IDs in input order ({created_ids[0]}..{created_ids[-1]}), duplicates skipped")
+    
+    return [registrant_id for registrant_id in created_ids if registrant_id] + [existing_id]
+
+
+def test_registrant_cache_reconnect():
+    """Test that the registrant cache reconnects after losing its LISTEN connection."""
+    logger.info("🧪 Testing registrant cache reconnect...")
+    
+    import time
+    from models import create_registrant
+    from registrant_cache import RegistrantCache
+    
+    cache = RegistrantCache(os.getenv('DATABASE_URL'), max_backoff=1.0)
+    registrant_id = None
+    try:
+        if not cache.start(timeout=5.0):
+            logger.error("   ❌ Cache did not become live")
+            return None
+        logger.info(f"   ✅ Cache live with {len(cache.get_pending())} pending registrants")
+        
+        # Kill the cache's backend as a dropped connection would
+        backend_pid = cache._connection.get_backend_pid()
+        with DatabaseManager() as db:
+            with db.connection.cursor() as cursor:
+                cursor.execute("SELECT pg_terminate_backend(%s);", (backend_pid,))
+        
+        deadline = time.time() + 10
+        while time.time() < deadline and not (cache.get_stats()['reconnects'] and cache.is_live()):
+            time.sleep(0.05)
+        if not cache.is_live():
+            logger.error("   ❌ Cache did not reconnect")
+            return None
+        logger.info(f"   ✅ Reconnected ({cache.get_stats()['reconnects']} reconnects)")
+        
+        # Changes made after the reconnect must still reach the cache
+        with DatabaseManager() as db:
+            registrant_id = db.add_registrant(create_registrant(
+                name="Test",
+                surname="Cache",
+                citizenship="UKRAINE",
+                email="test.cache@example.com",
+                phone="555666778",
+                application_type="ADULT",
+                desired_month=8
+            ))
+        deadline = time.time() + 5
+        while time.time() < deadline and registrant_id not in {r.id for r in cache.get_pending()}:
+            time.sleep(0.05)
+        if registrant_id in {r.id for r in cache.get_pending()}:
+            logger.info(f"   ✅ New registrant ID {registrant_id} visible after reconnect")
+        else:
+            logger.error(f"   ❌ New registrant ID {registrant_id} not visible after reconnect")
+        
+        return registrant_id
+    finally:
+        cache.stop()
+
+
 def cleanup_test_reservations():
     """Clean up all test reservations."""
     logger.info("🧹 Cleaning up test reservations...")
@@ -423,9 +521,11 @@ def interactive_menu():
         print("9. 🧹 Clean up test reservations")
         print("10. 🗑️  DELETE ALL TABLES (DANGER!)")
         print("11. 🔄 Run full test suite")
+        print("12. 📡 Test registrant cache reconnect")
+        print("13. 📥 Test bulk registrant insert")
         print("0. ❌ Exit")
         
-        choice = input("\nSelect operation (0-11): ").strip()
+        choice = input("\nSelect operation (0-13): ").strip()
         
         try:
             if choice == '0':
@@ -463,8 +563,12 @@ def interactive_menu():
             elif choice == '11':
                 main()
                 break
+            elif choice == '12':
+                test_registrant_cache_reconnect()
+            elif choice == '13':
+                test_insert_registrants()
             else:
-                logger.error("❌ Invalid choice. Please select 0-11.")
+                logger.error("❌ Invalid choice. Please select 0-13.")
                 
         except Exception as e:
             logger.error(f"❌ Operation failed: {e}")
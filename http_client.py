@@ -0,0 +1,107 @@
+"""
+Shared HTTP client for the Polish Card appointment system.
+Provides pooled keep-alive connections reused by timeslot polling, CAPTCHA and send.php calls.
+"""
+
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from logging_config import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP client backed by a single requests.Session.
+
+    Connections are kept alive and pooled per host, so repeated calls to the
+    same office server skip the TCP+TLS handshake. Cookies are never persisted
+    on the session: every PHPSESSID is passed explicitly by the caller, which
+    keeps concurrent registrations from leaking sessions into each other.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 16,
+                 connect_timeout: float = 5.0, read_timeout: float = 10.0):
+        """
+        Initialize HTTP client.
+
+        Args:
+            pool_connections: Number of per-host connection pools to cache
+            pool_maxsize: Maximum keep-alive connections per host
+            connect_timeout: Default TCP connect timeout in seconds
+            read_timeout: Default read timeout in seconds
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self.session = requests.Session()
+        # Reject all cookies on the shared jar; per-request cookies still work
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method: HTTP method
+            url: Target URL
+            timeout: Read timeout override in seconds (connect timeout stays default)
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            requests.Response: Server response
+        """
+        read_timeout = timeout if timeout is not None else self.read_timeout
+        return self.session.request(method, url, timeout=(self.connect_timeout, read_timeout), **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send GET request through the pooled session."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send POST request through the pooled session."""
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+# Global HTTP client instance
+_global_http_client = None
+_global_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get global HTTP client instance configured from environment."""
+    global _global_http_client
+    if _global_http_client is None:
+        with _global_http_client_lock:
+            if _global_http_client is None:
+                _global_http_client = HttpClient(
+                    pool_connections=int(os.environ.get("HTTP_POOL_CONNECTIONS", "10")),
+                    pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", "16")),
+                    connect_timeout=float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5")),
+                    read_timeout=float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+                )
+                logger.info(f"🌐 HTTP client ready - pool size {_global_http_client.pool_maxsize} per host")
+    return _global_http_client
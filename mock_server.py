@@ -63,6 +63,22 @@ MOCK_TIMESLOTS = {
     "2025-08-08": ["10:00", "11:00", "12:00"],
 }
 
+# Weekdays after today that always have slots, so the monitor (which skips past dates) finds some
+UPCOMING_WEEKDAYS = 10
+UPCOMING_SLOTS = ["09:00", "10:00", "11:00"]
+
+def upcoming_timeslots():
+    """Timeslots for the next UPCOMING_WEEKDAYS weekdays after today."""
+    timeslots = {}
+    day = datetime.now().date()
+    while len(timeslots) < UPCOMING_WEEKDAYS:
+        day += timedelta(days=1)
+        if day.weekday() < 5:
+            timeslots[day.isoformat()] = list(UPCOMING_SLOTS)
+    return timeslots
+
+MOCK_TIMESLOTS.update(upcoming_timeslots())
+
 def generate_captcha_text():
     """Generate random CAPTCHA text (6 characters)."""
     return ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
@@ -144,7 +160,7 @@ REGISTRATION_PAGE_TEMPLATE = """
     $(function() {
         $("#datepicker").datepicker({
             minDate: new Date("2025/06/16"),
-            maxDate: new Date("2025/08/31"),
+            maxDate: new Date("{{ max_date }}"),
             beforeShowDay: disableSpecificWeekDays,
         });
     });
@@ -425,12 +441,18 @@ def index():
 @app.route('/pokoj_A1.php')
 def room_a1():
     """Room A1 registration page."""
-    return render_template_string(REGISTRATION_PAGE_TEMPLATE, timeslots_endpoint="godziny_pokoj_A1.php")
+    return render_registration_page("godziny_pokoj_A1.php")
 
 @app.route('/pokoj_A2.php')
 def room_a2():
     """Room A2 registration page."""
-    return render_template_string(REGISTRATION_PAGE_TEMPLATE, timeslots_endpoint="godziny_pokoj_A2.php")
+    return render_registration_page("godziny_pokoj_A2.php")
+
+def render_registration_page(timeslots_endpoint):
+    """Render a room page whose datepicker reaches the last upcoming timeslot."""
+    max_date = max(["2025-08-31"] + list(upcoming_timeslots()))
+    return render_template_string(REGISTRATION_PAGE_TEMPLATE, timeslots_endpoint=timeslots_endpoint,
+                                  max_date=max_date.replace('-', '/'))
 
 @app.route('/godziny_pokoj_A1.php', methods=['POST'])
 def timeslots_a1():
@@ -638,6 +660,7 @@ def api_reset():
         "2025-07-10": ["09:00", "10:00", "11:00"],
         "2025-07-11": ["10:00", "11:00"],
     })
+    MOCK_TIMESLOTS.update(upcoming_timeslots())
     
     return jsonify({"status": "reset", "message": "All data has been reset"})
 
@@ -5,7 +5,7 @@ Defines registrant data structure and validation.
 
 from dataclasses import dataclass, asdict
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 from enum import Enum
 
 
@@ -60,6 +60,15 @@ class Registrant:
     
     # Additional tracking fields
     desired_month: int                  # Month preference (1-12)
+    
+    # Scheduling preferences (optional, used by assignment_engine)
+    fallback_months: Optional[List[int]] = None     # Other acceptable months, most preferred first
+    earliest_date: Optional[date] = None            # No slot before this date
+    latest_date: Optional[date] = None              # No slot after this date
+    preferred_weekdays: Optional[List[int]] = None  # Acceptable weekdays (0=Monday ... 6=Sunday)
+    earliest_time: Optional[str] = None             # No slot before HH:MM
+    latest_time: Optional[str] = None               # No slot after HH:MM
+    
     reservation: Optional[str] = None   # Reservation ID if registered, None if pending
     
     # Database fields
@@ -103,9 +112,30 @@ class Registrant:
         if not (1 <= self.desired_month <= 12):
             errors.append("Desired month must be between 1 and 12")
         
+        # Scheduling preference validation
+        if self.fallback_months and not all(1 <= m <= 12 for m in self.fallback_months):
+            errors.append("Fallback months must be between 1 and 12")
+        
+        if self.earliest_date and self.latest_date and self.earliest_date > self.latest_date:
+            errors.append("Earliest date must not be after latest date")
+        
+        if self.preferred_weekdays and not all(0 <= d <= 6 for d in self.preferred_weekdays):
+            errors.append("Preferred weekdays must be between 0 (Monday) and 6 (Sunday)")
+        
+        for label, value in (("Earliest time", self.earliest_time), ("Latest time", self.latest_time)):
+            if value is not None:
+                try:
+                    datetime.strptime(value, '%H:%M')
+                except (TypeError, ValueError):
+                    errors.append(f"{label} must be in HH:MM format")
+        
         if errors:
             raise ValueError(f"Validation errors: {'; '.join(errors)}")
     
+    def acceptable_months(self) -> List[int]:
+        """Months in which a slot is acceptable, most preferred first."""
+        return [self.desired_month] + [m for m in (self.fallback_months or []) if m != self.desired_month]
+    
     def to_registration_data(self) -> dict:
         """
         Convert to format expected by send_registration_request().
@@ -154,6 +184,13 @@ class Registrant:
                         data['application_type'] = app_type
                         break
         
+        for field_name in ('earliest_date', 'latest_date'):
+            if isinstance(data.get(field_name), str):
+                data[field_name] = date.fromisoformat(data[field_name])
+        for field_name in ('created_at', 'updated_at'):
+            if isinstance(data.get(field_name), str):
+                data[field_name] = datetime.fromisoformat(data[field_name])
+        
         return cls(**data)
     
     def set_reservation(self, reservation_id: str):
@@ -180,9 +217,15 @@ class Registrant:
         return f"Registrant(id={self.id}, name='{self.name}', surname='{self.surname}', reservation={self.reservation})"
 
 
+# Optional scheduling preference fields of Registrant
+PREFERENCE_FIELDS = ('fallback_months', 'earliest_date', 'latest_date',
+                     'preferred_weekdays', 'earliest_time', 'latest_time')
+
+
 # Helper functions for creating registrants
 def create_registrant(name: str, surname: str, citizenship: str, email: str, 
-                     phone: str, application_type: str, desired_month: int) -> Registrant:
+                     phone: str, application_type: str, desired_month: int,
+                     **preferences) -> Registrant:
     """
     Create a new registrant with validation.
     
@@ -194,6 +237,9 @@ def create_registrant(name: str, surname: str, citizenship: str, email: str,
         phone: Phone number (digits only)
         application_type: ApplicationType string value or ApplicationType enum
         desired_month: Preferred month (1-12)
+        **preferences: Optional scheduling preferences (fallback_months, earliest_date,
+                       latest_date, preferred_weekdays, earliest_time, latest_time);
+                       dates may be given as YYYY-MM-DD strings
     
     Returns:
         Registrant: Validated registrant object
@@ -238,6 +284,13 @@ def create_registrant(name: str, surname: str, citizenship: str, email: str,
             raise ValueError(f"Invalid application type: {application_type}. Must be one of keys: {valid_keys} or values: {valid_values}")
         application_type = app_type_enum
     
+    unknown = set(preferences) - set(PREFERENCE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown scheduling preferences: {sorted(unknown)}")
+    for field_name in ('earliest_date', 'latest_date'):
+        if isinstance(preferences.get(field_name), str):
+            preferences[field_name] = date.fromisoformat(preferences[field_name])
+    
     return Registrant(
         name=name.strip(),
         surname=surname.strip(),
@@ -247,7 +300,8 @@ def create_registrant(name: str, surname: str, citizenship: str, email: str,
         application_type=application_type,
         desired_month=desired_month,
         created_at=datetime.now(),
-        updated_at=datetime.now()
+        updated_at=datetime.now(),
+        **preferences
     )
 
 
@@ -284,7 +338,9 @@ def load_registrants_from_json(file_path: str) -> List[Registrant]:
             "email": "jan.kowalski@example.com",
             "phone": "123456789",
             "application_type": "ADULT",  // or "osoba dorosła"
-            "desired_month": 8
+            "desired_month": 8,
+            "fallback_months": [9, 7],    // optional, also preferred_weekdays, earliest_date,
+            "latest_date": "2025-09-30"   // latest_date (YYYY-MM-DD), earliest_time, latest_time (HH:MM)
         },
         ...
     ]
@@ -313,7 +369,8 @@ def load_registrants_from_json(file_path: str) -> List[Registrant]:
                     email=registrant_data['email'],
                     phone=registrant_data['phone'],
                     application_type=registrant_data['application_type'],
-                    desired_month=registrant_data['desired_month']
+                    desired_month=registrant_data['desired_month'],
+                    **{k: registrant_data[k] for k in PREFERENCE_FIELDS if registrant_data.get(k) is not None}
                 )
                 registrants.append(registrant)
             except KeyError as e:
@@ -348,7 +405,9 @@ def save_registrants_to_json(registrants: List[Registrant], file_path: str) -> N
             "email": registrant.email,
             "phone": registrant.phone,
             "application_type": registrant.application_type.value,
-            "desired_month": registrant.desired_month
+            "desired_month": registrant.desired_month,
+            **{k: (v.isoformat() if isinstance(v, date) else v)
+               for k in PREFERENCE_FIELDS if (v := getattr(registrant, k)) is not None}
         })
     
     with open(file_path, 'w', encoding='utf-8') as f:
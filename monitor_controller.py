@@ -1,27 +1,41 @@
 """
 Monitor controller for managing RealTimeAvailabilityMonitor lifecycle.
 Provides thread-safe start/stop controls and status monitoring.
+Several rooms of one or more offices can be monitored concurrently; they share one registration dispatcher.
+With MONITOR_MODE=process each room and the registration dispatcher run in their own worker processes.
 """
 
+import os
 import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 from logging_config import get_logger
 
 from realtime_availability_monitor import RealTimeAvailabilityMonitor
+from registration_dispatcher import RegistrationDispatcher
+from offices import get_office_registry
+from process_coordinator import ProcessCoordinator
 from monitor_events_manager import get_event_emitter, emit_monitor_started, emit_monitor_stopped, emit_error
 
 
+# Per-room counters summed into the combined monitor statistics
+SUMMED_STATS = ('checks_performed', 'slots_found', 'dates_skipped')
+
+
 class MonitorController:
     """
     Thread-safe controller for RealTimeAvailabilityMonitor.
     Manages monitor lifecycle and provides status information.
+    Runs one monitor thread per room; slots found in any room go to the
+    shared RegistrationDispatcher.
     """
     
     def __init__(self):
-        self.monitor: Optional[RealTimeAvailabilityMonitor] = None
-        self.monitor_thread: Optional[threading.Thread] = None
+        self.monitors: Dict[str, RealTimeAvailabilityMonitor] = {}
+        self.monitor_threads: Dict[str, threading.Thread] = {}
+        self.dispatcher: Optional[RegistrationDispatcher] = None
+        self.coordinator: Optional[ProcessCoordinator] = None
         self.running = False
         self.lock = threading.Lock()
         self.event_emitter = get_event_emitter()
@@ -29,22 +43,51 @@ class MonitorController:
         
         # Monitor configuration
         self.config = {
-            'room': 'A1',  # A1 or A2
+            'room': 'A1',  # Room spec resolved by the office registry (e.g. A1, A1,A2, olsztyn/A2, all)
             'check_interval': 0.5,  # seconds between checks
             'auto_registration': True,  # enable auto-registration
-            'db_check_interval': 10  # seconds between database checks
+            'db_check_interval': 10,  # seconds between database checks
+            'datepicker_refresh_interval': 30,  # seconds between room page fetches
+            'mode': os.environ.get("MONITOR_MODE", "thread").lower()  # 'thread' or 'process'
         }
         
         # Statistics
         self.start_time: Optional[datetime] = None
         self.stop_time: Optional[datetime] = None
     
+    def _threads_alive(self) -> bool:
+        """Check if any room monitor thread or worker process is alive."""
+        if self.coordinator:
+            return self.coordinator.is_alive()
+        return any(thread.is_alive() for thread in self.monitor_threads.values())
+    
+    def _aggregate_stats(self, monitors=None, coordinator=None, dispatcher=None) -> Dict[str, Any]:
+        """
+        Combine per-room monitor statistics with the shared dispatcher statistics.
+
+        Defaults to the current run; stop_monitor passes the components of the
+        run it just detached.
+        """
+        if monitors is None and coordinator is None and dispatcher is None:
+            monitors, coordinator, dispatcher = self.monitors, self.coordinator, self.dispatcher
+        if coordinator:
+            rooms = coordinator.get_room_stats()
+        else:
+            rooms = {room: monitor.get_current_stats() for room, monitor in monitors.items()}
+        stats = {key: sum(room_stats.get(key, 0) for room_stats in rooms.values()) for key in SUMMED_STATS}
+        if coordinator:
+            stats.update(coordinator.get_registration_stats())
+        elif dispatcher:
+            stats.update(dispatcher.get_stats())
+        stats['rooms'] = rooms
+        return stats
+    
     def is_running(self) -> bool:
         """Check if monitor is currently running."""
         try:
             if self.lock.acquire(blocking=False):
                 try:
-                    return self.running and self.monitor_thread and self.monitor_thread.is_alive()
+                    return self.running and self._threads_alive()
                 finally:
                     self.lock.release()
             else:
@@ -60,7 +103,7 @@ class MonitorController:
             if self.lock.acquire(blocking=False):
                 try:
                     status = {
-                        'running': self.running and self.monitor_thread and self.monitor_thread.is_alive(),
+                        'running': self.running and self._threads_alive(),
                         'config': self.config.copy(),
                         'start_time': self.start_time.isoformat() if self.start_time else None,
                         'stop_time': self.stop_time.isoformat() if self.stop_time else None,
@@ -71,8 +114,8 @@ class MonitorController:
                     if self.start_time and status['running']:
                         status['uptime_seconds'] = (datetime.now() - self.start_time).total_seconds()
                     
-                    if self.monitor:
-                        status['monitor_stats'] = self.monitor.get_current_stats()
+                    if self.monitors or self.coordinator:
+                        status['monitor_stats'] = self._aggregate_stats()
                     
                     return status
                 finally:
@@ -95,16 +138,22 @@ class MonitorController:
                 'error': str(e)
             }
     
-    def start_monitor(self, room: str = 'A1', check_interval: float = 0.5, 
-                     auto_registration: bool = True, db_check_interval: int = 1800) -> bool:
+    def start_monitor(self, room: Union[str, List[str]] = 'A1', check_interval: float = 0.5, 
+                     auto_registration: bool = True, db_check_interval: int = 1800,
+                     datepicker_refresh_interval: float = 30, mode: Optional[str] = None) -> bool:
         """
         Start the availability monitor.
         
         Args:
-            room: Room to monitor (A1 or A2)
+            room: Room spec resolved by the office registry: a room of the default office ('A1'),
+                  an office room ('olsztyn/A2'), a whole office ('olsztyn') or 'all'; several
+                  as a list or comma-separated string
             check_interval: Seconds between availability checks
             auto_registration: Enable automatic registration attempts
             db_check_interval: Seconds between database checks
+            datepicker_refresh_interval: Seconds between datepicker config fetches
+            mode: 'thread' runs rooms as threads of this process, 'process' runs them
+                  in worker processes (defaults to MONITOR_MODE env)
             
         Returns:
             bool: True if started successfully
@@ -115,48 +164,84 @@ class MonitorController:
                 return False
             
             try:
+                spec = room if isinstance(room, str) else ','.join(room)
+                rooms = get_office_registry().resolve(spec)
+                if not rooms:
+                    raise ValueError("No room to monitor")
+                
                 # Update configuration
                 self.config.update({
-                    'room': room,
+                    'room': spec,
                     'check_interval': check_interval,
                     'auto_registration': auto_registration,
-                    'db_check_interval': db_check_interval
+                    'db_check_interval': db_check_interval,
+                    'datepicker_refresh_interval': datepicker_refresh_interval,
+                    'mode': (mode or self.config['mode']).lower()
                 })
                 
-                # Create monitor instance
-                page_url = f"https://olsztyn.uw.gov.pl/wizytakartapolaka/pokoj_{room}.php"
-                self.monitor = RealTimeAvailabilityMonitor(page_url=page_url)
+                if self.config['mode'] == 'process':
+                    self.coordinator = ProcessCoordinator(
+                        rooms,
+                        check_interval=check_interval,
+                        auto_registration=auto_registration,
+                        db_check_interval=db_check_interval,
+                        datepicker_refresh_interval=datepicker_refresh_interval
+                    )
+                    self.monitors = {}
+                    self.monitor_threads = {}
+                    self.running = True
+                    self.start_time = datetime.now()
+                    self.stop_time = None
+                    self.coordinator.start()
+                    emit_monitor_started(self.config)
+                    self.logger.info(f"Monitor started for room {self.config['room']} in worker processes")
+                    return True
                 
-                # Configure monitor
-                self.monitor.endpoint = f"godziny_pokoj_{room}.php"
-                self.monitor.db_check_interval = db_check_interval
+                # One dispatcher owns pending registrants for all rooms and offices
+                self.dispatcher = RegistrationDispatcher(rooms[0].base_url, db_check_interval=db_check_interval)
+                self.monitors = {}
+                self.monitor_threads = {}
                 
-                # Inject event emitter into monitor
-                self.monitor.event_emitter = self.event_emitter
-                
-                # Start monitor in separate thread
-                self.monitor_thread = threading.Thread(
-                    target=self._run_monitor_loop,
-                    name=f"MonitorThread-{room}",
-                    daemon=True
-                )
+                for room_config in rooms:
+                    # Create monitor instance
+                    monitor = RealTimeAvailabilityMonitor(dispatcher=self.dispatcher, room_config=room_config)
+                    
+                    # Configure monitor
+                    monitor.datepicker_refresh_interval = datepicker_refresh_interval
+                    
+                    # Inject event emitter into monitor
+                    monitor.event_emitter = self.event_emitter
+                    
+                    self.monitors[room_config.key] = monitor
+                    self.monitor_threads[room_config.key] = threading.Thread(
+                        target=self._run_monitor_loop,
+                        args=(room_config.key,),
+                        name=f"MonitorThread-{room_config.key}",
+                        daemon=True
+                    )
                 
                 self.running = True
                 self.start_time = datetime.now()
                 self.stop_time = None
                 
-                self.monitor_thread.start()
+                # Start monitors in separate threads
+                for thread in self.monitor_threads.values():
+                    thread.start()
                 
                 # Emit start event
                 emit_monitor_started(self.config)
                 
-                self.logger.info(f"Monitor started for room {room}")
+                self.logger.info(f"Monitor started for room {self.config['room']}")
                 return True
                 
             except Exception as e:
                 self.running = False
-                self.monitor = None
-                self.monitor_thread = None
+                self.monitors = {}
+                self.monitor_threads = {}
+                self.dispatcher = None
+                if self.coordinator:
+                    self.coordinator.stop()
+                    self.coordinator = None
                 error_msg = f"Failed to start monitor: {str(e)}"
                 self.logger.error(error_msg)
                 emit_error(error_msg, {'exception': str(e)}, priority=4)
@@ -174,38 +259,50 @@ class MonitorController:
                 self.logger.warning("Monitor is not running")
                 return False
             
-            try:
-                # Signal monitor to stop
-                if self.monitor:
-                    self.monitor.stop_event.set()
-                
-                self.running = False
-                self.stop_time = datetime.now()
-                
-                # Wait for thread to finish (with timeout)
-                if self.monitor_thread:
-                    self.monitor_thread.join(timeout=5.0)
-                    if self.monitor_thread.is_alive():
-                        self.logger.warning("Monitor thread did not stop cleanly")
-                
-                # Get final stats before cleanup
-                final_stats = self.monitor.get_current_stats() if self.monitor else {}
-                
-                # Emit stop event
-                emit_monitor_stopped(final_stats)
-                
-                # Cleanup
-                self.monitor = None
-                self.monitor_thread = None
-                
-                self.logger.info("Monitor stopped")
-                return True
-                
-            except Exception as e:
-                error_msg = f"Error stopping monitor: {str(e)}"
-                self.logger.error(error_msg)
-                emit_error(error_msg, {'exception': str(e)}, priority=3)
-                return False
+            # Signal all room monitors and cancel registration work; room loops
+            # cancel their in-flight probes and stop waiting on registration
+            for monitor in self.monitors.values():
+                monitor.stop_event.set()
+            if self.dispatcher:
+                self.dispatcher.shutdown()
+            
+            self.running = False
+            self.stop_time = datetime.now()
+            monitors = self.monitors
+            monitor_threads = self.monitor_threads
+            dispatcher = self.dispatcher
+            coordinator = self.coordinator
+            self.monitors = {}
+            self.monitor_threads = {}
+            self.dispatcher = None
+            self.coordinator = None
+        
+        # Join outside the lock: finishing room loops take it to update the running state
+        try:
+            stop_started = time.monotonic()
+            deadline = stop_started + 5.0
+            for room_name, thread in monitor_threads.items():
+                thread.join(timeout=max(0.0, deadline - time.monotonic()))
+                if thread.is_alive():
+                    self.logger.warning(f"Monitor thread for room {room_name} did not stop cleanly")
+            
+            if coordinator:
+                coordinator.stop()
+            
+            # Get final stats before cleanup
+            final_stats = self._aggregate_stats(monitors, coordinator, dispatcher) if monitors or coordinator else {}
+            
+            # Emit stop event
+            emit_monitor_stopped(final_stats)
+            
+            self.logger.info(f"Monitor stopped in {(time.monotonic() - stop_started) * 1000:.0f} ms")
+            return True
+            
+        except Exception as e:
+            error_msg = f"Error stopping monitor: {str(e)}"
+            self.logger.error(error_msg)
+            emit_error(error_msg, {'exception': str(e)}, priority=3)
+            return False
     
     def restart_monitor(self, **kwargs) -> bool:
         """
@@ -226,37 +323,40 @@ class MonitorController:
             self.logger.error("Failed to stop monitor for restart")
             return False
         
-        # Wait a moment for cleanup
-        time.sleep(1)
-        
         # Start with new config
         return self.start_monitor(**current_config)
     
-    def _run_monitor_loop(self):
-        """Internal method to run the monitor loop."""
+    def _run_monitor_loop(self, room: str):
+        """Internal method to run the monitor loop for one room."""
         try:
-            if self.monitor:
+            monitor = self.monitors.get(room)
+            if monitor:
                 # Enhanced monitoring with event emission
-                self.monitor.start_monitoring(
+                monitor.start_monitoring(
                     check_interval=self.config['check_interval'],
                     auto_registration=self.config['auto_registration']
                 )
-                self.logger.info("📤 start_monitoring() returned")
+                self.logger.info(f"📤 start_monitoring() returned for room {room}")
         except Exception as e:
-            error_msg = f"Monitor loop crashed: {str(e)}"
+            error_msg = f"Monitor loop crashed for room {room}: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
             emit_error(error_msg, {'exception': str(e)}, priority=4)
         finally:
             with self.lock:
-                self.running = False
-                self.stop_time = datetime.now()
-            self.logger.info("✅ _run_monitor_loop completed")
+                # The controller is running while any other room is still being monitored
+                current = threading.current_thread()
+                if not any(t.is_alive() for t in self.monitor_threads.values() if t is not current):
+                    self.running = False
+                    self.stop_time = datetime.now()
+            self.logger.info(f"✅ _run_monitor_loop completed for room {room}")
     
     def get_pending_registrants_count(self) -> int:
         """Get count of pending registrants from database."""
         try:
-            if self.monitor and hasattr(self.monitor, 'pending_registrants'):
-                return len(self.monitor.pending_registrants)
+            if self.coordinator:
+                return self.coordinator.get_pending_count()
+            elif self.dispatcher:
+                return len(self.dispatcher.pending_registrants)
             else:
                 # Fallback to database query
                 from database import get_pending_registrations
@@ -269,8 +369,11 @@ class MonitorController:
     def force_database_refresh(self) -> bool:
         """Force refresh of pending registrants from database."""
         try:
-            if self.monitor and hasattr(self.monitor, 'refresh_pending_registrants'):
-                self.monitor.refresh_pending_registrants()
+            if self.coordinator:
+                self.coordinator.request_refresh()
+                return True
+            if self.dispatcher:
+                self.dispatcher.refresh_pending_registrants()
                 return True
             return False
         except Exception as e:
@@ -291,7 +394,7 @@ def get_monitor_controller() -> MonitorController:
 
 
 # Convenience functions
-def start_monitor(room: str = 'A1', check_interval: float = 0.5, 
+def start_monitor(room: Union[str, List[str]] = 'A1', check_interval: float = 0.5, 
                  auto_registration: bool = True, db_check_interval: int = 1800) -> bool:
     """Start monitor using global controller."""
     return get_monitor_controller().start_monitor(room, check_interval, auto_registration, db_check_interval)
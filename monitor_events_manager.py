@@ -271,6 +271,13 @@ def get_event_emitter() -> EventEmitter:
     return _global_event_emitter
 
 
+def set_event_queue(event_queue: EventQueue):
+    """Replace the global event queue, e.g. to forward events out of a worker process."""
+    global _global_event_queue, _global_event_emitter
+    _global_event_queue = event_queue
+    _global_event_emitter = EventEmitter(event_queue)
+
+
 # Convenience functions
 def emit_error(message: str, error_data: Dict[str, Any] = None, priority: int = 3) -> bool:
     """Emit error event using global emitter."""
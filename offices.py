@@ -0,0 +1,166 @@
+"""
+Registry of offices and rooms that can be monitored.
+Built-in entries cover the Olsztyn office; more offices are added through a
+JSON config file referenced by OFFICES_CONFIG.
+
+Config format (list of rooms; page_path, hours_endpoint and room_prefix
+default to pokoj_<room>.php, godziny_pokoj_<room>.php and <room>):
+    [
+        {"office": "olsztyn", "room": "A1", "base_url": "https://olsztyn.uw.gov.pl/wizytakartapolaka/"},
+        {"office": "gdansk", "room": "B1", "base_url": "https://example.gov.pl/karta/",
+         "page_path": "sala_B1.php", "hours_endpoint": "godziny_sala_B1.php", "room_prefix": "B1"}
+    ]
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from logging_config import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class OfficeRoom:
+    """A single monitorable room of an office appointment system."""
+    office: str          # Office identifier, e.g. 'olsztyn'
+    room: str            # Room name, e.g. 'A1'
+    base_url: str        # Base URL of the appointment system, ending with '/'
+    page_path: str       # Room page with the datepicker (relative to base_url)
+    hours_endpoint: str  # Timeslot endpoint (relative to base_url)
+    room_prefix: str     # Prefix of the 'godzina' form value, e.g. 'A1' in 'A109:00'
+
+    @property
+    def key(self) -> str:
+        """Unique room identifier, e.g. 'olsztyn/A1'."""
+        return f"{self.office}/{self.room}"
+
+    @property
+    def page_url(self) -> str:
+        """Full URL of the room page."""
+        return f"{self.base_url}{self.page_path}"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> 'OfficeRoom':
+        """Create room from a config entry, filling defaults from the room name."""
+        room = data['room']
+        base_url = data['base_url'] if data['base_url'].endswith('/') else f"{data['base_url']}/"
+        return cls(
+            office=data['office'],
+            room=room,
+            base_url=base_url,
+            page_path=data.get('page_path', f"pokoj_{room}.php"),
+            hours_endpoint=data.get('hours_endpoint', f"godziny_pokoj_{room}.php"),
+            room_prefix=data.get('room_prefix', room)
+        )
+
+
+OLSZTYN_BASE_URL = "https://olsztyn.uw.gov.pl/wizytakartapolaka/"
+
+DEFAULT_OFFICE_ROOMS = [
+    {'office': 'olsztyn', 'room': 'A1', 'base_url': OLSZTYN_BASE_URL},
+    {'office': 'olsztyn', 'room': 'A2', 'base_url': OLSZTYN_BASE_URL},
+]
+
+
+class OfficeRegistry:
+    """Lookup of configured office rooms by key, office or room name."""
+
+    def __init__(self, rooms: List[OfficeRoom], default_office: Optional[str] = None):
+        """
+        Initialize registry.
+
+        Args:
+            rooms: Configured rooms, in monitoring order
+            default_office: Office used for bare room names (defaults to the first office)
+        """
+        self.rooms: Dict[str, OfficeRoom] = {room.key: room for room in rooms}
+        self.default_office = default_office or (rooms[0].office if rooms else None)
+
+    def offices(self) -> List[str]:
+        """Get configured office identifiers."""
+        return list(dict.fromkeys(room.office for room in self.rooms.values()))
+
+    def resolve(self, spec: str) -> List[OfficeRoom]:
+        """
+        Resolve a room specification to configured rooms.
+
+        Args:
+            spec: Comma-separated items, each 'all', an office ('olsztyn'),
+                  an office room ('olsztyn/A1') or a room of the default office ('A1')
+
+        Returns:
+            List[OfficeRoom]: Matching rooms without duplicates
+
+        Raises:
+            ValueError: If an item matches no configured room
+        """
+        resolved: Dict[str, OfficeRoom] = {}
+        for item in (part.strip() for part in spec.split(',')):
+            if not item:
+                continue
+            if item.lower() == 'all':
+                matches = list(self.rooms.values())
+            elif '/' in item:
+                matches = [self.rooms[item]] if item in self.rooms else []
+            elif item in self.offices():
+                matches = [room for room in self.rooms.values() if room.office == item]
+            else:
+                key = f"{self.default_office}/{item}"
+                matches = [self.rooms[key]] if key in self.rooms else []
+            if not matches:
+                raise ValueError(f"Unknown office or room '{item}'. Configured: {', '.join(self.rooms)}")
+            for room in matches:
+                resolved[room.key] = room
+        return list(resolved.values())
+
+
+def load_office_registry(config_path: Optional[str] = None) -> OfficeRegistry:
+    """
+    Build the registry from built-in rooms plus an optional JSON config.
+
+    Config entries override built-in rooms with the same office and room.
+
+    Args:
+        config_path: JSON config file (defaults to OFFICES_CONFIG env)
+
+    Returns:
+        OfficeRegistry: Loaded registry
+    """
+    config_path = config_path or os.environ.get("OFFICES_CONFIG")
+    entries = list(DEFAULT_OFFICE_ROOMS)
+    if config_path:
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                entries.extend(json.load(f))
+            logger.info(f"🏢 Loaded office config from {config_path}")
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Could not load office config from {config_path}: {e}")
+
+    rooms: Dict[str, OfficeRoom] = {}
+    for entry in entries:
+        room = OfficeRoom.from_dict(entry)
+        rooms[room.key] = room
+    return OfficeRegistry(list(rooms.values()), os.environ.get("DEFAULT_OFFICE"))
+
+
+# Global registry instance
+_global_office_registry = None
+_global_office_registry_lock = threading.Lock()
+
+
+def get_office_registry() -> OfficeRegistry:
+    """Get global office registry loaded from environment."""
+    global _global_office_registry
+    if _global_office_registry is None:
+        with _global_office_registry_lock:
+            if _global_office_registry is None:
+                _global_office_registry = load_office_registry()
+    return _global_office_registry
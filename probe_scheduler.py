@@ -0,0 +1,199 @@
+"""
+Adaptive probe scheduling for the availability monitor.
+Learns where and when new slots appear and spends the request budget on hot
+dates, probing cold far-future dates less often.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Lead time buckets in days ahead: (upper bound inclusive, label)
+LEAD_BUCKETS = [(7, '0-7'), (14, '8-14'), (30, '15-30'), (60, '31-60'), (None, '61+')]
+
+
+def _lead_bucket(lead_days: int) -> str:
+    """Map days-ahead to its lead time bucket label."""
+    for upper, label in LEAD_BUCKETS:
+        if upper is None or lead_days <= upper:
+            return label
+    return LEAD_BUCKETS[-1][1]
+
+
+class AdaptiveProbeScheduler:
+    """
+    Decides which candidate dates to probe in each sweep.
+
+    Every probe and every slot appearance (a date going from no slots to some
+    slots) is counted per weekday, per lead time bucket and per hour of day.
+    A date's probe rate is its appearance lift over the global average,
+    clamped to [min_rate, 1]. Dates with slots seen within hot_window seconds
+    are always probed. Until the first appearance is observed every date is
+    probed every cycle, i.e. the pre-scheduler behaviour.
+    """
+
+    def __init__(self, min_rate: float = 0.25, hot_window: float = 600.0, prior_weight: float = 50.0):
+        """
+        Initialize scheduler.
+
+        Args:
+            min_rate: Lowest fraction of cycles in which a cold date is probed
+            hot_window: Seconds a date stays hot after slots were seen on it
+            prior_weight: Pseudo-probes shrinking sparse statistics toward the global rate
+        """
+        self.min_rate = min_rate
+        self.hot_window = hot_window
+        self.prior_weight = prior_weight
+
+        self._lock = threading.Lock()
+        self._history = {
+            'probes': 0,
+            'appearances': 0,
+            'weekday': {},   # '0'..'6' -> {'probes', 'appearances'}
+            'lead': {},      # bucket label -> {'probes', 'appearances'}
+            'hour': {},      # '0'..'23' -> {'probes', 'appearances'}
+        }
+        self._credit: Dict[str, float] = {}
+        self._has_slots: Dict[str, bool] = {}
+        self._last_seen: Dict[str, float] = {}
+
+    def _lift(self, counts: Optional[Dict[str, int]]) -> float:
+        """Appearance rate of a feature relative to the global rate (1.0 = average)."""
+        global_rate = self._history['appearances'] / max(1, self._history['probes'])
+        if not counts or global_rate <= 0:
+            return 1.0
+        rate = (counts['appearances'] + self.prior_weight * global_rate) / (counts['probes'] + self.prior_weight)
+        return rate / global_rate
+
+    def probe_rate(self, date_str: str, now: Optional[datetime] = None) -> float:
+        """
+        Get the fraction of cycles in which a date should be probed.
+
+        Args:
+            date_str: Date in YYYY-MM-DD format
+            now: Current time (defaults to datetime.now())
+
+        Returns:
+            float: Probe rate in [min_rate, 1]
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if self._history['appearances'] == 0:
+                return 1.0
+            last_seen = self._last_seen.get(date_str)
+            if last_seen is not None and time.time() - last_seen <= self.hot_window:
+                return 1.0
+
+            day = date.fromisoformat(date_str)
+            lead_days = (day - now.date()).days
+            lift = max(
+                self._lift(self._history['weekday'].get(str(day.weekday()))),
+                self._lift(self._history['lead'].get(_lead_bucket(lead_days)))
+            )
+            # Release hours boost every date, quiet hours never push below the date lift
+            lift *= max(1.0, self._lift(self._history['hour'].get(str(now.hour))))
+
+        return min(1.0, max(self.min_rate, lift))
+
+    def select(self, dates: List[str]) -> List[str]:
+        """
+        Pick the dates to probe in this cycle, hottest first.
+
+        Each date accumulates its probe rate as credit every cycle and is
+        probed when the credit reaches 1, so a date with rate 0.25 is probed
+        every fourth cycle.
+
+        Args:
+            dates: All candidate dates for this cycle
+
+        Returns:
+            List[str]: Dates to probe, ordered by descending probe rate
+        """
+        now = datetime.now()
+        selected = []
+        for date_str in dates:
+            rate = self.probe_rate(date_str, now)
+            credit = self._credit.get(date_str, 1.0 - rate) + rate
+            if credit >= 1.0:
+                credit -= 1.0
+                selected.append((rate, date_str))
+            self._credit[date_str] = credit
+
+        # Forget credit for dates that left the candidate set
+        if len(self._credit) > len(dates):
+            candidates = set(dates)
+            self._credit = {d: c for d, c in self._credit.items() if d in candidates}
+
+        selected.sort(key=lambda item: (-item[0], item[1]))
+        return [date_str for _, date_str in selected]
+
+    def record(self, date_str: str, slots: List[str]):
+        """
+        Record the outcome of a single date probe.
+
+        Args:
+            date_str: Probed date in YYYY-MM-DD format
+            slots: Timeslots returned for the date
+        """
+        now = datetime.now()
+        day = date.fromisoformat(date_str)
+
+        with self._lock:
+            appeared = bool(slots) and not self._has_slots.get(date_str, False)
+            self._has_slots[date_str] = bool(slots)
+            if slots:
+                self._last_seen[date_str] = time.time()
+
+            self._history['probes'] += 1
+            if appeared:
+                self._history['appearances'] += 1
+
+            features = (
+                ('weekday', str(day.weekday())),
+                ('lead', _lead_bucket((day - now.date()).days)),
+                ('hour', str(now.hour)),
+            )
+            for feature, key in features:
+                counts = self._history[feature].setdefault(key, {'probes': 0, 'appearances': 0})
+                counts['probes'] += 1
+                if appeared:
+                    counts['appearances'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get learned appearance statistics."""
+        with self._lock:
+            return json.loads(json.dumps(self._history))
+
+    def load(self, file_path: str) -> bool:
+        """Load appearance history from a JSON file if it exists."""
+        if not os.path.exists(file_path):
+            return False
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            with self._lock:
+                self._history.update(history)
+            logger.info(f"📈 Loaded probe history from {file_path}: {history.get('appearances', 0)} appearances in {history.get('probes', 0)} probes")
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load probe history from {file_path}: {e}")
+            return False
+
+    def save(self, file_path: str):
+        """Persist appearance history to a JSON file."""
+        try:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(self.get_stats(), f, indent=2)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save probe history to {file_path}: {e}")
@@ -0,0 +1,386 @@
+"""
+Multi-process monitoring mode.
+Runs one sweep worker process per room and one registration worker process,
+connected by multiprocessing queues, so timeslot parsing and CAPTCHA solving
+run on separate cores and the Telegram bot process stays responsive.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+from assignment_engine import target_months_for
+from logging_config import setup_logging, get_logger
+from monitor_events_manager import EventQueue, MonitorEvent, get_event_queue, set_event_queue
+from offices import OfficeRoom
+
+logger = get_logger(__name__)
+
+# Slots older than this when the registration worker gets to them are dropped
+MAX_SLOT_AGE = 15.0
+
+# Seconds between statistics reports from workers
+STATS_INTERVAL = 5.0
+
+
+class ProcessEventQueue(EventQueue):
+    """Event queue used inside worker processes that forwards events to the coordinator."""
+
+    def __init__(self, outbox):
+        super().__init__(maxsize=1)
+        self._outbox = outbox
+
+    def emit(self, event: MonitorEvent) -> bool:
+        try:
+            self._outbox.put_nowait(('event', event))
+        except queue.Full:
+            return False
+        with self._lock:
+            self._stats['events_sent'] += 1
+            self._stats['last_event_time'] = event.timestamp
+        return True
+
+
+class QueueDispatcher:
+    """
+    Registration dispatcher stand-in for sweep worker processes.
+
+    Slots are pushed to the registration worker instead of being registered
+    here, and the pending registrant list is whatever the registration
+    worker last published. The database is never queried from sweep workers.
+    """
+
+    def __init__(self, room_key: str, slot_queue, inbox, db_check_interval: int = 1800):
+        self.room_key = room_key
+        self.slot_queue = slot_queue
+        self.inbox = inbox
+        self.db_check_interval = db_check_interval
+        self.pending_registrants = []
+        self.target_months = set()
+        self.captcha_pools = {}
+
+    def _drain_inbox(self):
+        """Apply pending registrant updates published by the registration worker."""
+        while True:
+            try:
+                message = self.inbox.get_nowait()
+            except queue.Empty:
+                return
+            if message[0] == 'pending':
+                self.pending_registrants = message[1]
+                self.target_months = target_months_for(self.pending_registrants)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending_registrants': len(self.pending_registrants),
+            'target_months': sorted(self.target_months)
+        }
+
+    def start_captcha_pool(self, base_url: str):
+        """CAPTCHA pools live in the registration worker."""
+
+    def stop_captcha_pools(self):
+        """CAPTCHA pools live in the registration worker."""
+
+    def shutdown(self, wait: bool = False):
+        """Worker pools live in the registration worker."""
+
+    def refresh_pending_registrants(self):
+        self._drain_inbox()
+        return True
+
+    def check_pending_registrants(self):
+        self._drain_inbox()
+        return len(self.pending_registrants) > 0
+
+    def claim_database_check(self):
+        # Never let the monitor enter standby; it idles without server calls while nobody is pending
+        self._drain_inbox()
+        return False
+
+    def begin_batch(self):
+        """Batch whose slots go to the registration worker as each date is probed."""
+        return QueueBatch(self)
+
+    def attempt_auto_registration(self, available_slots):
+        """Hand slots to the registration worker; outcomes arrive via the next pending update."""
+        self._drain_inbox()
+        if available_slots and self.pending_registrants:
+            self.slot_queue.put((self.room_key, time.time(), available_slots))
+        return []
+
+
+class QueueBatch:
+    """Registration batch of a sweep worker: every feed is forwarded immediately."""
+
+    def __init__(self, dispatcher: QueueDispatcher):
+        self.dispatcher = dispatcher
+
+    def feed(self, slots) -> int:
+        self.dispatcher.attempt_auto_registration(slots)
+        return 0
+
+    def finish(self, timeout=None, stop_event=None):
+        """
+        Nothing to wait for: attempts run in the registration worker.
+
+        Args:
+            timeout (float, optional): Unused, accepted like RegistrationBatch.finish
+            stop_event (threading.Event, optional): Unused, accepted like RegistrationBatch.finish
+
+        Returns:
+            list: Always empty; outcomes arrive via the next pending update
+        """
+        return []
+
+
+def _sweep_worker(room: OfficeRoom, config: Dict[str, Any], rate_scale: float,
+                  slot_queue, outbox, inbox, stop_event):
+    """Process entry point: monitor one room and forward found slots."""
+    setup_logging()
+    set_event_queue(ProcessEventQueue(outbox))
+
+    from rate_limiter import set_rate_limit_scale
+    from realtime_availability_monitor import RealTimeAvailabilityMonitor
+
+    set_rate_limit_scale(rate_scale)
+    dispatcher = QueueDispatcher(room.key, slot_queue, inbox, config['db_check_interval'])
+    monitor = RealTimeAvailabilityMonitor(dispatcher=dispatcher, room_config=room)
+    monitor.datepicker_refresh_interval = config['datepicker_refresh_interval']
+
+    def report():
+        # Report stats periodically and translate the shared stop event into the monitor's
+        while not stop_event.wait(STATS_INTERVAL):
+            outbox.put(('stats', room.key, monitor.get_current_stats()))
+        monitor.stop_event.set()
+
+    threading.Thread(target=report, name=f"SweepReporter-{room.key}", daemon=True).start()
+    try:
+        monitor.start_monitoring(
+            check_interval=config['check_interval'],
+            auto_registration=config['auto_registration']
+        )
+    finally:
+        outbox.put(('stats', room.key, monitor.get_current_stats()))
+
+
+def _registration_worker(rooms: List[OfficeRoom], config: Dict[str, Any], slot_queue, outbox, inbox, stop_event):
+    """Process entry point: own pending registrants and register on slots from all sweep workers."""
+    setup_logging()
+    set_event_queue(ProcessEventQueue(outbox))
+
+    from registration_dispatcher import RegistrationDispatcher, slot_key
+
+    dispatcher = RegistrationDispatcher(rooms[0].base_url, db_check_interval=config['db_check_interval'])
+    if config['auto_registration']:
+        for base_url in dict.fromkeys(room.base_url for room in rooms):
+            dispatcher.start_captcha_pool(base_url)
+
+    def publish():
+        outbox.put(('pending', list(dispatcher.pending_registrants)))
+
+    # One registration batch per room may run at a time; slots arriving for a busy room wait
+    executor = ThreadPoolExecutor(max_workers=len(rooms), thread_name_prefix="RegistrationBatch")
+    running = {}
+    latest = {}
+    last_stats = 0.0
+    try:
+        while not stop_event.is_set():
+            # Commands from the coordinator
+            while True:
+                try:
+                    command = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if command == 'refresh':
+                    dispatcher.refresh_pending_registrants()
+                    publish()
+
+            if dispatcher.claim_database_check():
+                dispatcher.check_pending_registrants()
+                publish()
+
+            # Collect slots per room (sweep workers send each date as it is probed)
+            try:
+                message = slot_queue.get(timeout=0.2)
+                while True:
+                    room_key, found_at, slots = message
+                    _, room_slots = latest.get(room_key, (found_at, {}))
+                    room_slots.update((slot_key(slot, dispatcher.base_url), slot) for slot in slots)
+                    latest[room_key] = (found_at, room_slots)
+                    message = slot_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            for room_key, future in list(running.items()):
+                if future.done():
+                    del running[room_key]
+                    if future.exception() is None and future.result():
+                        dispatcher.check_pending_registrants()
+                        publish()
+
+            for room_key in list(latest):
+                if room_key in running:
+                    continue
+                found_at, room_slots = latest.pop(room_key)
+                if time.time() - found_at <= MAX_SLOT_AGE:
+                    running[room_key] = executor.submit(dispatcher.attempt_auto_registration, list(room_slots.values()))
+
+            if time.monotonic() - last_stats >= STATS_INTERVAL:
+                outbox.put(('stats', 'registration', dispatcher.get_stats()))
+                last_stats = time.monotonic()
+    finally:
+        # Cancel first so running batches stop waiting and the executor drains at once
+        dispatcher.shutdown()
+        executor.shutdown(wait=True)
+        outbox.put(('stats', 'registration', dispatcher.get_stats()))
+
+
+class ProcessCoordinator:
+    """
+    Starts and supervises sweep and registration worker processes.
+
+    Sweep workers split each host's request budget evenly. Worker events are
+    re-emitted on this process's event queue, so Telegram notifications work
+    as in threaded mode.
+    """
+
+    def __init__(self, rooms: List[OfficeRoom], check_interval: float = 0.5, auto_registration: bool = True,
+                 db_check_interval: int = 1800, datepicker_refresh_interval: float = 30):
+        """
+        Initialize coordinator.
+
+        Args:
+            rooms: Office rooms to monitor, one sweep process each
+            check_interval: Seconds between availability checks
+            auto_registration: Enable automatic registration attempts
+            db_check_interval: Seconds between database checks
+            datepicker_refresh_interval: Seconds between datepicker config fetches
+        """
+        self.rooms = rooms
+        self.config = {
+            'check_interval': check_interval,
+            'auto_registration': auto_registration,
+            'db_check_interval': db_check_interval,
+            'datepicker_refresh_interval': datepicker_refresh_interval
+        }
+        self.processes: Dict[str, multiprocessing.Process] = {}
+
+        self._context = multiprocessing.get_context('spawn')
+        self._stop_event = None
+        self._outbox = None
+        self._slot_queue = None
+        self._inboxes = {}
+        self._forwarder: Optional[threading.Thread] = None
+        self._forwarding = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._room_stats: Dict[str, Dict[str, Any]] = {}
+        self._registration_stats: Dict[str, Any] = {}
+        self._pending_count = 0
+
+    def start(self):
+        """Start all worker processes and the event forwarder."""
+        ctx = self._context
+        self._stop_event = ctx.Event()
+        self._outbox = ctx.Queue()
+        self._slot_queue = ctx.Queue()
+
+        self._inboxes = {'registration': ctx.Queue()}
+        self.processes = {
+            'registration': ctx.Process(
+                target=_registration_worker,
+                args=(self.rooms, self.config, self._slot_queue, self._outbox, self._inboxes['registration'], self._stop_event),
+                name="RegistrationWorker",
+                daemon=True
+            )
+        }
+
+        rooms_per_host = Counter(urlsplit(room.base_url).netloc for room in self.rooms)
+        for room in self.rooms:
+            self._inboxes[room.key] = ctx.Queue()
+            self.processes[room.key] = ctx.Process(
+                target=_sweep_worker,
+                args=(room, self.config, 1.0 / rooms_per_host[urlsplit(room.base_url).netloc],
+                      self._slot_queue, self._outbox, self._inboxes[room.key], self._stop_event),
+                name=f"SweepWorker-{room.key}",
+                daemon=True
+            )
+
+        self._forwarding.set()
+        self._forwarder = threading.Thread(target=self._forward_loop, name="WorkerEventForwarder", daemon=True)
+        self._forwarder.start()
+
+        for process in self.processes.values():
+            process.start()
+        logger.info(f"🧵 Started {len(self.processes)} worker processes: {', '.join(self.processes)}")
+
+    def _forward_loop(self):
+        """Relay worker messages: events to the local queue, pending lists to sweep workers."""
+        while self._forwarding.is_set():
+            try:
+                message = self._outbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            kind = message[0]
+            if kind == 'event':
+                get_event_queue().emit(message[1])
+            elif kind == 'stats':
+                with self._stats_lock:
+                    if message[1] == 'registration':
+                        self._registration_stats = message[2]
+                    else:
+                        self._room_stats[message[1]] = message[2]
+            elif kind == 'pending':
+                with self._stats_lock:
+                    self._pending_count = len(message[1])
+                for key, inbox in self._inboxes.items():
+                    if key != 'registration':
+                        inbox.put(message)
+
+    def is_alive(self) -> bool:
+        """Check if any worker process is alive."""
+        return any(process.is_alive() for process in self.processes.values())
+
+    def stop(self, timeout: float = 5.0):
+        """Signal workers to stop, wait for them and terminate stragglers."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for name, process in self.processes.items():
+            if process.pid is None:
+                continue
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker process {name} did not stop cleanly - terminating")
+                process.terminate()
+        self._forwarding.clear()
+        if self._forwarder:
+            self._forwarder.join(timeout=2.0)
+
+    def request_refresh(self):
+        """Ask the registration worker to reload pending registrants."""
+        if 'registration' in self._inboxes:
+            self._inboxes['registration'].put('refresh')
+
+    def get_pending_count(self) -> int:
+        """Pending registrant count last published by the registration worker."""
+        with self._stats_lock:
+            return self._pending_count
+
+    def get_room_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latest statistics reported by each sweep worker."""
+        with self._stats_lock:
+            return dict(self._room_stats)
+
+    def get_registration_stats(self) -> Dict[str, Any]:
+        """Latest statistics reported by the registration worker."""
+        with self._stats_lock:
+            return dict(self._registration_stats)
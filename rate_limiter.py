@@ -0,0 +1,169 @@
+"""
+Token-bucket rate limiting for requests sent to the appointment system.
+Bounds the aggregate request rate per endpoint across all threads and the
+async sweep engine, and records how long callers waited for a token.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+from logging_config import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+# Default (requests per second, burst) per endpoint
+DEFAULT_RATE_LIMITS = {
+    'godziny_pokoj': (20.0, 10),
+    'securimage': (5.0, 5),
+    'send': (5.0, 8),
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens are reserved under a lock and callers sleep outside it, so the
+    bucket can go negative: each reservation is scheduled at the next free
+    slot. Over any window of T seconds at most burst + rate * T requests are
+    released.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int):
+        """
+        Initialize token bucket.
+
+        Args:
+            name: Bucket name used in logs and metrics
+            rate: Refill rate in tokens (requests) per second, 0 disables limiting
+            burst: Bucket capacity
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {
+            'acquired': 0,
+            'delayed': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0
+        }
+
+    def reserve(self) -> float:
+        """
+        Reserve one token.
+
+        Returns:
+            float: Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            wait = 0.0
+            if self.rate > 0:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = -self._tokens / self.rate
+
+            self._stats['acquired'] += 1
+            if wait > 0:
+                self._stats['delayed'] += 1
+                self._stats['total_wait'] += wait
+                self._stats['max_wait'] = max(self._stats['max_wait'], wait)
+            return wait
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Await until a token is available. Returns seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bucket metrics."""
+        with self._lock:
+            stats = self._stats.copy()
+        stats['rate'] = self.rate
+        stats['burst'] = self.burst
+        stats['avg_wait'] = stats['total_wait'] / stats['acquired'] if stats['acquired'] else 0.0
+        return stats
+
+
+# Global bucket registry keyed by endpoint and host
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+# Share of the configured rates this process may use (see set_rate_limit_scale)
+_rate_scale = 1.0
+
+
+def set_rate_limit_scale(scale: float):
+    """
+    Scale the rates of buckets created from now on.
+
+    Worker processes that split one server budget between them call this
+    before sending requests, e.g. with 1/3 when three processes poll the
+    same host.
+    """
+    global _rate_scale
+    _rate_scale = scale
+
+
+def _load_limit(endpoint: str):
+    """Read (rate, burst) for an endpoint from environment, falling back to defaults."""
+    default_rate, default_burst = DEFAULT_RATE_LIMITS.get(endpoint, (0.0, 1))
+    env_prefix = f"RATE_LIMIT_{endpoint.upper()}"
+    rate = float(os.environ.get(f"{env_prefix}_RPS", default_rate)) * _rate_scale
+    burst = max(1, int(int(os.environ.get(f"{env_prefix}_BURST", default_burst)) * _rate_scale))
+    return rate, burst
+
+
+def get_rate_limiter(endpoint: str, url: Optional[str] = None) -> TokenBucket:
+    """
+    Get the shared token bucket for an endpoint.
+
+    Args:
+        endpoint: One of 'godziny_pokoj', 'securimage', 'send'
+        url: Optional request URL; its host keeps separate budgets per office server
+
+    Returns:
+        TokenBucket: Shared bucket instance
+    """
+    host = urlsplit(url).netloc if url else None
+    key = f"{endpoint}@{host}" if host else endpoint
+    bucket = _rate_limiters.get(key)
+    if bucket is None:
+        with _rate_limiters_lock:
+            bucket = _rate_limiters.get(key)
+            if bucket is None:
+                rate, burst = _load_limit(endpoint)
+                bucket = TokenBucket(key, rate, burst)
+                _rate_limiters[key] = bucket
+                logger.info(f"🚦 Rate limiter '{key}': {rate} req/s, burst {burst}")
+    return bucket
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Get metrics for all rate limiters."""
+    with _rate_limiters_lock:
+        buckets = list(_rate_limiters.items())
+    return {key: bucket.get_stats() for key, bucket in buckets}
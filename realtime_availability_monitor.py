@@ -5,36 +5,54 @@ Dynamically extracts datepicker constraints from the web page.
 Extends existing ajax2py.py patterns following LEVER framework.
 """
 
-import requests
+import os
 import time
 import json
 import re
+import hashlib
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from ajax2py import get_timeslots_for_single_date
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from sweep_engine import get_sweep_engine
+from probe_scheduler import AdaptiveProbeScheduler
+from registration_dispatcher import RegistrationDispatcher
 import threading
-from database import get_pending_registrations, create_reservation_for_registrant
-from ajax2py import send_registration_request_with_retry
+from ajax2py import get_session_and_captcha
 from monitor_events_manager import (
     get_event_emitter,
     emit_error,
     emit_slot_found,
-    emit_registration_success,
-    emit_registration_failed,
     emit_status_update,
     emit_datepicker_change
 )
-import base64
+from http_client import get_http_client
+from rate_limiter import get_rate_limiter_stats
+from solver_router import get_solver_router
 from logging_config import get_logger
 
 logger = get_logger(__name__)
 
 class RealTimeAvailabilityMonitor:
-    def __init__(self, page_url="https://olsztyn.uw.gov.pl/wizytakartapolaka/pokoj_A1.php"):
-        self.page_url = page_url
-        self.base_url = "https://olsztyn.uw.gov.pl/wizytakartapolaka/"
-        self.endpoint = "godziny_pokoj_A1.php"
+    def __init__(self, page_url="https://olsztyn.uw.gov.pl/wizytakartapolaka/pokoj_A1.php", dispatcher=None, room_config=None):
+        """
+        Args:
+            page_url: Room page with the datepicker configuration (ignored when room_config is given)
+            dispatcher: Shared RegistrationDispatcher when several rooms are monitored together;
+                        a private one is created when omitted
+            room_config: OfficeRoom from the office registry
+        """
+        self.room_config = room_config
+        if room_config:
+            self.page_url = room_config.page_url
+            self.base_url = room_config.base_url
+            self.endpoint = room_config.hours_endpoint
+            self.room_prefix = room_config.room_prefix
+            self.office = room_config.office
+        else:
+            self.page_url = page_url
+            self.base_url = page_url.rsplit('/', 1)[0] + '/'
+            self.endpoint = "godziny_pokoj_A1.php"
+            self.room_prefix = None  # Derived from the endpoint
+            self.office = None
         self.stop_event = threading.Event()
         self.results = {}
         self.available_dates = []
@@ -43,363 +61,127 @@ class RealTimeAvailabilityMonitor:
             'slots_found': 0,
             'last_check': None,
             'start_time': None,
-            'pending_registrants': 0,
-            'target_months': [],
-            'last_registrant_check': None,
-            'successful_registrations': 0,
-            'registration_attempts': 0,
             'last_status_log': None,
-            'cycle_duration': 0
+            'cycle_duration': 0,
+            'dates_skipped': 0
         }
         self.datepicker_config = None
+        self.datepicker_refresh_interval = 30  # Re-fetch room page every n seconds
+        self.datepicker_version = 0  # Incremented on every actual config change
+        self._datepicker_fetched_at = None
+        self._datepicker_etag = None
+        self._datepicker_last_modified = None
+        self._datepicker_content_hash = None
+        self._candidate_index = {}  # (year, month) -> bookable weekday dates
+        self._candidate_index_version = None
+        self._candidate_dates = []
+        self._candidate_dates_key = None
         self.stats_lock = threading.Lock()
-        self.pending_registrants = []
-        self.target_months = set()
-        self.last_db_check = None
-        self.db_check_interval = 1800  # Check database every n seconds
+        
+        # Pending registrants and registration attempts, possibly shared with other rooms
+        self.owns_dispatcher = dispatcher is None
+        self.dispatcher = dispatcher or RegistrationDispatcher(self.base_url)
         
         # Event emitter for Telegram notifications
         self.event_emitter = get_event_emitter()
+        
+        # Shared asyncio engine for concurrent date probes
+        self.sweep_engine = get_sweep_engine()
+        
+        # Learns slot appearance patterns to prioritise hot dates
+        self.probe_scheduler = AdaptiveProbeScheduler(
+            min_rate=float(os.environ.get("PROBE_MIN_RATE", "0.25"))
+        )
+    
+    @property
+    def pending_registrants(self):
+        """Pending registrants held by the dispatcher."""
+        return self.dispatcher.pending_registrants
+    
+    @property
+    def target_months(self):
+        """Months wanted by pending registrants."""
+        return self.dispatcher.target_months
+    
+    @property
+    def db_check_interval(self):
+        return self.dispatcher.db_check_interval
+    
+    @db_check_interval.setter
+    def db_check_interval(self, value):
+        self.dispatcher.db_check_interval = value
+    
+    @property
+    def captcha_pool(self):
+        """Prefetch pool for this monitor's office server, if running."""
+        return self.dispatcher.captcha_pools.get(self.base_url)
     
     def get_current_stats(self):
         """Get current statistics (thread-safe)."""
         with self.stats_lock:
-            return self.stats.copy()
+            stats = self.stats.copy()
+        stats.update(self.dispatcher.get_stats())
+        stats['rate_limits'] = get_rate_limiter_stats()
+        stats['captcha_solvers'] = get_solver_router().get_stats()
+        stats['sweep_engine'] = self.sweep_engine.get_stats()
+        if self.captcha_pool:
+            stats['captcha_pool'] = self.captcha_pool.get_stats()
+        return stats
     
     def refresh_pending_registrants(self):
         """Refresh pending registrants from database."""
-        try:
-            self.pending_registrants = get_pending_registrations()
-            self.target_months = {r.desired_month for r in self.pending_registrants}
-            
-            with self.stats_lock:
-                self.stats['pending_registrants'] = len(self.pending_registrants)
-                self.stats['target_months'] = list(self.target_months)
-                self.stats['last_registrant_check'] = datetime.now().isoformat()
-            
-            logger.info(f"🗄️ Database refresh: {len(self.pending_registrants)} pending registrants for months {list(self.target_months)}")
-            return True
-        except Exception as e:
-            error_msg = f"Failed to refresh database: {str(e)}"
-            logger.error(f"❌ {error_msg}")
-            emit_error(error_msg, {'exception': str(e)})
-            return False
-        
-    def get_captcha_image(self, session_id=None):
-        """Fetch CAPTCHA image from server and return as base64 string."""
-        captcha_url = f"{self.base_url}securimage/securimage_show.php"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': self.base_url
-        }
-        
-        cookies = {'PHPSESSID': session_id} if session_id else {}
-        
-        try:
-            response = requests.get(captcha_url, headers=headers, cookies=cookies, timeout=10)
-            if response.status_code == 200:
-                # Convert image to base64
-                captcha_base64 = base64.b64encode(response.content).decode('ascii')
-                return captcha_base64, response.cookies.get('PHPSESSID', session_id)
-            else:
-                logger.error(f"❌ Failed to fetch CAPTCHA: HTTP {response.status_code}")
-                return None, None
-        except Exception as e:
-            logger.error(f"❌ CAPTCHA fetch error: {e}")
-            return None, None
-
-    def distribute_registrants_to_slots(self, available_slots):
-        """
-        Distribute pending registrants across available timeslots based on priority and desired months.
-        Lower registrant ID = higher priority.
-        
-        Args:
-            available_slots (list): List of slot dictionaries from get_timeslots()
-            
-        Returns:
-            list: List of (registrant, slot) assignment tuples
-        """
-        if not available_slots or not self.pending_registrants:
-            return []
-        
-        # Group available slots by month
-        slots_by_month = {}
-        for slot in available_slots:
-            slot_month = datetime.strptime(slot['date'], "%Y-%m-%d").month
-            if slot_month not in slots_by_month:
-                slots_by_month[slot_month] = []
-            slots_by_month[slot_month].append(slot)
-        
-        # Group registrants by desired month, sorted by ID (lower ID = higher priority)
-        registrants_by_month = {}
-        for registrant in sorted(self.pending_registrants, key=lambda r: r.id):
-            month = registrant.desired_month
-            if month not in registrants_by_month:
-                registrants_by_month[month] = []
-            registrants_by_month[month].append(registrant)
-        
-        # Create registrant-slot assignments
-        assignments = []
-        for month in slots_by_month:
-            if month in registrants_by_month:
-                slots = slots_by_month[month]
-                registrants = registrants_by_month[month]
-                
-                # Sort slots by date and time to ensure earliest slots go to highest priority registrants
-                slots_sorted = sorted(slots, key=lambda s: (s['date'], s['time']))
-                
-                logger.info(f"📅 Month {month}: {len(slots)} slots, {len(registrants)} registrants")
-                
-                # Distribute slots to registrants based on priority
-                # If more slots than registrants, highest priority registrants get first choice
-                # If more registrants than slots, only highest priority registrants get slots
-                for i, slot in enumerate(slots_sorted):
-                    if i < len(registrants):
-                        registrant = registrants[i]
-                        assignments.append((registrant, slot))
-                        logger.info(f"  🎯 Assigned: {registrant.name} {registrant.surname} (ID:{registrant.id}) → {slot['display_text']}")
-        
-        logger.info(f"📋 Total assignments: {len(assignments)}")
-        return assignments
-
-    def attempt_single_registration(self, registrant, slot):
-        """
-        Attempt registration for a single registrant-slot pair.
-        Used for parallel registration processing.
-        
-        Args:
-            registrant: Registrant object with .to_registration_data() method
-            slot: Slot dictionary with 'date' and 'timeslot_value' keys
-            
-        Returns:
-            dict: Registration attempt result with registrant and slot info
-        """
-        try:
-            logger.info(f"🎯 Starting registration: {registrant.name} {registrant.surname} → {slot['display_text']}")
-            
-            # Prepare registration data
-            registrant_data = registrant.to_registration_data()
-            timeslot_data = {
-                'date': slot['date'],
-                'timeslot_value': slot['timeslot_value']
-            }
-            
-            # Send registration request with built-in CAPTCHA retry mechanism
-            registration_result = send_registration_request_with_retry(
-                base_url=self.base_url,
-                registrant_data=registrant_data,
-                timeslot_data=timeslot_data,
-                max_retries=12
-            )
-            
-            return {
-                'registrant': registrant,
-                'slot': slot,
-                'registrant_data': registrant_data,
-                'result': registration_result,
-                'success': registration_result.get('success', False)
-            }
-            
-        except Exception as e:
-            error_msg = f"Registration attempt failed for {registrant.name}: {str(e)}"
-            logger.error(f"❌ {error_msg}")
-            return {
-                'registrant': registrant,
-                'slot': slot,
-                'registrant_data': registrant.to_registration_data() if hasattr(registrant, 'to_registration_data') else {},
-                'result': {'success': False, 'error': error_msg},
-                'success': False
-            }
-
-    def attempt_auto_registration(self, available_slots):
-        """
-        Attempt automatic registration using parallel processing and smart distribution.
-        Distributes registrants across slots by priority and runs registration attempts in parallel.
-        
-        Args:
-            available_slots (list): List of slot dictionaries from get_timeslots()
-            
-        Returns:
-            list: List of successful registration results
-        """
-        if not available_slots or not self.pending_registrants:
-            return []
-        
-        # Step 1: Distribute registrants to slots based on priority and desired months
-        assignments = self.distribute_registrants_to_slots(available_slots)
-        
-        if not assignments:
-            logger.info("⏭️  No matching registrant-slot assignments found")
-            return []
-        
-        logger.info(f"🚀 Starting PARALLEL registration for {len(assignments)} assignments...")
-        
-        successful_registrations = []
-        max_workers = min(8, len(assignments))  # Use up to 8 parallel workers
-        
-        # Step 2: Execute registration attempts in parallel
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all registration attempts
-            future_to_assignment = {
-                executor.submit(self.attempt_single_registration, registrant, slot): (registrant, slot)
-                for registrant, slot in assignments
-            }
-            
-            completed_count = 0
-            total_assignments = len(assignments)
-            
-            # Process results as they complete
-            for future in as_completed(future_to_assignment):
-                try:
-                    attempt_result = future.result()
-                    completed_count += 1
-                    
-                    registrant = attempt_result['registrant']
-                    slot = attempt_result['slot']
-                    registration_result = attempt_result['result']
-                    
-                    logger.info(f"📋 Completed {completed_count}/{total_assignments}: {registrant.name} {registrant.surname}")
-                    
-                    # Process successful registration
-                    if attempt_result['success']:
-                        # Generate reservation ID and update database
-                        import uuid
-                        
-                        success_data = registration_result.get('success_data')
-                        if success_data and success_data.get('registration_code'):
-                            reservation_id = f"{success_data['registration_code']}"
-                        else:
-                            reservation_id = f"AUTO_{uuid.uuid4().hex[:8].upper()}"
-                        
-                        success = create_reservation_for_registrant(
-                            registrant_id=registrant.id,
-                            reservation_id=reservation_id,
-                            success_data=success_data
-                        )
-                        
-                        if success:
-                            # Emit registration success event
-                            emit_registration_success(
-                                registrant_data=attempt_result['registrant_data'],
-                                slot_data=slot
-                            )
-                            
-                            attempt_info = f" (attempt {registration_result.get('attempt', 1)}/{registration_result.get('max_retries', 12) + 1})" if registration_result.get('attempt', 1) > 1 else ""
-                            logger.info(f"✅ REGISTRATION SUCCESS: {registrant.name} {registrant.surname}{attempt_info}")
-                            
-                            if success_data:
-                                logger.info(f"   📅 Confirmed: {success_data.get('appointment_date')} {success_data.get('appointment_time')} - {success_data.get('room')}")
-                                logger.info(f"   📧 Email: {success_data.get('email')}")
-                                logger.info(f"   📞 Phone: {success_data.get('phone')}")
-                                logger.info(f"   🆔 Code: {success_data.get('registration_code')}")
-                            else:
-                                logger.info(f"   📅 Slot: {slot['display_text']}")
-                            
-                            logger.info(f"   🆔 Reservation: {reservation_id}")
-                            
-                            successful_registrations.append({
-                                'registrant_id': registrant.id,
-                                'registrant_name': f"{registrant.name} {registrant.surname}",
-                                'reservation_id': reservation_id,
-                                'slot_info': slot,
-                                'registration_result': registration_result
-                            })
-                            
-                            # Remove from pending list to avoid re-attempts
-                            self.pending_registrants = [r for r in self.pending_registrants if r.id != registrant.id]
-                            
-                        else:
-                            error_msg = f"Database update failed for {registrant.name}"
-                            logger.error(f"❌ {error_msg}")
-                            emit_registration_failed(
-                                registrant_data=attempt_result['registrant_data'],
-                                slot_data=slot,
-                                error=error_msg
-                            )
-                    
-                    else:
-                        # Registration failed
-                        attempt_info = f" (failed after {registration_result.get('attempt', 1)} attempts)" if registration_result.get('attempt') else ""
-                        error_msg = registration_result.get('message') or registration_result.get('error', 'Unknown error')
-                        full_error_msg = f"Registration failed{attempt_info}: {error_msg}"
-                        logger.error(f"❌ {full_error_msg}")
-                        
-                        emit_registration_failed(
-                            registrant_data=attempt_result['registrant_data'],
-                            slot_data=slot,
-                            error=full_error_msg
-                        )
-                
-                except Exception as e:
-                    registrant, slot = future_to_assignment[future]
-                    error_msg = f"Parallel registration error for {registrant.name}: {str(e)}"
-                    logger.error(f"❌ {error_msg}")
-                    emit_registration_failed(
-                        registrant_data=registrant.to_registration_data(),
-                        slot_data=slot,
-                        error=error_msg
-                    )
-        
-        # Step 3: Update target months after successful registrations
-        if successful_registrations:
-            self.target_months = set(r.desired_month for r in self.pending_registrants)
-            
-            logger.info(f"🎉 PARALLEL REGISTRATION SUMMARY: {len(successful_registrations)} successful registrations!")
-            with self.stats_lock:
-                self.stats['successful_registrations'] = self.stats.get('successful_registrations', 0) + len(successful_registrations)
-        else:
-            logger.info("ℹ️  No successful registrations in parallel attempt")
-            
-        return successful_registrations
-
+        return self.dispatcher.refresh_pending_registrants()
+    
     def check_pending_registrants(self):
         """Check database for pending registrants and update target months."""
-        try:
-            self.pending_registrants = get_pending_registrations()
-            new_target_months = set(r.desired_month for r in self.pending_registrants)
-            
-            # Check if target months changed
-            if new_target_months != self.target_months:
-                logger.info(f"📊 Target months updated: {sorted(new_target_months)} (was: {sorted(self.target_months)})")
-                self.target_months = new_target_months
-                # Clear available_dates to force recalculation
-                self.available_dates = []
-            
-            with self.stats_lock:
-                self.stats['pending_registrants'] = len(self.pending_registrants)
-                self.stats['target_months'] = sorted(list(self.target_months))
-                self.stats['last_registrant_check'] = datetime.now().isoformat()
-            
-            self.last_db_check = datetime.now()
-            
-            logger.info(f"👥 Found {len(self.pending_registrants)} pending registrants for months: {sorted(self.target_months)}")
-            
-            for registrant in self.pending_registrants:
-                logger.info(f"  - {registrant.name} {registrant.surname} (month {registrant.desired_month})")
-            
-            return len(self.pending_registrants) > 0
-            
-        except Exception as e:
-            logger.error(f"❌ Error checking pending registrants: {e}")
-            return len(self.pending_registrants) > 0  # Continue if we had registrants before
-
+        return self.dispatcher.check_pending_registrants()
+    
     def should_check_database(self):
-        """Check if it's time to refresh registrant data from database."""
-        if not self.last_db_check:
-            return True
-        return (datetime.now() - self.last_db_check).seconds >= self.db_check_interval
+        """Check if it's time to refresh registrant data; only one monitor per interval gets True."""
+        return self.dispatcher.claim_database_check()
+    
+    def attempt_auto_registration(self, available_slots):
+        """Hand slots found by this monitor to the registration dispatcher."""
+        return self.dispatcher.attempt_auto_registration(available_slots)
+    
+    def get_captcha_image(self, session_id=None):
+        """Fetch CAPTCHA image from server and return as base64 string."""
+        captcha_data = get_session_and_captcha(self.base_url, session_id)
+        if captcha_data['success']:
+            return captcha_data['image_base64'], captcha_data['session_id']
+        logger.error(f"❌ Failed to fetch CAPTCHA: {captcha_data.get('error')}")
+        return None, None
 
     def extract_datepicker_config(self, verbose=False):
         """Dynamically extract datepicker configuration from the web page."""
         if verbose:
             logger.info(f"🔍 Extracting datepicker configuration from {self.page_url}...")
         
+        # Conditional request headers from the previous fetch
+        headers = {}
+        if self._datepicker_etag:
+            headers['If-None-Match'] = self._datepicker_etag
+        if self._datepicker_last_modified:
+            headers['If-Modified-Since'] = self._datepicker_last_modified
+        
         try:
-            response = requests.get(self.page_url, timeout=10)
+            response = get_http_client().get(self.page_url, headers=headers)
+            if response.status_code == 304 and self.datepicker_config is not None:
+                if verbose:
+                    logger.info("📅 Datepicker page not modified - using cached configuration")
+                return self.datepicker_config
             if response.status_code != 200:
                 raise Exception(f"Failed to fetch page: {response.status_code}")
             
+            # Skip parsing when the page body is byte-identical to the last parsed one
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            if content_hash == self._datepicker_content_hash and self.datepicker_config is not None:
+                self._datepicker_etag = response.headers.get('ETag')
+                self._datepicker_last_modified = response.headers.get('Last-Modified')
+                if verbose:
+                    logger.info("📅 Datepicker page unchanged - using cached configuration")
+                return self.datepicker_config
+            
             html_content = response.text
             
             # Extract disabled days array
@@ -430,6 +212,10 @@ class RealTimeAvailabilityMonitor:
                 logger.info(f"📅 Date range: {min_date_str} to {max_date_str}")
                 logger.info(f"🚫 Disabled days: {len(disabled_days)} dates")
             
+            # Only a successfully parsed page may be revalidated with a 304 later
+            self._datepicker_content_hash = content_hash
+            self._datepicker_etag = response.headers.get('ETag')
+            self._datepicker_last_modified = response.headers.get('Last-Modified')
             return {
                 'min_date': min_date,
                 'max_date': max_date,
@@ -438,6 +224,12 @@ class RealTimeAvailabilityMonitor:
             
         except Exception as e:
             logger.error(f"❌ Error extracting datepicker config: {e}")
+            self._datepicker_etag = None
+            self._datepicker_last_modified = None
+            if self.datepicker_config is not None:
+                if verbose:
+                    logger.info("Using last known configuration...")
+                return self.datepicker_config
             if verbose:
                 logger.info("Using fallback configuration...")
             # Fallback to reasonable defaults
@@ -473,6 +265,39 @@ class RealTimeAvailabilityMonitor:
         
         return changes
     
+    def should_refresh_datepicker(self):
+        """Check if the cached datepicker config is older than the refresh interval."""
+        if self.datepicker_config is None or self._datepicker_fetched_at is None:
+            return True
+        return time.monotonic() - self._datepicker_fetched_at >= self.datepicker_refresh_interval
+    
+    def refresh_datepicker_config(self, verbose=False, force=False):
+        """Re-fetch datepicker config when stale and report changes only on actual change."""
+        if not force and not self.should_refresh_datepicker():
+            return False
+        
+        new_datepicker_config = self.extract_datepicker_config(verbose=verbose)
+        self._datepicker_fetched_at = time.monotonic()
+        
+        # Cached config returned as-is means nothing changed
+        if new_datepicker_config is self.datepicker_config:
+            return False
+        
+        # Detect changes
+        if self.datepicker_config is not None:
+            changes = self._detect_datepicker_changes(self.datepicker_config, new_datepicker_config)
+            if not changes:
+                return False
+            logger.info(f"🔄 Datepicker config changed: {changes}")
+            emit_datepicker_change(
+                old_config=self.datepicker_config,
+                new_config=new_datepicker_config,
+                changes=changes
+            )
+        self.datepicker_config = new_datepicker_config
+        self.datepicker_version += 1
+        return True
+    
     def get_available_dates(self, verbose=False):
         """Get available dates filtered by registrant desired months."""
         if not self.target_months:
@@ -480,49 +305,63 @@ class RealTimeAvailabilityMonitor:
                 logger.info("⏸️  No target months - no pending registrants")
             return []
             
-        new_datepicker_config = self.extract_datepicker_config(verbose=verbose)
-        # Detect changes
-        if self.datepicker_config is not None:
-            changes = self._detect_datepicker_changes(self.datepicker_config, new_datepicker_config)
-            if changes:
-                logger.info(f"🔄 Datepicker config changed: {changes}")
-                emit_datepicker_change(
-                    old_config=self.datepicker_config,
-                    new_config=new_datepicker_config,
-                    changes=changes
-                )
-        self.datepicker_config = new_datepicker_config
-
-        available_dates = []
+        self.refresh_datepicker_config(verbose=verbose)
         
         # Start from today, not from datepicker minDate
-        today = datetime.now().date()
-        current_date = max(self.datepicker_config['min_date'].date(), today)  # Use today if it's later than minDate
-        current_date = datetime.combine(current_date, datetime.min.time())  # Convert back to datetime
-        
-        if verbose:
-            logger.info(f"ℹ️  Checking dates from {current_date.strftime('%Y-%m-%d')} to {self.datepicker_config['max_date'].strftime('%Y-%m-%d')}")
-            logger.info(f"🎯 Filtering for target months: {sorted(self.target_months)}")
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        cache_key = (self.datepicker_version, frozenset(self.target_months), today_str)
         
-        while current_date <= self.datepicker_config['max_date']:
-            date_str = current_date.strftime("%Y-%m-%d")
+        if cache_key != self._candidate_dates_key:
+            if self._candidate_index_version != self.datepicker_version:
+                self._rebuild_candidate_index()
             
-            # Only weekdays (Monday=0 to Friday=4) in target months
-            if (current_date.weekday() < 5 and 
-                date_str not in self.datepicker_config['disabled_days'] and
-                current_date.month in self.target_months):
-                available_dates.append(date_str)
-            
-            current_date += timedelta(days=1)
+            # Merge per-month candidate lists for target months, dropping past dates
+            self._candidate_dates = [
+                date_str
+                for (year, month), month_dates in sorted(self._candidate_index.items())
+                if month in self.target_months
+                for date_str in month_dates
+                if date_str >= today_str
+            ]
+            self._candidate_dates_key = cache_key
+        
+        available_dates = self._candidate_dates
         
         if verbose:
+            start_str = max(self.datepicker_config['min_date'].strftime('%Y-%m-%d'), today_str)
+            logger.info(f"ℹ️  Checking dates from {start_str} to {self.datepicker_config['max_date'].strftime('%Y-%m-%d')}")
+            logger.info(f"🎯 Filtering for target months: {sorted(self.target_months)}")
             logger.info(f"ℹ️  Days to check: {', '.join(available_dates[:10])}{'...' if len(available_dates) > 10 else ''}")
             logger.info(f"✅ Found {len(available_dates)} potentially available dates in target months")
         return available_dates
     
-    def get_timeslots(self, verbose=False):
-        """Single sweep through all available dates using parallel processing.
-        Returns structured timeslot data ready for registration process."""
+    def _rebuild_candidate_index(self):
+        """Index bookable weekdays per (year, month) for the current datepicker config."""
+        disabled_days = set(self.datepicker_config['disabled_days'])
+        current_date = self.datepicker_config['min_date'].date()
+        max_date = self.datepicker_config['max_date'].date()
+        
+        index = {}
+        while current_date <= max_date:
+            # Only weekdays (Monday=0 to Friday=4) that are not disabled
+            if current_date.weekday() < 5:
+                date_str = current_date.isoformat()
+                if date_str not in disabled_days:
+                    index.setdefault((current_date.year, current_date.month), []).append(date_str)
+            current_date += timedelta(days=1)
+        
+        self._candidate_index = index
+        self._candidate_index_version = self.datepicker_version
+    
+    def get_timeslots(self, verbose=False, on_slots=None):
+        """Single sweep through all available dates using the async sweep engine.
+        Returns structured timeslot data ready for registration process.
+        
+        Args:
+            verbose: Log per-date progress
+            on_slots: Optional callback receiving registration-ready slots of each date
+                      with availability as soon as that date is probed
+        """
         now = datetime.now().strftime('%H:%M:%S')
         
         # Clear previous results to ensure we only return current cycle data
@@ -545,63 +384,64 @@ class RealTimeAvailabilityMonitor:
             }
         
         if verbose:
-            logger.info(f"[{now}] Checking {len(self.available_dates)} dates in parallel...")
+            logger.info(f"[{now}] Checking {len(self.available_dates)} dates concurrently...")
             logger.info(f"ℹ️  Checking dates: {', '.join(self.available_dates[:5])}{'...' if len(self.available_dates) > 5 else ''}")
         
         new_slots_found = False
-        max_workers = min(8, len(self.available_dates))  # Use 8 workers max, or fewer if less dates
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all date checks
-            future_to_date = {
-                executor.submit(get_timeslots_for_single_date, date_str, self.base_url, self.endpoint): date_str 
-                for date_str in self.available_dates
-            }
-            
-            completed_count = 0
-            total_dates = len(self.available_dates)
-            
-            # Process results as they complete
-            for future in as_completed(future_to_date):
-                if self.stop_event.is_set():
-                    break
-                
-                try:
-                    date_str, slots = future.result()
-                    completed_count += 1
-                    self.stats['checks_performed'] += 1
+        completed_count = 0
+        
+        # Hot dates every cycle, cold dates at their learned probe rate
+        dates_to_probe = self.probe_scheduler.select(self.available_dates)
+        total_dates = len(dates_to_probe)
+        self.stats['dates_skipped'] += len(self.available_dates) - total_dates
+        
+        # Probe scheduled dates concurrently on the sweep engine loop
+        # (a stop cancels the probes still in flight)
+        sweep_results = self.sweep_engine.iter_sweep(dates_to_probe, self.base_url, self.endpoint,
+                                                     stop_event=self.stop_event)
+        
+        # Process results as they arrive
+        for date_str, slots in sweep_results:
+            try:
+                completed_count += 1
+                self.stats['checks_performed'] += 1
+                self.probe_scheduler.record(date_str, slots)
 
-                    # Filter out past timeslots for today (Poland timezone)
-                    current_datetime = datetime.now(ZoneInfo("Europe/Warsaw"))
-                    if date_str == current_datetime.strftime("%Y-%m-%d"):
-                        # Add 3-hour buffer to current time
-                        buffer_datetime = current_datetime + timedelta(hours=3)   # AG: Time buffer
-                        buffer_time = buffer_datetime.strftime("%H:%M")
-                        slots = [slot for slot in slots if slot > buffer_time]
+                # Filter out past timeslots for today (Poland timezone)
+                current_datetime = datetime.now(ZoneInfo("Europe/Warsaw"))
+                if date_str == current_datetime.strftime("%Y-%m-%d"):
+                    # Add 3-hour buffer to current time
+                    buffer_datetime = current_datetime + timedelta(hours=3)   # AG: Time buffer
+                    buffer_time = buffer_datetime.strftime("%H:%M")
+                    slots = [slot for slot in slots if slot > buffer_time]
+                
+                if verbose:
+                    logger.info(f"ℹ️  Completed {date_str} ({completed_count}/{total_dates}) - {len(slots)} slots")
+                
+                # Track changes
+                if slots:
+                    if date_str not in self.results or self.results[date_str] != slots:
+                        if date_str not in self.results:
+                            logger.info(f"🎉 NEW AVAILABILITY: {date_str} -> {', '.join(slots)}")
+                        else:
+                            logger.info(f"📝 UPDATED: {date_str} -> {', '.join(slots)}")
+                        new_slots_found = True
+                        self.stats['slots_found'] += len(slots)
                     
-                    if verbose:
-                        logger.info(f"ℹ️  Completed {date_str} ({completed_count}/{total_dates}) - {len(slots)} slots")
+                    self.results[date_str] = slots
                     
-                    # Track changes
-                    if slots:
-                        if date_str not in self.results or self.results[date_str] != slots:
-                            if date_str not in self.results:
-                                logger.info(f"🎉 NEW AVAILABILITY: {date_str} -> {', '.join(slots)}")
-                            else:
-                                logger.info(f"📝 UPDATED: {date_str} -> {', '.join(slots)}")
-                            new_slots_found = True
-                            self.stats['slots_found'] += len(slots)
-                        
-                        self.results[date_str] = slots
-                    else:
-                        # Remove if no longer available
-                        if date_str in self.results:
-                            logger.info(f"❌ REMOVED: {date_str} (no longer available)")
-                            del self.results[date_str]
-                        # Don't print "no slots" for every date to reduce noise
-                
-                except Exception as e:
-                    logger.error(f"❌ Error checking {future_to_date[future]}: {e}")
+                    # Hand slots to registration without waiting for the rest of the sweep
+                    if on_slots:
+                        on_slots(self._registration_slots(date_str, slots))
+                else:
+                    # Remove if no longer available
+                    if date_str in self.results:
+                        logger.info(f"❌ REMOVED: {date_str} (no longer available)")
+                        del self.results[date_str]
+                    # Don't print "no slots" for every date to reduce noise
+            
+            except Exception as e:
+                logger.error(f"❌ Error checking {date_str}: {e}")
         
         self.stats['last_check'] = datetime.now().isoformat()
         if verbose:
@@ -610,25 +450,7 @@ class RealTimeAvailabilityMonitor:
         # Return structured data ready for registration
         registration_ready_slots = []
         for date_str, slots in self.results.items():
-            for slot in slots:
-                # Extract room identifier from endpoint (A1 or A2)
-                room_id = "A1" if "A1" in self.endpoint else "A2"
-                
-                # Format: Room + time (e.g., "A209:00")
-                timeslot_value = f"{room_id}{slot}"
-                
-                registration_ready_slots.append({
-                    'date': date_str,           # Format: YYYY-MM-DD (for datepicker field)
-                    'time': slot,              # Format: HH:MM
-                    'timeslot_value': timeslot_value,  # Format: A2HH:MM (for godzina radio button)
-                    'room': room_id,           # A1 or A2
-                    'display_text': f"{date_str} at {slot}",
-                    'radio_button': {
-                        'id': timeslot_value,
-                        'name': 'godzina',
-                        'value': timeslot_value
-                    }
-                })
+            registration_ready_slots.extend(self._registration_slots(date_str, slots))
         
         return {
             'slots_found': new_slots_found,
@@ -642,6 +464,32 @@ class RealTimeAvailabilityMonitor:
             }
         }
     
+    def _registration_slots(self, date_str, slots):
+        """Build registration-ready slot dictionaries for one date."""
+        # Room prefix from the office registry, or extracted from endpoint (A1 or A2)
+        room_id = self.room_prefix or ("A1" if "A1" in self.endpoint else "A2")
+        
+        registration_slots = []
+        for slot in slots:
+            # Format: Room + time (e.g., "A209:00")
+            timeslot_value = f"{room_id}{slot}"
+            
+            registration_slots.append({
+                'date': date_str,           # Format: YYYY-MM-DD (for datepicker field)
+                'time': slot,              # Format: HH:MM
+                'timeslot_value': timeslot_value,  # Format: A2HH:MM (for godzina radio button)
+                'room': room_id,           # A1 or A2
+                'office': self.office,     # Office identifier from the registry
+                'base_url': self.base_url,  # Office server to register on
+                'display_text': f"{date_str} at {slot}",
+                'radio_button': {
+                    'id': timeslot_value,
+                    'name': 'godzina',
+                    'value': timeslot_value
+                }
+            })
+        return registration_slots
+    
     def start_monitoring(self, max_duration_minutes=None, check_interval:float=0.5, auto_registration:bool=True):
         """Start continuous monitoring with database-aware smart scheduling."""
         logger.info("🚀 Starting smart real-time availability monitoring with AUTO-REGISTRATION...")
@@ -655,6 +503,10 @@ class RealTimeAvailabilityMonitor:
         
         self.stop_event.clear()
         self.stats['start_time'] = datetime.now().isoformat()
+        self.probe_scheduler.load(self.get_probe_history_file())
+        
+        if auto_registration:
+            self.dispatcher.start_captcha_pool(self.base_url)
         
         try:
             start_time = time.time()
@@ -664,6 +516,7 @@ class RealTimeAvailabilityMonitor:
             while not self.stop_event.is_set():
                 cycle_count += 1
                 cycle_start = time.time()
+                batch = None
 
                 try:
                     # Check database for new/removed registrants periodically
@@ -674,7 +527,7 @@ class RealTimeAvailabilityMonitor:
                             if wait_cycles == 1:
                                 logger.info("⏸️  No pending registrants - entering standby mode")
                             logger.info(f"💤 Standby cycle {wait_cycles} - checking for new registrants in {self.db_check_interval}s...")
-                            if self.stop_event.wait(timeout=self.db_check_interval+10):
+                            if self.dispatcher.wait_for_registrants(self.stop_event, self.db_check_interval+10):
                                 break
                             continue
                         elif wait_cycles > 0:
@@ -684,14 +537,19 @@ class RealTimeAvailabilityMonitor:
                     # Get available dates (filtered by target months)
                     self.available_dates = self.get_available_dates(verbose=False)
                     
-                    # Check dates (will skip server calls if no dates)
-                    result = self.get_timeslots(verbose=False)
+                    # Check dates (will skip server calls if no dates); slots stream into
+                    # the registration batch while the sweep is still running
+                    if auto_registration:
+                        batch = self.dispatcher.begin_batch()
+                    result = self.get_timeslots(verbose=False, on_slots=batch.feed if batch else None)
                 
                 except Exception as e:
+                    if batch:
+                        batch.finish(stop_event=self.stop_event)
                     error_msg = f"Error during monitoring cycle: {str(e)}"
                     logger.error(f"❌ {error_msg}")
                     emit_error(error_msg, {'exception': str(e)})
-                    time.sleep(1)  # Wait before retrying
+                    self.stop_event.wait(timeout=1)  # Wait before retrying
                     continue
                 
                 # Track whether auto-registration was attempted (for immediate cycle restart)
@@ -708,8 +566,8 @@ class RealTimeAvailabilityMonitor:
                             f"Found {result['total_available_slots']} slots!"
                         )
                     
-                    if auto_registration:
-                        successful_registrations = self.attempt_auto_registration(result['registration_data'])
+                    if batch:
+                        successful_registrations = batch.finish(stop_event=self.stop_event)
                         auto_registration_attempted = True
                         
                         if successful_registrations:
@@ -723,6 +581,8 @@ class RealTimeAvailabilityMonitor:
                         
                         # After auto-registration attempt, immediately start new cycle
                         logger.info("🔄 IMMEDIATE RESTART: Starting new full monitoring cycle after registration attempts...")
+                elif batch:
+                    batch.finish(stop_event=self.stop_event)
                 
                 # Update cycle duration
                 cycle_end = time.time()
@@ -756,7 +616,11 @@ class RealTimeAvailabilityMonitor:
             logger.info("\n🛑 Monitoring stopped by user")
         finally:
             self.stop_event.set()
+            if self.owns_dispatcher:
+                self.dispatcher.shutdown()
             self.save_results()
+            self.probe_scheduler.save(self.get_probe_history_file())
+            get_solver_router().save()
             logger.info("🧹 start_monitoring cleanup completed")
     
     def print_status_if_needed(self):
@@ -778,6 +642,17 @@ class RealTimeAvailabilityMonitor:
                 self.get_available_dates(verbose=True)
             
             self.print_status()
+            self.probe_scheduler.save(self.get_probe_history_file())
+    
+    def get_probe_history_file(self):
+        """Path of the persisted probe history for this monitor's endpoint."""
+        data_dir = os.environ.get("DATA_DIR", "data")
+        return os.path.join(data_dir, f"probe_history_{self.get_monitor_name()}.json")
+    
+    def get_monitor_name(self):
+        """File-name friendly identifier of the monitored office room."""
+        name = self.endpoint.replace('.php', '')
+        return f"{self.office}_{name}" if self.office else name
     
     def print_status(self):
         """Print current monitoring status with registrant information."""
@@ -787,15 +662,15 @@ class RealTimeAvailabilityMonitor:
         pending_count = len(self.pending_registrants)
         cycle_duration = self.stats.get('cycle_duration', 0)
         
-        successful_regs = self.stats.get('successful_registrations', 0)
+        successful_regs = self.dispatcher.get_stats().get('successful_registrations', 0)
         logger.info(f"[{now}] Status: {available_count} dates with slots, {total_slots} total slots, {pending_count} pending registrants | Cycle: {cycle_duration:.2f}s")
-        logger.info(f"🎯 Target months: {sorted(self.target_months) if self.target_months else 'None'} | Server checks: {self.stats['checks_performed']} | ✅ Registered: {successful_regs}")
+        logger.info(f"🎯 Target months: {sorted(self.target_months) if self.target_months else 'None'} | Server checks: {self.stats['checks_performed']} (skipped cold: {self.stats['dates_skipped']}) | ✅ Registered: {successful_regs}")
         
         if self.results:
             logger.info("Current availability:")
             for date_str, slots in sorted(self.results.items()):
                 month = datetime.strptime(date_str, "%Y-%m-%d").month
-                matching_registrants = [r for r in self.pending_registrants if r.desired_month == month]
+                matching_registrants = [r for r in self.pending_registrants if month in r.acceptable_months()]
                 logger.info(f"  📅 {date_str}: {', '.join(slots)} → {len(matching_registrants)} registrants interested")
         else:
             if self.target_months:
@@ -806,7 +681,7 @@ class RealTimeAvailabilityMonitor:
     def save_results(self):
         """Save current results to file."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"realtime_monitoring_{timestamp}.json"
+        filename = f"realtime_monitoring_{self.get_monitor_name()}_{timestamp}.json"
         
         output = {
             "monitoring_session": {
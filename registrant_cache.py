@@ -0,0 +1,239 @@
+"""
+In-memory pending registrant cache kept current by Postgres LISTEN/NOTIFY.
+A trigger on the registrants table publishes every insert, update and delete
+(see database.py); the cache applies these deltas, so new sign-ups are
+eligible within milliseconds and no polling queries run in steady state.
+"""
+
+import json
+import os
+import select
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from database import REGISTRANT_CHANNEL, REGISTRANT_NOTIFY_TRIGGER
+from models import Registrant
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class RegistrantCache:
+    """
+    Pending registrants (no reservation yet) mirrored from the database.
+
+    A background thread holds a dedicated LISTEN connection, loads a snapshot
+    after subscribing and then applies change notifications in order. When
+    the connection drops, the cache is marked not live, reconnects with
+    backoff and reloads the snapshot.
+    """
+
+    def __init__(self, dsn: str, channel: str = REGISTRANT_CHANNEL, max_backoff: float = 30.0):
+        """
+        Initialize cache (nothing is loaded until start()).
+
+        Args:
+            dsn: PostgreSQL connection string
+            channel: NOTIFY channel published by the registrants trigger
+            max_backoff: Maximum seconds between reconnection attempts
+        """
+        self.dsn = dsn
+        self.channel = channel
+        self.max_backoff = max_backoff
+
+        self._registrants: Dict[int, Registrant] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+        self._live = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connection = None
+        self._stats = {
+            'snapshots': 0,
+            'notifications': 0,
+            'reconnects': 0
+        }
+
+    def start(self, timeout: float = 5.0) -> bool:
+        """
+        Start listening if not already running and wait for the first snapshot.
+
+        Args:
+            timeout: Seconds to wait for the cache to become live
+
+        Returns:
+            bool: True if the cache is live
+        """
+        with self._lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._run, name="RegistrantCache", daemon=True)
+                self._thread.start()
+        return self._live.wait(timeout)
+
+    def stop(self):
+        """Stop listening and drop the cached registrants."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        with self._lock:
+            self._registrants = {}
+        self._live.clear()
+
+    def is_live(self) -> bool:
+        """True while the cache is subscribed and reflects the database."""
+        return self._live.is_set()
+
+    def get_pending(self) -> List[Registrant]:
+        """Pending registrants ordered by ID (priority)."""
+        with self._lock:
+            return [self._registrants[registrant_id] for registrant_id in sorted(self._registrants)]
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call callback (on the cache thread) after each applied snapshot or batch of changes."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]):
+        """Stop calling a listener added with add_listener()."""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and notification counters."""
+        with self._lock:
+            stats = self._stats.copy()
+            stats['pending'] = len(self._registrants)
+        stats['live'] = self.is_live()
+        return stats
+
+    def _run(self):
+        """Listen, snapshot and apply notifications until stopped, reconnecting on failure."""
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                self._connect()
+                backoff = 1.0
+                while not self._stop_event.is_set():
+                    if select.select([self._connection], [], [], 0.5)[0]:
+                        self._connection.poll()
+                        self._apply_notifications()
+            except Exception as e:
+                # Any failure (including a bad notification payload) resyncs from a fresh snapshot
+                self._live.clear()
+                self._close()
+                with self._lock:
+                    self._stats['reconnects'] += 1
+                logger.warning(f"⚠️ Registrant cache disconnected, reconnecting in {backoff:.0f}s: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                # Also reached when the thread dies, so is_live() never reports a stale cache
+                self._live.clear()
+                self._close()
+
+    def _connect(self):
+        """Open the LISTEN connection and load a snapshot of pending registrants."""
+        self._connection = psycopg2.connect(self.dsn, cursor_factory=RealDictCursor)
+        self._connection.autocommit = True
+        with self._connection.cursor() as cursor:
+            # Without the trigger no notification ever arrives; stay non-live so callers keep polling
+            cursor.execute(
+                "SELECT 1 FROM pg_trigger WHERE tgrelid = to_regclass('registrants') AND tgname = %s;",
+                (REGISTRANT_NOTIFY_TRIGGER,)
+            )
+            if cursor.fetchone() is None:
+                raise RuntimeError(f"trigger {REGISTRANT_NOTIFY_TRIGGER} missing on registrants (schema not created yet)")
+            # Subscribe before the snapshot so no change can fall between the two
+            cursor.execute(f"LISTEN {self.channel};")
+            cursor.execute("SELECT * FROM registrants WHERE reservation IS NULL ORDER BY id ASC;")
+            rows = cursor.fetchall()
+
+        registrants = {}
+        for row in rows:
+            registrant = self._to_registrant(dict(row))
+            if registrant:
+                registrants[registrant.id] = registrant
+        with self._lock:
+            self._registrants = registrants
+            self._stats['snapshots'] += 1
+        self._live.set()
+        logger.info(f"📡 Registrant cache live: {len(registrants)} pending registrants, listening on '{self.channel}'")
+        self._notify_listeners()
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except psycopg2.Error:
+                pass
+            self._connection = None
+
+    def _apply_notifications(self):
+        """Apply queued change notifications in commit order."""
+        notifies = self._connection.notifies
+        if not notifies:
+            return
+        changes = []
+        while notifies:
+            changes.append(json.loads(notifies.pop(0).payload))
+
+        for change in changes:
+            row = change.get('row')
+            if change['op'] != 'DELETE' and row is None:
+                # Oversized payload: the trigger only sent the ID
+                with self._connection.cursor() as cursor:
+                    cursor.execute("SELECT * FROM registrants WHERE id = %s;", (change['id'],))
+                    found = cursor.fetchone()
+                row = dict(found) if found else None
+            registrant = self._to_registrant(row) if row and row.get('reservation') is None else None
+            with self._lock:
+                if registrant:
+                    self._registrants[registrant.id] = registrant
+                else:
+                    self._registrants.pop(change['id'], None)
+
+        with self._lock:
+            self._stats['notifications'] += len(changes)
+            pending = len(self._registrants)
+        logger.info(f"📡 Applied {len(changes)} registrant changes ({pending} pending)")
+        self._notify_listeners()
+
+    def _to_registrant(self, row: Dict[str, Any]) -> Optional[Registrant]:
+        try:
+            return Registrant.from_dict(row)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Skipping invalid registrant row {row.get('id')}: {e}")
+            return None
+
+    def _notify_listeners(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"❌ Registrant cache listener failed: {e}")
+
+
+# Global registrant cache instance
+_global_registrant_cache = None
+_global_registrant_cache_lock = threading.Lock()
+
+
+def get_registrant_cache() -> RegistrantCache:
+    """Get global registrant cache for DATABASE_URL."""
+    global _global_registrant_cache
+    if _global_registrant_cache is None:
+        with _global_registrant_cache_lock:
+            if _global_registrant_cache is None:
+                dsn = os.getenv('DATABASE_URL')
+                if not dsn:
+                    raise ValueError("DATABASE_URL environment variable not found")
+                _global_registrant_cache = RegistrantCache(dsn)
+    return _global_registrant_cache
@@ -0,0 +1,862 @@
+"""
+Registration dispatcher shared by all room monitors.
+Owns the pending registrant list and turns slots found by any monitor into
+registration attempts, so concurrently monitored rooms never compete for
+the same registrant. Before an attempt, registrant-slot pairs are also claimed
+in Postgres, so several replicas can monitor without double-booking.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from functools import partial
+from typing import Dict, Any
+
+from assignment_engine import assign_registrants_to_slots, target_months_for
+from captcha_pool import CaptchaPrefetchPool
+from database import DatabaseManager, get_registrant_changes, create_reservation_for_registrant, claim_slots, release_slot_claims
+from ajax2py import send_registration_request_with_retry, send_registration_request_speculative
+from registrant_cache import get_registrant_cache
+from slot_contention import SlotContentionTracker
+from worker_pools import MonitoredThreadPool
+from monitor_events_manager import emit_error, emit_registration_success, emit_registration_failed
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_replica_id() -> str:
+    """Identifier of this replica for distributed slot claims."""
+    return (os.environ.get("REPLICA_ID")
+            or os.environ.get("RAILWAY_REPLICA_ID")
+            or f"{socket.gethostname()}:{os.getpid()}")
+
+
+def slot_key(slot: Dict[str, Any], base_url: str) -> str:
+    """Key identifying a timeslot across offices, e.g. '<base_url>|2025-08-12|A109:00'."""
+    return f"{slot.get('base_url', base_url)}|{slot['date']}|{slot['timeslot_value']}"
+
+
+class RegistrationDispatcher:
+    """
+    Shared registrant state and registration logic for one or more monitors.
+
+    Registrants are claimed for the duration of an attempt, so slots found
+    at the same time by different rooms are matched against disjoint sets
+    of registrants.
+    """
+
+    def __init__(self, base_url: str = "https://olsztyn.uw.gov.pl/wizytakartapolaka/", db_check_interval: int = 1800):
+        """
+        Initialize dispatcher.
+
+        Args:
+            base_url: Default base URL for slots that do not carry their own
+            db_check_interval: Seconds between database checks
+        """
+        self.base_url = base_url
+        self.db_check_interval = db_check_interval
+        self.last_db_check = None
+
+        self.lock = threading.RLock()
+        self.pending_registrants = []
+        self.target_months = set()
+        self._claimed = set()  # Registrant ids with a registration attempt in flight
+        # Pending registrants mirrored via LISTEN/NOTIFY; database polling is the fallback
+        self.use_registrant_cache = os.environ.get("REGISTRANT_CACHE", "true").lower() == "true"
+        self.registrant_cache = None
+        self._synced_registrants = {}  # Pending set kept by incremental sync when the cache is unavailable
+        self._sync_watermark = None
+        self._sync_lock = threading.Lock()
+        self.replica_id = get_replica_id()
+        self.cancel_event = threading.Event()  # Set on shutdown: no new attempts, retries or batch waits
+        self.claim_ttl = int(os.environ.get("SLOT_CLAIM_TTL", "300"))  # Seconds before a crashed replica's claim expires
+
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'pending_registrants': 0,
+            'target_months': [],
+            'last_registrant_check': None,
+            'successful_registrations': 0,
+            'registration_attempts': 0,
+            'claims_lost': 0,
+            'reroutes': 0,
+            'backup_attempts': 0
+        }
+
+        # Pre-solved sessions per office server (created when auto-registration starts)
+        self.captcha_pools: Dict[str, CaptchaPrefetchPool] = {}
+        self.speculative_captchas = int(os.environ.get("SPECULATIVE_CAPTCHAS", "1"))  # >1 solves CAPTCHAs in parallel
+
+        # Long-lived pools reused by every sweep: registration attempts and speculative CAPTCHA solves
+        registration_workers = int(os.environ.get("REGISTRATION_WORKERS", "8"))
+        self.registration_pool = MonitoredThreadPool("Registration", registration_workers)
+        self.solve_pool = (MonitoredThreadPool("CaptchaSolve", registration_workers * self.speculative_captchas)
+                           if self.speculative_captchas > 1 else None)
+
+        # Contention handling: re-route losers within a sweep, back up hot slots
+        self.max_reroutes = int(os.environ.get("MAX_REROUTES", "3"))
+        self.backup_registrants = int(os.environ.get("BACKUP_REGISTRANTS", "0"))  # Backups per contended slot
+        self.contention_threshold = float(os.environ.get("CONTENTION_THRESHOLD", "0.6"))
+        self.contention = SlotContentionTracker(
+            os.path.join(os.environ.get("DATA_DIR", "data"), "slot_contention.json")
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registrant, registration and worker pool statistics."""
+        with self.stats_lock:
+            stats = self.stats.copy()
+        stats['worker_pools'] = {
+            pool.name: pool.get_stats() for pool in (self.registration_pool, self.solve_pool) if pool
+        }
+        if self.registrant_cache:
+            stats['registrant_cache'] = self.registrant_cache.get_stats()
+        return stats
+
+    def start_captcha_pool(self, base_url: str):
+        """Start pre-warming solved sessions for an office server if not already running."""
+        with self.lock:
+            if base_url in self.captcha_pools:
+                return
+            pool = CaptchaPrefetchPool(
+                base_url,
+                size=int(os.environ.get("CAPTCHA_POOL_SIZE", "2")),
+                ttl=float(os.environ.get("CAPTCHA_POOL_TTL", "240"))
+            )
+            pool.set_active(len(self.pending_registrants) > 0)
+            pool.start()
+            self.captcha_pools[base_url] = pool
+
+    def set_captcha_pools_active(self, active: bool):
+        """Only spend solver credits on pre-warming while someone is waiting."""
+        with self.lock:
+            pools = list(self.captcha_pools.values())
+        for pool in pools:
+            pool.set_active(active)
+
+    def stop_captcha_pools(self, wait: bool = True):
+        """Stop all CAPTCHA prefetch pools."""
+        with self.lock:
+            pools = list(self.captcha_pools.values())
+            self.captcha_pools = {}
+        for pool in pools:
+            pool.stop(wait=wait)
+
+    def shutdown(self, wait: bool = False):
+        """
+        Cancel registration work and stop CAPTCHA prefetching and the worker pools.
+
+        Queued registration attempts are dropped and running attempts stop
+        before their next CAPTCHA round. A send.php request already on the
+        wire runs to completion in the background so a booking is never lost;
+        it is only awaited if wait is True.
+        """
+        self.cancel_event.set()
+        if self.registrant_cache:
+            self.registrant_cache.remove_listener(self._on_registrants_changed)
+        self.stop_captcha_pools(wait=wait)
+        for pool in (self.registration_pool, self.solve_pool):
+            if pool:
+                pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _load_pending_registrants(self):
+        """Pending registrants from the live registrant cache, or from the database while it is unavailable."""
+        if self.use_registrant_cache:
+            if self.registrant_cache is None:
+                # Creates the schema (once per process), including the trigger the cache listens to
+                DatabaseManager()
+                self.registrant_cache = get_registrant_cache()
+                self.registrant_cache.add_listener(self._on_registrants_changed)
+                self.registrant_cache.start()
+            if self.registrant_cache.is_live():
+                return self.registrant_cache.get_pending()
+        return self._sync_pending_registrants()
+
+    def _sync_pending_registrants(self):
+        """Apply registrant changes since the last sync to the pending set; only changed rows are read."""
+        with self._sync_lock:
+            changes = get_registrant_changes(self._sync_watermark)
+            if changes['full']:
+                self._synced_registrants = {}
+            for registrant in changes['pending']:
+                self._synced_registrants[registrant.id] = registrant
+            for registrant_id in changes['removed']:
+                self._synced_registrants.pop(registrant_id, None)
+            self._sync_watermark = changes['watermark']
+            if not changes['full'] and (changes['pending'] or changes['removed']):
+                logger.info(f"🗄️ Synced {len(changes['pending'])} changed and {len(changes['removed'])} removed registrants")
+            return [self._synced_registrants[registrant_id] for registrant_id in sorted(self._synced_registrants)]
+
+    def _on_registrants_changed(self):
+        """Apply registrant changes pushed by the cache so new sign-ups are eligible immediately."""
+        pending = self.registrant_cache.get_pending()
+        with self.lock:
+            self.pending_registrants = pending
+            self.target_months = target_months_for(pending)
+            # Let the next check publish the change (and wake monitors in standby)
+            self.last_db_check = None
+
+        with self.stats_lock:
+            self.stats['pending_registrants'] = len(pending)
+            self.stats['target_months'] = sorted(self.target_months)
+
+        self.set_captcha_pools_active(len(pending) > 0)
+
+    def wait_for_registrants(self, stop_event, timeout):
+        """
+        Wait in standby until a registrant change arrives, stop_event is set or timeout passes.
+
+        Returns:
+            bool: True if stop_event was set
+        """
+        deadline = time.monotonic() + timeout
+        while not stop_event.wait(timeout=min(0.2, max(0.0, deadline - time.monotonic()))):
+            if self.last_db_check is None or time.monotonic() >= deadline:
+                return False
+        return True
+
+    def refresh_pending_registrants(self):
+        """Refresh pending registrants from database."""
+        try:
+            pending = self._load_pending_registrants()
+            with self.lock:
+                self.pending_registrants = pending
+                self.target_months = target_months_for(pending)
+
+            with self.stats_lock:
+                self.stats['pending_registrants'] = len(pending)
+                self.stats['target_months'] = list(self.target_months)
+                self.stats['last_registrant_check'] = datetime.now().isoformat()
+
+            logger.info(f"🗄️ Database refresh: {len(pending)} pending registrants for months {list(self.target_months)}")
+            return True
+        except Exception as e:
+            error_msg = f"Failed to refresh database: {str(e)}"
+            logger.error(f"❌ {error_msg}")
+            emit_error(error_msg, {'exception': str(e)})
+            return False
+
+    def check_pending_registrants(self):
+        """Check database for pending registrants and update target months."""
+        try:
+            pending = self._load_pending_registrants()
+            new_target_months = target_months_for(pending)
+
+            with self.lock:
+                # Check if target months changed
+                if new_target_months != self.target_months:
+                    logger.info(f"📊 Target months updated: {sorted(new_target_months)} (was: {sorted(self.target_months)})")
+                self.pending_registrants = pending
+                self.target_months = new_target_months
+                self.last_db_check = datetime.now()
+
+            with self.stats_lock:
+                self.stats['pending_registrants'] = len(pending)
+                self.stats['target_months'] = sorted(list(new_target_months))
+                self.stats['last_registrant_check'] = datetime.now().isoformat()
+
+            logger.info(f"👥 Found {len(pending)} pending registrants for months: {sorted(new_target_months)}")
+
+            for registrant in pending:
+                logger.info(f"  - {registrant.name} {registrant.surname} (month {registrant.desired_month})")
+
+            self.set_captcha_pools_active(len(pending) > 0)
+            return len(pending) > 0
+
+        except Exception as e:
+            logger.error(f"❌ Error checking pending registrants: {e}")
+            return len(self.pending_registrants) > 0  # Continue if we had registrants before
+
+    def should_check_database(self):
+        """Check if it's time to refresh registrant data from database."""
+        if not self.last_db_check:
+            return True
+        return (datetime.now() - self.last_db_check).seconds >= self.db_check_interval
+
+    def claim_database_check(self):
+        """
+        Atomically decide which monitor performs a due database check.
+
+        Returns:
+            bool: True for exactly one caller per db_check_interval
+        """
+        with self.lock:
+            if not self.should_check_database():
+                return False
+            self.last_db_check = datetime.now()
+            return True
+
+    def distribute_registrants_to_slots(self, available_slots):
+        """
+        Distribute pending registrants across available timeslots based on priority and scheduling preferences.
+        Lower registrant ID = higher priority. Registrants with an attempt in flight are skipped.
+        See assignment_engine for the matching rules (fallback months, date ranges, weekdays, times).
+
+        Args:
+            available_slots (list): List of slot dictionaries from get_timeslots()
+
+        Returns:
+            list: List of (registrant, slot) assignment tuples
+        """
+        with self.lock:
+            registrants = [r for r in self.pending_registrants if r.id not in self._claimed]
+
+        if not available_slots or not registrants:
+            return []
+
+        assignments = assign_registrants_to_slots(registrants, available_slots)
+        for registrant, slot in assignments:
+            month = datetime.strptime(slot['date'], "%Y-%m-%d").month
+            fallback = f" (fallback month {month})" if month != registrant.desired_month else ""
+            logger.info(f"  🎯 Assigned: {registrant.name} {registrant.surname} (ID:{registrant.id}) → {slot['display_text']}{fallback}")
+
+        logger.info(f"📋 Total assignments: {len(assignments)}")
+        return assignments
+
+    def attempt_single_registration(self, registrant, slot):
+        """
+        Attempt registration for a single registrant-slot pair.
+        Used for parallel registration processing.
+
+        Args:
+            registrant: Registrant object with .to_registration_data() method
+            slot: Slot dictionary with 'date' and 'timeslot_value' keys
+
+        Returns:
+            dict: Registration attempt result with registrant and slot info
+        """
+        try:
+            logger.info(f"🎯 Starting registration: {registrant.name} {registrant.surname} → {slot['display_text']}")
+
+            # Prepare registration data
+            registrant_data = registrant.to_registration_data()
+            timeslot_data = {
+                'date': slot['date'],
+                'timeslot_value': slot['timeslot_value']
+            }
+            base_url = slot.get('base_url', self.base_url)
+            captcha_pool = self.captcha_pools.get(base_url)
+
+            with self.stats_lock:
+                self.stats['registration_attempts'] += 1
+
+            # Send registration request with built-in CAPTCHA retry mechanism
+            if self.speculative_captchas > 1:
+                registration_result = send_registration_request_speculative(
+                    base_url=base_url,
+                    registrant_data=registrant_data,
+                    timeslot_data=timeslot_data,
+                    parallel=self.speculative_captchas,
+                    max_retries=12,
+                    captcha_pool=captcha_pool,
+                    executor=self.solve_pool,
+                    cancel_event=self.cancel_event
+                )
+            else:
+                registration_result = send_registration_request_with_retry(
+                    base_url=base_url,
+                    registrant_data=registrant_data,
+                    timeslot_data=timeslot_data,
+                    max_retries=12,
+                    captcha_pool=captcha_pool,
+                    cancel_event=self.cancel_event
+                )
+
+            return {
+                'registrant': registrant,
+                'slot': slot,
+                'registrant_data': registrant_data,
+                'result': registration_result,
+                'success': registration_result.get('success', False)
+            }
+
+        except Exception as e:
+            error_msg = f"Registration attempt failed for {registrant.name}: {str(e)}"
+            logger.error(f"❌ {error_msg}")
+            return {
+                'registrant': registrant,
+                'slot': slot,
+                'registrant_data': registrant.to_registration_data() if hasattr(registrant, 'to_registration_data') else {},
+                'result': {'success': False, 'error': error_msg},
+                'success': False
+            }
+
+    def begin_batch(self):
+        """
+        Start a registration batch for one sweep.
+
+        Feed slots with batch.feed() as dates are probed; attempts start
+        immediately. batch.finish() waits for all attempts and returns the
+        successful registrations.
+        """
+        return RegistrationBatch(self)
+
+    def attempt_auto_registration(self, available_slots):
+        """
+        Attempt automatic registration using parallel processing and smart distribution.
+        Distributes registrants across slots by priority and runs registration attempts in parallel.
+        Registrants who find their slot taken are re-routed to a free slot of the same sweep, and
+        unmatched registrants can back up slots with a history of contention.
+
+        Args:
+            available_slots (list): List of slot dictionaries from any monitor's get_timeslots()
+
+        Returns:
+            list: List of successful registration results
+        """
+        if not available_slots or not self.pending_registrants:
+            return []
+
+        batch = self.begin_batch()
+        batch.feed(available_slots)
+        return batch.finish()
+
+    def plan_backups(self, assignments):
+        """
+        Pick backup registrants for assigned slots that are usually taken before our request lands.
+
+        Backups are unassigned, unclaimed registrants (by priority) who accept the slot; they
+        race the primary registrant and are re-routed like any loser. Call with self.lock held.
+
+        Args:
+            assignments (list): Primary (registrant, slot) assignments
+
+        Returns:
+            list: Backup (registrant, slot) assignments
+        """
+        if self.backup_registrants <= 0:
+            return []
+
+        assigned_ids = {registrant.id for registrant, _ in assignments}
+        spare = sorted((r for r in self.pending_registrants if r.id not in self._claimed and r.id not in assigned_ids),
+                       key=lambda r: r.id)
+        hot = sorted(((self.contention.rate(slot), slot) for _, slot in assignments
+                      if self.contention.rate(slot) > self.contention_threshold),
+                     key=lambda item: -item[0])
+
+        backups = []
+        for rate, slot in hot:
+            for _ in range(self.backup_registrants):
+                match = next((r for r in spare if assign_registrants_to_slots([r], [slot])), None)
+                if not match:
+                    break
+                spare.remove(match)
+                backups.append((match, slot))
+                logger.info(f"  🛡️ Backup: {match.name} {match.surname} (ID:{match.id}) → {slot['display_text']} (contention {rate:.0%})")
+        return backups
+
+    def claim_in_database(self, assignments, backup=False):
+        """
+        Claim assignments in Postgres against other replicas.
+
+        When the database is unreachable the claims stay local: other replicas
+        cannot see them, but this replica still never sends two registrants to
+        one slot, and losing a free slot costs more than a rare duplicate attempt.
+
+        Args:
+            assignments (list): (registrant, slot) tuples
+            backup (bool): Claim as backup, alongside the primary claim of each slot
+
+        Returns:
+            set: Registrant IDs this replica may attempt
+        """
+        if not assignments:
+            return set()
+        claims = []
+        backup_counts = Counter()
+        for registrant, slot in assignments:
+            key = slot_key(slot, self.base_url)
+            if backup:
+                # Numbered per slot: up to backup_registrants backups across all replicas
+                backup_counts[key] += 1
+                key = f"{key}#backup{backup_counts[key]}"
+            claims.append((registrant.id, key))
+        try:
+            claimed = set(claim_slots(
+                claims,
+                self.replica_id,
+                ttl=self.claim_ttl
+            ))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not claim slots in database, continuing with local claims only: {e}")
+            return {registrant.id for registrant, _ in assignments}
+        lost = len(assignments) - len(claimed)
+        if lost:
+            with self.stats_lock:
+                self.stats['claims_lost'] += lost
+        return claimed
+
+    def release_database_claims(self, registrant_ids):
+        """Release this replica's claims; unreleased claims expire after claim_ttl."""
+        if not registrant_ids:
+            return
+        try:
+            release_slot_claims(list(registrant_ids), self.replica_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release slot claims (they expire in {self.claim_ttl}s): {e}")
+
+    def _record_success(self, attempt_result):
+        """
+        Store a successful registration in the database and notify.
+
+        Returns:
+            dict or None: Successful registration entry, None if the database update failed
+        """
+        registrant = attempt_result['registrant']
+        slot = attempt_result['slot']
+        registration_result = attempt_result['result']
+
+        # Generate reservation ID and update database
+        success_data = registration_result.get('success_data')
+        if success_data and success_data.get('registration_code'):
+            reservation_id = f"{success_data['registration_code']}"
+        else:
+            reservation_id = f"AUTO_{uuid.uuid4().hex[:8].upper()}"
+
+        success = create_reservation_for_registrant(
+            registrant_id=registrant.id,
+            reservation_id=reservation_id,
+            success_data=success_data
+        )
+
+        if not success:
+            error_msg = f"Database update failed for {registrant.name}"
+            logger.error(f"❌ {error_msg}")
+            emit_registration_failed(
+                registrant_data=attempt_result['registrant_data'],
+                slot_data=slot,
+                error=error_msg
+            )
+            return None
+
+        # Emit registration success event
+        emit_registration_success(
+            registrant_data=attempt_result['registrant_data'],
+            slot_data=slot
+        )
+
+        attempt_info = f" (attempt {registration_result.get('attempt', 1)}/{registration_result.get('max_retries', 12) + 1})" if registration_result.get('attempt', 1) > 1 else ""
+        logger.info(f"✅ REGISTRATION SUCCESS: {registrant.name} {registrant.surname}{attempt_info}")
+
+        if success_data:
+            logger.info(f"   📅 Confirmed: {success_data.get('appointment_date')} {success_data.get('appointment_time')} - {success_data.get('room')}")
+            logger.info(f"   📧 Email: {success_data.get('email')}")
+            logger.info(f"   📞 Phone: {success_data.get('phone')}")
+            logger.info(f"   🆔 Code: {success_data.get('registration_code')}")
+        else:
+            logger.info(f"   📅 Slot: {slot['display_text']}")
+
+        logger.info(f"   🆔 Reservation: {reservation_id}")
+
+        # Remove from pending list to avoid re-attempts
+        with self.lock:
+            self.pending_registrants = [r for r in self.pending_registrants if r.id != registrant.id]
+
+        return {
+            'registrant_id': registrant.id,
+            'registrant_name': f"{registrant.name} {registrant.surname}",
+            'reservation_id': reservation_id,
+            'slot_info': slot,
+            'registration_result': registration_result
+        }
+
+
+class RegistrationBatch:
+    """
+    Registration attempts for the slots of one sweep.
+
+    Slots are fed as soon as their date is probed, so the first slot found is
+    submitted without waiting for the rest of the sweep. Each feed matches the
+    free slots seen so far against registrants without an attempt in flight.
+    Attempts report back via future callbacks: a registrant whose slot was
+    taken is immediately re-routed to another free slot of the batch.
+    """
+
+    def __init__(self, dispatcher: RegistrationDispatcher):
+        """
+        Initialize batch.
+
+        Args:
+            dispatcher: Dispatcher owning registrants, claims, statistics and the registration pool
+        """
+        self.dispatcher = dispatcher
+
+        self.lock = threading.Condition()
+        self.available_slots = []
+        self.known_keys = set()
+        self.dead_keys = set()  # Slots taken by someone else or booked by us
+        self.busy_keys = {}     # Slot key -> primary attempts in flight
+        self.reroutes = {}
+        self.outstanding = 0
+        self.attempted = 0
+        self.completed_count = 0
+        self.successful_registrations = []
+
+    def _key(self, slot):
+        return slot_key(slot, self.dispatcher.base_url)
+
+    def _free_slots(self):
+        """Slots of this batch nobody holds yet (call with self.lock held)."""
+        return [slot for slot in self.available_slots
+                if self._key(slot) not in self.dead_keys and not self.busy_keys.get(self._key(slot))]
+
+    def feed(self, slots) -> int:
+        """
+        Add probed slots and start attempts for any new registrant-slot matches.
+
+        Args:
+            slots (list): Registration-ready slot dictionaries
+
+        Returns:
+            int: Number of attempts started
+        """
+        dispatcher = self.dispatcher
+        with self.lock:
+            if dispatcher.cancel_event.is_set():
+                return 0
+            new_slots = [slot for slot in slots if self._key(slot) not in self.known_keys]
+            if not new_slots or not dispatcher.pending_registrants:
+                return 0
+            for slot in new_slots:
+                self.known_keys.add(self._key(slot))
+                self.available_slots.append(slot)
+
+            with dispatcher.lock:
+                assignments = dispatcher.distribute_registrants_to_slots(self._free_slots())
+                backups = dispatcher.plan_backups(assignments)
+                claimed_ids = {registrant.id for registrant, _ in assignments + backups}
+                dispatcher._claimed |= claimed_ids
+
+            if not assignments:
+                logger.info("⏭️  No matching registrant-slot assignments found")
+                return 0
+
+            # Hold the assigned slots so re-routes don't pick them while the database is asked
+            for _, slot in assignments:
+                key = self._key(slot)
+                self.busy_keys[key] = self.busy_keys.get(key, 0) + 1
+
+        # Claim outside the batch lock so finishing attempts never wait on the database
+        db_claimed = dispatcher.claim_in_database(assignments) | dispatcher.claim_in_database(backups, backup=True)
+
+        submitted = []
+        with self.lock:
+            for _, slot in assignments:
+                self.busy_keys[self._key(slot)] -= 1
+            assignments = [(registrant, slot) for registrant, slot in assignments if registrant.id in db_claimed]
+            backups = [(registrant, slot) for registrant, slot in backups if registrant.id in db_claimed]
+            if assignments and not dispatcher.cancel_event.is_set():
+                logger.info(f"🚀 Starting PARALLEL registration for {len(assignments)} assignments"
+                            f"{f' + {len(backups)} backups' if backups else ''}...")
+                submitted = [attempt for attempt in
+                             [self._submit(registrant, slot, False) for registrant, slot in assignments] +
+                             [self._submit(registrant, slot, True) for registrant, slot in backups]
+                             if attempt]
+        self._watch(submitted)
+        started = {registrant.id for _, registrant, _, is_backup in submitted if not is_backup}
+        started_backups = {registrant.id for _, registrant, _, is_backup in submitted if is_backup}
+
+        # Give back claims of registrants who lost the database claim or were not started
+        unused = claimed_ids - started - started_backups
+        if unused:
+            dispatcher.release_database_claims(unused & db_claimed)
+            with dispatcher.lock:
+                dispatcher._claimed -= unused
+        if not assignments:
+            logger.info("⏭️  All assignments are claimed by other replicas")
+            return 0
+
+        with dispatcher.stats_lock:
+            dispatcher.stats['backup_attempts'] += len(started_backups)
+        return len(started) + len(started_backups)
+
+    def _submit(self, registrant, slot, is_backup):
+        """
+        Start an attempt (call with self.lock held) and pass the result to _watch() once unlocked.
+
+        Returns:
+            tuple or None: (future, registrant, slot, is_backup), None if the dispatcher was shut down
+        """
+        dispatcher = self.dispatcher
+        try:
+            future = dispatcher.registration_pool.submit(dispatcher.attempt_single_registration, registrant, slot)
+        except RuntimeError:
+            # Pool already shut down; the caller gives the claims back
+            return None
+        if not is_backup:
+            key = self._key(slot)
+            self.busy_keys[key] = self.busy_keys.get(key, 0) + 1
+        self.outstanding += 1
+        self.attempted += 1
+        return (future, registrant, slot, is_backup)
+
+    def _watch(self, submitted):
+        """
+        Attach completion handlers to submitted attempts (call without self.lock).
+
+        A future that already finished runs its handler immediately in the calling
+        thread, and a re-route from there claims slots in the database.
+        """
+        for future, registrant, slot, is_backup in submitted:
+            future.add_done_callback(partial(self._on_done, registrant=registrant, slot=slot, is_backup=is_backup))
+
+    def _reroute(self, registrant):
+        """
+        Claim the next free slot for a registrant who lost theirs.
+
+        The slot is picked under self.lock and claimed in the database outside
+        it; the caller releases the registrant's claims if None is returned.
+
+        Returns:
+            dict or None: Slot that was submitted
+        """
+        dispatcher = self.dispatcher
+        with self.lock:
+            if dispatcher.cancel_event.is_set() or self.reroutes.get(registrant.id, 0) >= dispatcher.max_reroutes:
+                return None
+            match = assign_registrants_to_slots([registrant], self._free_slots())
+            if not match:
+                return None
+            slot = match[0][1]
+            key = self._key(slot)
+            self.busy_keys[key] = self.busy_keys.get(key, 0) + 1
+
+        # Move this replica's claim for the registrant to the new slot
+        dispatcher.release_database_claims([registrant.id])
+        claimed = dispatcher.claim_in_database([(registrant, slot)])
+
+        with self.lock:
+            self.busy_keys[key] -= 1
+            submitted = None if not claimed or dispatcher.cancel_event.is_set() else self._submit(registrant, slot, False)
+            if not submitted:
+                return None
+            self.reroutes[registrant.id] = self.reroutes.get(registrant.id, 0) + 1
+        self._watch([submitted])
+        with dispatcher.stats_lock:
+            dispatcher.stats['reroutes'] += 1
+        return slot
+
+    def _on_done(self, future, registrant, slot, is_backup):
+        """Handle a finished attempt: record success, re-route a loser or report the failure."""
+        dispatcher = self.dispatcher
+        key = self._key(slot)
+        rerouted = False
+        with self.lock:
+            self.completed_count += 1
+            if not is_backup:
+                self.busy_keys[key] -= 1
+        try:
+            if future.cancelled():
+                # Dropped from the queue by dispatcher shutdown before it started
+                return
+            try:
+                attempt_result = future.result()
+            except Exception as e:
+                error_msg = f"Parallel registration error for {registrant.name}: {str(e)}"
+                logger.error(f"❌ {error_msg}")
+                emit_registration_failed(
+                    registrant_data=registrant.to_registration_data(),
+                    slot_data=slot,
+                    error=error_msg
+                )
+                return
+
+            registration_result = attempt_result['result']
+            if registration_result.get('cancelled'):
+                logger.info(f"⏹️ Registration cancelled for {registrant.name} {registrant.surname}")
+                return
+            taken = bool(registration_result.get('reservation_error'))
+            if not is_backup:
+                dispatcher.contention.record(slot, taken)
+
+            if attempt_result['success'] or taken:
+                with self.lock:
+                    self.dead_keys.add(key)
+            logger.info(f"📋 Completed {self.completed_count}/{self.attempted}: {registrant.name} {registrant.surname}{' (backup)' if is_backup else ''}")
+
+            if attempt_result['success']:
+                registered = dispatcher._record_success(attempt_result)
+                if registered:
+                    with self.lock:
+                        self.successful_registrations.append(registered)
+                    with dispatcher.stats_lock:
+                        dispatcher.stats['successful_registrations'] += 1
+                return
+
+            if taken:
+                next_slot = self._reroute(registrant)
+                if next_slot:
+                    rerouted = True
+                    logger.info(f"🔀 Slot {slot['display_text']} taken - re-routing {registrant.name} {registrant.surname} → {next_slot['display_text']}")
+                    return
+                if is_backup:
+                    logger.info(f"🛡️ Backup {registrant.name} {registrant.surname} lost {slot['display_text']} (no free slot left)")
+                    return
+
+            # Registration failed
+            attempt_info = f" (failed after {registration_result.get('attempt', 1)} attempts)" if registration_result.get('attempt') else ""
+            error_msg = registration_result.get('message') or registration_result.get('error', 'Unknown error')
+            full_error_msg = f"Registration failed{attempt_info}: {error_msg}"
+            logger.error(f"❌ {full_error_msg}")
+
+            emit_registration_failed(
+                registrant_data=attempt_result['registrant_data'],
+                slot_data=slot,
+                error=full_error_msg
+            )
+        finally:
+            if not rerouted:
+                # The registrant is free again for slots fed later in this batch
+                dispatcher.release_database_claims([registrant.id])
+                with dispatcher.lock:
+                    dispatcher._claimed.discard(registrant.id)
+            with self.lock:
+                self.outstanding -= 1
+                self.lock.notify_all()
+
+    def finish(self, timeout=None, stop_event=None):
+        """
+        Wait for all attempts of the batch.
+
+        Waiting ends early when the dispatcher is shut down or stop_event is
+        set; attempts still running then complete in the background and are
+        recorded as usual.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait
+            stop_event (threading.Event, optional): Monitor stop signal
+
+        Returns:
+            list: Successful registration results so far
+        """
+        cancel_event = self.dispatcher.cancel_event
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while self.outstanding and not cancel_event.is_set() and not (stop_event and stop_event.is_set()):
+                remaining = 0.05 if deadline is None else min(0.05, deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                self.lock.wait(remaining)
+            successful_registrations = list(self.successful_registrations)
+            attempted = self.attempted
+            outstanding = self.outstanding
+
+        if outstanding:
+            logger.info(f"⏹️ Stopped waiting for {outstanding} registration attempts still in flight")
+
+        if not attempted:
+            return []
+
+        # Step 3: Update target months after successful registrations
+        if successful_registrations:
+            with self.dispatcher.lock:
+                self.dispatcher.target_months = target_months_for(self.dispatcher.pending_registrants)
+            logger.info(f"🎉 PARALLEL REGISTRATION SUMMARY: {len(successful_registrations)} successful registrations!")
+        else:
+            logger.info("ℹ️  No successful registrations in parallel attempt")
+
+        return successful_registrations
@@ -0,0 +1,106 @@
+"""
+Slot contention history.
+Records how often a registration attempt found its slot already taken, per
+office room and time of day, so the dispatcher can send backup registrants
+to the slots other people race for.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SlotContentionTracker:
+    """
+    Decaying per-slot-time counts of attempts and lost races.
+
+    Slots are keyed by office server, room and time of day ('09:00'), since
+    the same time slot tends to be contested on every date. Older outcomes
+    decay by `decay` on each new outcome for the same key.
+    """
+
+    def __init__(self, history_file: Optional[str] = None, decay: float = 0.9):
+        """
+        Initialize tracker.
+
+        Args:
+            history_file: JSON file to persist counts in (None disables persistence)
+            decay: Weight kept by previous outcomes when a new one is recorded
+        """
+        self.history_file = history_file
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, float]] = {}
+        self._last_save = time.monotonic()
+        self.load()
+
+    @staticmethod
+    def key(slot: Dict[str, Any]) -> str:
+        """Contention key of a slot, e.g. '<base_url>|A1|09:00'."""
+        return f"{slot.get('base_url', '')}|{slot.get('room', '')}|{slot['time']}"
+
+    def record(self, slot: Dict[str, Any], taken: bool):
+        """
+        Record the outcome of a primary registration attempt.
+
+        Args:
+            slot: Attempted slot
+            taken: True if the slot was already taken (reservation error)
+        """
+        with self._lock:
+            counts = self._counts.setdefault(self.key(slot), {'attempts': 0.0, 'taken': 0.0})
+            counts['attempts'] = counts['attempts'] * self.decay + 1
+            counts['taken'] = counts['taken'] * self.decay + (1 if taken else 0)
+            due = time.monotonic() - self._last_save >= 60
+        if due:
+            self.save()
+
+    def rate(self, slot: Dict[str, Any]) -> float:
+        """Estimated probability that the slot is taken before our request lands (0.5 without history)."""
+        with self._lock:
+            counts = self._counts.get(self.key(slot))
+        if not counts:
+            return 0.5
+        return (counts['taken'] + 1) / (counts['attempts'] + 2)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Contention rates of all known slot keys."""
+        with self._lock:
+            return {key: round((c['taken'] + 1) / (c['attempts'] + 2), 3) for key, c in self._counts.items()}
+
+    def load(self) -> bool:
+        """Load persisted counts if the history file exists."""
+        if not self.history_file or not os.path.exists(self.history_file):
+            return False
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._counts = data
+            logger.info(f"🔥 Loaded slot contention history from {self.history_file}")
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load slot contention history from {self.history_file}: {e}")
+            return False
+
+    def save(self):
+        """Persist counts to the history file."""
+        if not self.history_file:
+            return
+        with self._lock:
+            self._last_save = time.monotonic()
+            data = {key: dict(counts) for key, counts in self._counts.items()}
+        try:
+            directory = os.path.dirname(self.history_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.history_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save slot contention history to {self.history_file}: {e}")
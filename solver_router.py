@@ -0,0 +1,268 @@
+"""
+CAPTCHA solver telemetry and routing.
+Tracks latency and send.php-confirmed accuracy per solver, persists them
+across restarts and routes each CAPTCHA to the solver with the lowest
+expected time to a correct answer.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional
+
+from dotenv import load_dotenv
+
+from captcha_solvers import CaptchaSolver, SOLVERS, get_captcha_solver
+from logging_config import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+# Latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class SolverMetrics:
+    """
+    Latency and accuracy statistics for one solver.
+
+    Accuracy only counts codes that send.php judged: a code is correct unless
+    the response is a CAPTCHA error. Solves that returned no code count as
+    failures.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.solves = 0
+        self.failures = 0
+        self.correct = 0
+        self.wrong = 0
+        self.total_latency = 0.0
+        self.ewma_latency: Optional[float] = None
+        self.histogram = {str(bound): 0 for bound in LATENCY_BUCKETS_MS}
+        self.histogram['+Inf'] = 0
+
+    def record_solve(self, latency: float, success: bool):
+        """Record one solve call and its latency in seconds."""
+        self.solves += 1
+        if not success:
+            self.failures += 1
+        self.total_latency += latency
+        self.ewma_latency = latency if self.ewma_latency is None else 0.8 * self.ewma_latency + 0.2 * latency
+
+        latency_ms = latency * 1000
+        bucket = next((str(bound) for bound in LATENCY_BUCKETS_MS if latency_ms <= bound), '+Inf')
+        self.histogram[bucket] += 1
+
+    def record_outcome(self, correct: bool):
+        """Record whether a submitted code was accepted."""
+        if correct:
+            self.correct += 1
+        else:
+            self.wrong += 1
+
+    def sample_success(self) -> float:
+        """Draw a success probability from the Beta posterior (uniform prior)."""
+        return random.betavariate(1 + self.correct, 1 + self.wrong + self.failures)
+
+    def to_dict(self) -> Dict[str, Any]:
+        judged = self.correct + self.wrong
+        return {
+            'solves': self.solves,
+            'failures': self.failures,
+            'correct': self.correct,
+            'wrong': self.wrong,
+            'accuracy': self.correct / judged if judged else None,
+            'avg_latency': self.total_latency / self.solves if self.solves else None,
+            'ewma_latency': self.ewma_latency,
+            'total_latency': self.total_latency,
+            'histogram_ms': dict(self.histogram)
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> 'SolverMetrics':
+        metrics = cls(name)
+        metrics.solves = data.get('solves', 0)
+        metrics.failures = data.get('failures', 0)
+        metrics.correct = data.get('correct', 0)
+        metrics.wrong = data.get('wrong', 0)
+        metrics.total_latency = data.get('total_latency', 0.0)
+        metrics.ewma_latency = data.get('ewma_latency')
+        metrics.histogram.update(data.get('histogram_ms', {}))
+        return metrics
+
+
+class SolverRouter(CaptchaSolver):
+    """
+    Solver that dispatches to the best of several backends.
+
+    Each call samples a success probability per solver from its accuracy
+    posterior and picks the lowest (latency + send_cost) / probability, i.e.
+    the fastest expected path to an accepted code. Sampling keeps exploring
+    solvers with little data and moves away from a degraded one as soon as
+    its misses accumulate. With race enabled the two best solvers run
+    concurrently and the first code wins.
+    """
+
+    name = 'auto'
+
+    def __init__(self, solver_names: List[str], stats_file: Optional[str] = None,
+                 race: bool = False, send_cost: float = 0.3, default_latency: float = 0.5):
+        """
+        Initialize router.
+
+        Args:
+            solver_names: Candidate solver names (see captcha_solvers.SOLVERS)
+            stats_file: JSON file to persist metrics in (None disables persistence)
+            race: Run the two best solvers concurrently
+            send_cost: Seconds a wrong code costs on top of solving (send.php round-trip)
+            default_latency: Assumed latency in seconds for solvers without samples
+        """
+        self.solver_names = solver_names
+        self.stats_file = stats_file
+        self.race = race
+        self.send_cost = send_cost
+        self.default_latency = default_latency
+
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, SolverMetrics] = {name: SolverMetrics(name) for name in solver_names}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._last_save = time.monotonic()
+        self.load()
+
+    def _candidates(self) -> List[CaptchaSolver]:
+        """Solvers ordered by sampled expected time to an accepted code."""
+        scored = []
+        with self._lock:
+            for name in self.solver_names:
+                solver = get_captcha_solver(name)
+                if not solver.available():
+                    continue
+                metrics = self._metrics[name]
+                latency = metrics.ewma_latency if metrics.ewma_latency is not None else self.default_latency
+                scored.append(((latency + self.send_cost) / max(metrics.sample_success(), 1e-6), solver))
+        scored.sort(key=lambda item: item[0])
+        return [solver for _, solver in scored]
+
+    def _timed_solve(self, solver: CaptchaSolver, image_base64: str) -> Dict[str, Any]:
+        """Run one solver and record its latency."""
+        start = time.perf_counter()
+        try:
+            solution = solver.solve(image_base64)
+        except Exception as e:
+            solution = {'result': '', 'error': str(e)}
+        solution['solver'] = solver.name
+        with self._lock:
+            self._metrics[solver.name].record_solve(time.perf_counter() - start, bool(solution.get('result')))
+        return solution
+
+    def solve(self, image_base64: str) -> Dict[str, Any]:
+        candidates = self._candidates()
+        if not candidates:
+            return {'result': '', 'solver': self.name, 'error': 'No CAPTCHA solver available'}
+
+        if not self.race or len(candidates) < 2:
+            solution = self._timed_solve(candidates[0], image_base64)
+            if not solution.get('result') and len(candidates) > 1:
+                logger.warning(f"⚠️ CAPTCHA solver '{candidates[0].name}' failed, falling back to '{candidates[1].name}'")
+                solution = self._timed_solve(candidates[1], image_base64)
+            return solution
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="CaptchaRace")
+        pending = {self._executor.submit(self._timed_solve, solver, image_base64) for solver in candidates[:2]}
+        solution = {'result': '', 'solver': self.name, 'error': 'All raced solvers failed'}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.result().get('result'):
+                    return future.result()
+                solution = future.result()
+        return solution
+
+    def record_outcome(self, solver_name: Optional[str], correct: bool):
+        """
+        Record send.php's verdict on a code.
+
+        Args:
+            solver_name: Name of the solver that produced the code
+            correct: False if send.php reported a CAPTCHA error
+        """
+        if solver_name not in self._metrics:
+            return
+        with self._lock:
+            self._metrics[solver_name].record_outcome(correct)
+            due = time.monotonic() - self._last_save >= 30
+        if due:
+            self.save()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-solver metrics."""
+        with self._lock:
+            return {name: metrics.to_dict() for name, metrics in self._metrics.items()}
+
+    def load(self) -> bool:
+        """Load persisted metrics if the stats file exists."""
+        if not self.stats_file or not os.path.exists(self.stats_file):
+            return False
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                for name in self.solver_names:
+                    if name in data:
+                        self._metrics[name] = SolverMetrics.from_dict(name, data[name])
+            logger.info(f"🧩 Loaded CAPTCHA solver stats from {self.stats_file}")
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load CAPTCHA solver stats from {self.stats_file}: {e}")
+            return False
+
+    def save(self):
+        """Persist metrics to the stats file."""
+        if not self.stats_file:
+            return
+        with self._lock:
+            self._last_save = time.monotonic()
+        try:
+            directory = os.path.dirname(self.stats_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.stats_file, 'w', encoding='utf-8') as f:
+                json.dump(self.get_stats(), f, indent=2)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save CAPTCHA solver stats to {self.stats_file}: {e}")
+
+
+# Global router instance
+_global_solver_router = None
+_global_solver_router_lock = threading.Lock()
+
+
+def get_solver_router() -> SolverRouter:
+    """
+    Get global solver router configured from environment.
+
+    CAPTCHA_SOLVER=auto routes between all solvers; any other value pins the
+    router to that single solver so its metrics are still collected.
+    """
+    global _global_solver_router
+    if _global_solver_router is None:
+        with _global_solver_router_lock:
+            if _global_solver_router is None:
+                configured = os.environ.get("CAPTCHA_SOLVER", "truecaptcha").lower()
+                names = list(SOLVERS) if configured == 'auto' else [configured]
+                _global_solver_router = SolverRouter(
+                    names,
+                    stats_file=os.path.join(os.environ.get("DATA_DIR", "data"), "captcha_solver_stats.json"),
+                    race=os.environ.get("CAPTCHA_SOLVER_RACE", "false").lower() == "true"
+                )
+                logger.info(f"🧩 CAPTCHA solver routing: {', '.join(names)}{' (racing)' if _global_solver_router.race else ''}")
+    return _global_solver_router
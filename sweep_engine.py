@@ -0,0 +1,240 @@
+"""
+Asyncio availability sweep engine for Polish Card appointments.
+Probes all candidate dates concurrently on a single event loop with a bounded
+semaphore and the shared per-host token-bucket budget.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import queue
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+import aiohttp
+from dotenv import load_dotenv
+
+from ajax2py import parse_time_slots, get_timeslot_headers
+from logging_config import get_logger
+from rate_limiter import get_rate_limiter
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+class AsyncSweepEngine:
+    """
+    Concurrent timeslot prober running on a dedicated asyncio loop thread.
+
+    Callers stay synchronous: sweep() schedules the coroutine on the engine
+    loop and blocks until every date has answered (or failed); iter_sweep()
+    yields each date as soon as it answers. Both cancel the outstanding
+    probes when the caller's stop event is set.
+    """
+
+    def __init__(self, concurrency: int = 16, connect_timeout: float = 5.0, read_timeout: float = 10.0):
+        """
+        Initialize sweep engine.
+
+        Args:
+            concurrency: Maximum number of in-flight timeslot requests
+            connect_timeout: TCP connect timeout in seconds
+            read_timeout: Read timeout in seconds
+        """
+        self.concurrency = concurrency
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock = threading.Lock()
+
+        # Probe counters, only modified on the loop thread
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._probes = 0
+
+    def _ensure_loop(self):
+        """Start the engine event loop thread if not running."""
+        with self._start_lock:
+            if self._loop is not None and self._thread.is_alive():
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever,
+                name="SweepEngineLoop",
+                daemon=True
+            )
+            self._thread.start()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared keep-alive session on first use (loop thread only)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                limit_per_host=self.concurrency,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout),
+                cookie_jar=aiohttp.DummyCookieJar()
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _probe(self, date_str: str, url: str, headers: dict) -> Tuple[str, List[str]]:
+        """Fetch and parse timeslots for a single date."""
+        session = await self._get_session()
+        async with self._semaphore:
+            await get_rate_limiter('godziny_pokoj', url).acquire_async()
+            # Counted only once the limiter lets the probe through, so a sweep
+            # cancelled while waiting leaves the counters untouched
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            self._probes += 1
+            try:
+                async with session.post(url, data={'godzina': date_str}, headers=headers) as response:
+                    if response.status != 200:
+                        return (date_str, [])
+                    html = await response.text(errors='replace')
+                    return (date_str, parse_time_slots(html))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"Probe failed for {date_str}: {e}")
+                return (date_str, [])
+            finally:
+                self._in_flight -= 1
+
+    async def _sweep(self, dates: List[str], base_url: str, endpoint: str,
+                     results: Optional[queue.Queue] = None) -> List[Tuple[str, List[str]]]:
+        """Probe all dates concurrently, collecting results in completion order (and streaming them to `results`)."""
+        url = f"{base_url}{endpoint}"
+        headers = get_timeslot_headers(base_url)
+        await self._get_session()
+
+        collected = []
+        tasks = [asyncio.ensure_future(self._probe(date_str, url, headers)) for date_str in dates]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                collected.append(result)
+                if results is not None:
+                    results.put(result)
+        finally:
+            # A cancelled sweep aborts its in-flight requests instead of leaving them to time out
+            for task in tasks:
+                task.cancel()
+        return collected
+
+    def _cancel(self, future):
+        """Cancel a scheduled sweep; its probes are cancelled on the loop thread."""
+        if not future.done():
+            future.cancel()
+
+    def sweep(self, dates: List[str], base_url: str, endpoint: str,
+              stop_event: Optional[threading.Event] = None) -> List[Tuple[str, List[str]]]:
+        """
+        Probe timeslots for all dates concurrently.
+
+        Args:
+            dates: Dates to check in YYYY-MM-DD format
+            base_url: Base URL of the appointment system
+            endpoint: Timeslot endpoint (e.g., godziny_pokoj_A1.php)
+            stop_event: When set, the sweep is cancelled and an empty list returned
+
+        Returns:
+            List[Tuple[str, List[str]]]: (date, slots) pairs in completion order
+        """
+        if not dates:
+            return []
+        self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._sweep(dates, base_url, endpoint), self._loop)
+        if stop_event is None:
+            return future.result()
+        while not stop_event.is_set():
+            try:
+                return future.result(timeout=0.05)
+            except concurrent.futures.TimeoutError:
+                continue
+        self._cancel(future)
+        return []
+
+    def iter_sweep(self, dates: List[str], base_url: str, endpoint: str,
+                   stop_event: Optional[threading.Event] = None) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Probe timeslots for all dates concurrently, yielding each result as it arrives.
+
+        Args:
+            dates: Dates to check in YYYY-MM-DD format
+            base_url: Base URL of the appointment system
+            endpoint: Timeslot endpoint (e.g., godziny_pokoj_A1.php)
+            stop_event: When set, iteration ends and the remaining probes are cancelled
+
+        Yields:
+            Tuple[str, List[str]]: (date, slots) pairs in completion order
+
+        Closing the generator early (e.g. breaking out of the loop) also cancels the sweep.
+        """
+        if not dates:
+            return
+        self._ensure_loop()
+        results = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._sweep(dates, base_url, endpoint, results), self._loop)
+        poll_interval = 0.5 if stop_event is None else 0.05
+        try:
+            for _ in range(len(dates)):
+                while True:
+                    if stop_event is not None and stop_event.is_set():
+                        return
+                    try:
+                        yield results.get(timeout=poll_interval)
+                        break
+                    except queue.Empty:
+                        if future.done():
+                            future.result()  # Re-raise a sweep failure
+                            if results.empty():
+                                return
+        finally:
+            self._cancel(future)
+
+    def get_stats(self) -> dict:
+        """Get concurrency limit and probe counters."""
+        return {
+            'concurrency': self.concurrency,
+            'in_flight': self._in_flight,
+            'peak_in_flight': self._peak_in_flight,
+            'probes': self._probes
+        }
+
+    def close(self):
+        """Close the HTTP session and stop the engine loop."""
+        if self._loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result(timeout=5)
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+# Global sweep engine instance
+_global_sweep_engine = None
+_global_sweep_engine_lock = threading.Lock()
+
+
+def get_sweep_engine() -> AsyncSweepEngine:
+    """Get global sweep engine instance configured from environment."""
+    global _global_sweep_engine
+    if _global_sweep_engine is None:
+        with _global_sweep_engine_lock:
+            if _global_sweep_engine is None:
+                _global_sweep_engine = AsyncSweepEngine(
+                    concurrency=int(os.environ.get("SWEEP_CONCURRENCY", "16")),
+                    connect_timeout=float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5")),
+                    read_timeout=float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+                )
+    return _global_sweep_engine
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for the registrant-to-slot assignment engine.
+Runs without the mock server or a database.
+"""
+
+import sys
+import os
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from assignment_engine import assign_registrants_to_slots
+from models import Registrant, Citizenship, ApplicationType
+
+
+def make_registrant(registrant_id, desired_month, **preferences):
+    """Build a pending test registrant."""
+    return Registrant(
+        name=f'Test{registrant_id}',
+        surname='User',
+        citizenship=Citizenship.BELARUS,
+        email=f'test.assign{registrant_id}@example.com',
+        phone='123456789',
+        application_type=ApplicationType.ADULT,
+        desired_month=desired_month,
+        id=registrant_id,
+        **preferences
+    )
+
+
+def make_slot(date_str, time_str='09:00'):
+    """Build a slot dictionary as produced by the monitor."""
+    return {'date': date_str, 'time': time_str, 'timeslot_value': f'A1{time_str}', 'display_text': f'{date_str} {time_str}'}
+
+
+def describe(assignments):
+    """Map registrant ID to the (date, time) it was assigned."""
+    return {registrant.id: (slot['date'], slot['time']) for registrant, slot in assignments}
+
+
+def check(name, actual, expected):
+    """Print and return the outcome of one comparison."""
+    if actual == expected:
+        print(f"✅ {name}")
+        return True
+    print(f"❌ {name}: expected {expected}, got {actual}")
+    return False
+
+
+def test_augmenting_path():
+    """A higher priority registrant moves to a fallback month so a lower one still gets a slot."""
+    registrants = [
+        make_registrant(1, 7, fallback_months=[8]),
+        make_registrant(2, 7)
+    ]
+    slots = [make_slot('2025-07-09'), make_slot('2025-08-01')]
+    return check(
+        "Augmenting path moves registrant 1 to the fallback month",
+        describe(assign_registrants_to_slots(registrants, slots)),
+        {1: ('2025-08-01', '09:00'), 2: ('2025-07-09', '09:00')}
+    )
+
+
+def test_desired_month_first():
+    """Without contention the desired month wins over a fallback month."""
+    registrants = [make_registrant(1, 8, fallback_months=[7])]
+    slots = [make_slot('2025-07-01'), make_slot('2025-08-04')]
+    return check(
+        "Desired month preferred over earlier fallback month",
+        describe(assign_registrants_to_slots(registrants, slots)),
+        {1: ('2025-08-04', '09:00')}
+    )
+
+
+def test_priority_tie_break():
+    """With one slot for two equal registrants the lower ID wins, whatever the input order."""
+    registrants = [make_registrant(5, 7), make_registrant(3, 7)]
+    slots = [make_slot('2025-07-09')]
+    return check(
+        "Lower ID wins a contended slot",
+        describe(assign_registrants_to_slots(registrants, slots)),
+        {3: ('2025-07-09', '09:00')}
+    )
+
+
+def test_matched_never_dropped():
+    """A lower priority registrant cannot take the only slot a higher priority registrant accepts."""
+    registrants = [
+        make_registrant(1, 7, preferred_weekdays=[2]),  # Wednesdays only
+        make_registrant(2, 7)
+    ]
+    slots = [make_slot('2025-07-09')]  # A Wednesday
+    return check(
+        "Matched registrant keeps the slot",
+        describe(assign_registrants_to_slots(registrants, slots)),
+        {1: ('2025-07-09', '09:00')}
+    )
+
+
+def test_earliest_slot_first():
+    """Among acceptable slots the earliest date and time is taken first."""
+    registrants = [make_registrant(1, 7), make_registrant(2, 7)]
+    slots = [make_slot('2025-07-10', '11:00'), make_slot('2025-07-09', '10:00'), make_slot('2025-07-09', '09:00')]
+    return check(
+        "Earliest slots assigned in priority order",
+        describe(assign_registrants_to_slots(registrants, slots)),
+        {1: ('2025-07-09', '09:00'), 2: ('2025-07-09', '10:00')}
+    )
+
+
+def test_time_preferences():
+    """Time windows exclude slots outside them."""
+    registrants = [
+        make_registrant(1, 7, earliest_time='10:00', latest_time='11:00'),
+        make_registrant(2, 7)
+    ]
+    slots = [make_slot('2025-07-09', '09:00'), make_slot('2025-07-09', '12:00'), make_slot('2025-07-10', '10:00')]
+    return check(
+        "Time window respected",
+        describe(assign_registrants_to_slots(registrants, slots)),
+        {1: ('2025-07-10', '10:00'), 2: ('2025-07-09', '09:00')}
+    )
+
+
+def main():
+    """Run all tests."""
+    print("🧪 Assignment Engine Test Suite")
+    print("=" * 50)
+
+    results = [
+        test_augmenting_path(),
+        test_desired_month_first(),
+        test_priority_tie_break(),
+        test_matched_never_dropped(),
+        test_earliest_slot_first(),
+        test_time_preferences()
+    ]
+
+    print("\n" + "=" * 50)
+    print(f"🎉 {sum(results)}/{len(results)} assignment tests passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -174,6 +174,97 @@ def test_error_cases():
     except Exception as e:
         print(f"❌ Error case test failed: {e}")
 
+def test_sweep_cancellation():
+    """Test that stopping a sweep cancels its probes, including those waiting for the rate limiter."""
+    print("\n🔍 Testing sweep cancellation...")
+    
+    import threading
+    from sweep_engine import AsyncSweepEngine
+    
+    # Separate host name so the throttled bucket does not slow down other tests
+    base_url = MOCK_BASE_URL.replace("localhost", "127.0.0.1")
+    os.environ["RATE_LIMIT_GODZINY_POKOJ_RPS"] = "2"
+    os.environ["RATE_LIMIT_GODZINY_POKOJ_BURST"] = "1"
+    engine = AsyncSweepEngine(concurrency=8)
+    
+    try:
+        dates = ["2025-06-26", "2025-07-09", "2025-07-10", "2025-08-01", "2025-08-04", "2025-08-05"]
+        stop_event = threading.Event()
+        threading.Timer(0.3, stop_event.set).start()
+        
+        started = time.time()
+        results = engine.sweep(dates, base_url, MOCK_ENDPOINT_A1, stop_event=stop_event)
+        elapsed = time.time() - started
+        time.sleep(0.2)  # Let the engine loop process the cancellation
+        stats = engine.get_stats()
+        
+        if results == [] and elapsed < 1.0 and stats['in_flight'] == 0:
+            print(f"✅ Sweep cancelled after {elapsed:.2f}s ({stats['probes']}/{len(dates)} probes sent, none in flight)")
+        else:
+            print(f"❌ Sweep cancellation failed: {len(results)} results after {elapsed:.2f}s, {stats['in_flight']} in flight")
+            
+    except Exception as e:
+        print(f"❌ Sweep cancellation test error: {e}")
+    finally:
+        engine.close()
+        os.environ.pop("RATE_LIMIT_GODZINY_POKOJ_RPS", None)
+        os.environ.pop("RATE_LIMIT_GODZINY_POKOJ_BURST", None)
+
+def test_process_mode_cycle():
+    """Test one monitoring cycle with the sweep worker dispatcher used in process mode."""
+    print("\n🔍 Testing process mode monitoring cycle...")
+    
+    import queue
+    import threading
+    from models import Registrant, Citizenship, ApplicationType
+    from process_coordinator import QueueDispatcher
+    from realtime_availability_monitor import RealTimeAvailabilityMonitor
+    
+    # The mock server always has slots on the weekdays after today
+    upcoming = sorted(date_str for date_str in requests.get(f"{MOCK_BASE_URL}api/timeslots").json()
+                      if date_str > datetime.now().strftime("%Y-%m-%d"))
+    registrant = Registrant(
+        name='Test',
+        surname='User',
+        citizenship=Citizenship.BELARUS,
+        email='test@example.com',
+        phone='123456789',
+        application_type=ApplicationType.ADULT,
+        desired_month=int(upcoming[0][5:7]),
+        id=1
+    )
+    
+    try:
+        slot_queue, inbox = queue.Queue(), queue.Queue()
+        inbox.put(('pending', [registrant]))
+        dispatcher = QueueDispatcher('mock_A1', slot_queue, inbox)
+        monitor = RealTimeAvailabilityMonitor(page_url=f"{MOCK_BASE_URL}pokoj_A1.php", dispatcher=dispatcher)
+        
+        thread = threading.Thread(target=monitor.start_monitoring, kwargs={'check_interval': 0.1}, daemon=True)
+        thread.start()
+        deadline = time.time() + 30
+        while thread.is_alive() and time.time() < deadline and not monitor.get_current_stats()['cycle_duration']:
+            time.sleep(0.05)
+        cycle_duration = monitor.get_current_stats()['cycle_duration']
+        monitor.stop_event.set()
+        thread.join(timeout=5)
+        
+        forwarded = []
+        while not slot_queue.empty():
+            room_key, _, slots = slot_queue.get_nowait()
+            forwarded.extend(slot['date'] for slot in slots if room_key == 'mock_A1')
+        
+        if not cycle_duration or thread.is_alive():
+            print("❌ Process mode cycle did not complete")
+        elif not forwarded:
+            print("❌ Process mode cycle forwarded no slots to the registration worker")
+        else:
+            print(f"✅ Process mode cycle completed in {cycle_duration:.3f}s, forwarded {len(forwarded)} slots "
+                  f"({', '.join(sorted(set(forwarded)))})")
+            
+    except Exception as e:
+        print(f"❌ Process mode test error: {e}")
+
 def reset_server_data():
     """Reset server data for clean testing."""
     print("\n🧹 Resetting server data...")
@@ -206,6 +297,8 @@ def main():
     test_registration_flow()
     test_api_endpoints()
     test_error_cases()
+    test_sweep_cancellation()
+    test_process_mode_cycle()
     
     print("\n" + "=" * 50)
     print("🎉 Test suite completed!")
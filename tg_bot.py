@@ -16,6 +16,7 @@ BOT_TOKEN = os.environ.get("TELEGRAM_TOKEN")
 # Import our custom classes
 from database import DatabaseManager, get_pending_registrations
 from monitor_controller import get_monitor_controller, start_monitor, stop_monitor, get_monitor_status, is_monitor_running
+from offices import get_office_registry
 from monitor_events_manager import get_event_queue, EventType, MonitorEvent
 
 
@@ -222,7 +223,7 @@ class TelegramBot:
             if msg.from_user.id in self.admin_users:
                 welcome_text += (
                     "🔧 Admin Commands:\n"
-                    "/start_monitor - Start availability monitoring\n"
+                    "/start_monitor [room] [interval] - Start availability monitoring (default: A1, 0.5s)\n"
                     "/stop_monitor - Stop monitoring\n"
                     "/restart_monitor - Restart monitoring\n"
                     "/refresh_db - Refresh pending registrants"
@@ -328,10 +329,21 @@ class TelegramBot:
                 await self.bot.reply_to(msg, "⚠️ Monitor is already running.")
                 return
             
-            # Parse arguments (room, interval)
+            # Parse arguments ([room] [interval]); a lone number is the interval for the default room A1
             args = msg.text.split()[1:] if len(msg.text.split()) > 1 else []
-            room = args[0] if len(args) > 0 and args[0] in ['A1', 'A2'] else 'A1'
-            interval = float(args[1]) if len(args) > 1 else 0.5
+            try:
+                if args:
+                    float(args[0])
+                    args = ['A1'] + args
+            except ValueError:
+                pass
+            room = args[0] if len(args) > 0 else 'A1'
+            try:
+                get_office_registry().resolve(room)
+                interval = float(args[1]) if len(args) > 1 else 0.5
+            except ValueError as e:
+                await self.bot.reply_to(msg, f"❌ {e}")
+                return
             
             success = start_monitor(room=room, check_interval=interval)
             
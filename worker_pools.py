@@ -0,0 +1,94 @@
+"""
+Long-lived thread pools with queue-depth metrics.
+Pools are created once by their owner (e.g. the registration dispatcher) and
+reused for every sweep, so no threads are spawned in the monitoring hot loop.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class MonitoredThreadPool(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor that tracks queue depth, active workers and queue wait time.
+
+    Worker threads are started on demand up to max_workers and then kept for
+    the lifetime of the pool.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        Initialize pool.
+
+        Args:
+            name: Pool name, used as thread name prefix and in statistics
+            max_workers: Maximum number of worker threads
+        """
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self.max_workers = max_workers
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._peak_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        submitted_at = time.perf_counter()
+        with self._stats_lock:
+            self._submitted += 1
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+        def run():
+            waited = time.perf_counter() - submitted_at
+            with self._stats_lock:
+                self._queued -= 1
+                self._active += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self._active -= 1
+                    self._completed += 1
+
+        future = super().submit(run)
+        future.add_done_callback(self._on_cancelled)
+        return future
+
+    def _on_cancelled(self, future: Future):
+        # Cancelled work never ran, so it leaves the queue here
+        if future.cancelled():
+            with self._stats_lock:
+                self._queued -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, utilization and wait time statistics."""
+        with self._stats_lock:
+            started = self._submitted - self._queued
+            return {
+                'max_workers': self.max_workers,
+                'queued': self._queued,
+                'active': self._active,
+                'peak_queued': self._peak_queued,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'avg_wait_ms': round(self._total_wait / started * 1000, 2) if started else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 2)
+            }
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        """Stop accepting work; queued work is dropped when cancel_futures is set."""
+        logger.info(f"🧵 Shutting down {self.name} pool ({self.get_stats()['queued']} queued)")
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)